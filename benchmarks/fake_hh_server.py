@@ -0,0 +1,236 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeHHConfig:
+    """
+    Настройки локального сервера, имитирующего эндпоинты `/employers` и `/vacancies` hh.ru.
+    Вакансии не хранятся, а генерируются детерминированно по номеру работодателя и страницы.
+    Поддерживаются фильтры `area`, `date_from`, `date_to` и кластеры по регионам (`clusters=true`).
+    """
+    # Регионы вакансий: номер вакансии по модулю определяет регион
+    AREAS = ("1", "2", "3", "4")
+
+    def __init__(self, employers: int = 10, vacancies_per_employer: int = 100, latency: float = 0.0,
+                 error_rate: float = 0.0, depth_cap: Optional[int] = None, seed: int = 42):
+        """
+        :param employers: Число работодателей.
+        :param vacancies_per_employer: Число вакансий у каждого работодателя.
+        :param latency: Задержка ответа в секундах.
+        :param error_rate: Доля запросов, на которые отвечается 503 или 429.
+        :param depth_cap: Максимальное число вакансий, доступных через пагинацию (на hh.ru — 2000).
+        :param seed: Начальное значение генератора случайных ошибок.
+        """
+        self.employers = employers
+        self.vacancies_per_employer = vacancies_per_employer
+        self.latency = latency
+        self.error_rate = error_rate
+        self.depth_cap = depth_cap
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    @staticmethod
+    def employer_name(index: int) -> str:
+        """
+        Название работодателя по его номеру.
+        """
+        return f"Компания {index}"
+
+    @staticmethod
+    def employer_id(index: int) -> int:
+        """
+        ID работодателя по его номеру.
+        """
+        return 1000 + index
+
+    def area(self, number: int) -> str:
+        """
+        Регион вакансии по ее номеру.
+        """
+        return self.AREAS[number % len(self.AREAS)]
+
+    def published_at(self, number: int) -> datetime:
+        """
+        Дата публикации вакансии: вакансии равномерно распределены по последним 29 дням.
+        """
+        return self.now - timedelta(minutes=number * 37 % (29 * 24 * 60))
+
+    def vacancy(self, employer_index: int, number: int) -> Dict[str, Any]:
+        """
+        Генерирует вакансию в формате API hh.ru.
+        ID вакансий сквозные по всем работодателям и помещаются в INTEGER колонки `vacancy_id`.
+        """
+        vacancy_id = employer_index * self.vacancies_per_employer + number + 1
+        has_salary = number % 3 != 0
+        return {
+            "id": str(vacancy_id),
+            "name": f"Разработчик Python {number}" if number % 5 == 0 else f"Менеджер по продажам {number}",
+            "salary": {
+                "from": 50_000 + number % 100 * 1000,
+                "to": 80_000 + number % 100 * 1500 if number % 2 else None,
+                "currency": "RUR",
+                "gross": False,
+            } if has_salary else None,
+            "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+            "published_at": self.published_at(number).strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "area": {"id": self.area(number)},
+            "employer": {"id": str(self.employer_id(employer_index)), "name": self.employer_name(employer_index)},
+            "snippet": {"requirement": "Опыт работы от 3 лет. " * 5, "responsibility": "Разработка сервисов. " * 5},
+        }
+
+    def error_status(self) -> Optional[int]:
+        """
+        Решает, ответить ли на запрос ошибкой.
+        :return: 429 или 503 для ошибочного ответа, None для обычного.
+        """
+        with self.random_lock:
+            self.requests += 1
+            if self.error_rate > 0 and self.random.random() < self.error_rate:
+                return 429 if self.random.random() < 0.5 else 503
+            return None
+
+
+class FakeHHHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов тестового сервера.
+    """
+    config: FakeHHConfig
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        config = self.config
+        if config.latency:
+            time.sleep(config.latency)
+        status = config.error_status()
+        if status == 429:
+            self._send_json(429, {"errors": [{"type": "too_many_requests"}]}, {"Retry-After": "0"})
+            return
+        if status == 503:
+            self._send_json(503, {"errors": [{"type": "service_unavailable"}]})
+            return
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.rstrip("/") == "/employers":
+            self._send_json(200, self._employers(query))
+        elif url.path.rstrip("/") == "/vacancies":
+            self._send_json(200, self._vacancies(query))
+        elif url.path.rstrip("/") == "/dictionaries":
+            self._send_json(200, self._dictionaries())
+        else:
+            self._send_json(404, {"errors": [{"type": "not_found"}]})
+
+    def _employers(self, query: Dict[str, str]) -> Dict[str, Any]:
+        config = self.config
+        text = query.get("text", "")
+        items = [
+            {"id": str(config.employer_id(index)), "name": config.employer_name(index),
+             "alternate_url": f"https://hh.ru/employer/{config.employer_id(index)}"}
+            for index in range(config.employers) if config.employer_name(index) == text
+        ]
+        return {"items": items, "found": len(items), "pages": 1, "page": 0}
+
+    @staticmethod
+    def _dictionaries() -> Dict[str, Any]:
+        return {"currency": [
+            {"code": "RUR", "abbr": "₽", "name": "Рубли", "default": True, "rate": 1.0, "in_use": True},
+            {"code": "USD", "abbr": "$", "name": "Доллары", "default": False, "rate": 0.011, "in_use": True},
+            {"code": "EUR", "abbr": "€", "name": "Евро", "default": False, "rate": 0.01, "in_use": True},
+        ]}
+
+    def _vacancies(self, query: Dict[str, str]) -> Dict[str, Any]:
+        config = self.config
+        employer_index = int(query.get("employer_id", 0)) - config.employer_id(0)
+        page = int(query.get("page", 0))
+        per_page = int(query.get("per_page", 20))
+        total = config.vacancies_per_employer if 0 <= employer_index < config.employers else 0
+        numbers = range(total)
+        if any(key in query for key in ("area", "date_from", "date_to")):
+            numbers = [number for number in numbers if self._matches(number, query)]
+        found = len(numbers)
+        available = min(found, config.depth_cap) if config.depth_cap else found
+        start = page * per_page
+        items: List[Dict[str, Any]] = [
+            config.vacancy(employer_index, number) for number in numbers[start:min(start + per_page, available)]
+        ]
+        pages = (available + per_page - 1) // per_page if per_page else 0
+        data = {"items": items, "found": found, "pages": pages, "page": page, "per_page": per_page}
+        if query.get("clusters") == "true":
+            counts: Dict[str, int] = {}
+            for number in numbers:
+                counts[config.area(number)] = counts.get(config.area(number), 0) + 1
+            data["clusters"] = [{"id": "area", "items": [
+                {"name": area, "count": count, "url": f"/vacancies?employer_id={query.get('employer_id')}&area={area}"}
+                for area, count in sorted(counts.items())
+            ]}]
+        return data
+
+    def _matches(self, number: int, query: Dict[str, str]) -> bool:
+        config = self.config
+        if "area" in query and config.area(number) != query["area"]:
+            return False
+        published_at = config.published_at(number)
+        if "date_from" in query and published_at < datetime.fromisoformat(query["date_from"]):
+            return False
+        if "date_to" in query and published_at > datetime.fromisoformat(query["date_to"]):
+            return False
+        return True
+
+
+class FakeHHServer:
+    """
+    Локальный HTTP-сервер, имитирующий API hh.ru. Запускается в фоновом потоке.
+    """
+    def __init__(self, config: FakeHHConfig, host: str = "127.0.0.1", port: int = 0):
+        """
+        :param config: Настройки имитируемых данных.
+        :param host: Адрес для прослушивания.
+        :param port: Порт (0 — любой свободный).
+        """
+        handler = type("ConfiguredFakeHHHandler", (FakeHHHandler,), {"config": config})
+        self.config = config
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """
+        Адрес сервера в формате `HHApi.base_url`.
+        """
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def company_names(self) -> List[str]:
+        """
+        Названия всех имитируемых работодателей.
+        """
+        return [self.config.employer_name(index) for index in range(self.config.employers)]
+
+    def __enter__(self) -> "FakeHHServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import uuid
+from typing import Any, Dict, Optional
+
+import psycopg2
+from psycopg2 import sql
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class DisposablePostgres:
+    """
+    Одноразовый PostgreSQL для бенчмарков.
+    Если в PATH есть `initdb` и `pg_ctl`, поднимает временный кластер в отдельном
+    каталоге и удаляет его после работы. Иначе использует сервер из переменных
+    окружения BENCH_DB_USER / BENCH_DB_PASSWORD / BENCH_DB_HOST / BENCH_DB_PORT
+    (по умолчанию DB_*), а удаляется только созданная база.
+    """
+    def __init__(self, use_local_cluster: Optional[bool] = None):
+        """
+        :param use_local_cluster: Поднимать ли временный кластер (по умолчанию — если доступен initdb).
+        """
+        if use_local_cluster is None:
+            use_local_cluster = bool(shutil.which("initdb") and shutil.which("pg_ctl"))
+        self.use_local_cluster = use_local_cluster
+        self.db_name = f"bench_{uuid.uuid4().hex[:8]}"
+        self.params: Dict[str, Any] = {}
+        self._data_dir: Optional[str] = None
+
+    def __enter__(self) -> "DisposablePostgres":
+        if self.use_local_cluster:
+            self._start_cluster()
+        else:
+            self.params = {
+                "user": os.getenv("BENCH_DB_USER", os.getenv("DB_USER")),
+                "password": os.getenv("BENCH_DB_PASSWORD", os.getenv("DB_PASSWORD")),
+                "host": os.getenv("BENCH_DB_HOST", os.getenv("DB_HOST")),
+                "port": os.getenv("BENCH_DB_PORT", os.getenv("DB_PORT", "5432")),
+            }
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.use_local_cluster:
+            self._stop_cluster()
+        else:
+            self.drop_database()
+
+    def _start_cluster(self) -> None:
+        self._data_dir = tempfile.mkdtemp(prefix="hh_bench_pg_")
+        port = _free_port()
+        subprocess.run(
+            ["initdb", "-D", self._data_dir, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--no-sync"],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        subprocess.run(
+            ["pg_ctl", "-D", self._data_dir, "-l", os.path.join(self._data_dir, "server.log"), "-w",
+             "-o", f"-p {port} -k {self._data_dir} -c fsync=off -c synchronous_commit=off", "start"],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        self.params = {"user": "postgres", "password": "", "host": "127.0.0.1", "port": port}
+
+    def _stop_cluster(self) -> None:
+        if self._data_dir is None:
+            return
+        subprocess.run(["pg_ctl", "-D", self._data_dir, "-m", "immediate", "stop"],
+                       check=False, stdout=subprocess.DEVNULL)
+        shutil.rmtree(self._data_dir, ignore_errors=True)
+        self._data_dir = None
+
+    def drop_database(self) -> None:
+        """
+        Удаляет базу данных бенчмарка.
+        """
+        conn = psycopg2.connect(dbname="postgres", **self.params)
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(self.db_name)))
+        finally:
+            conn.close()
@@ -0,0 +1,217 @@
+"""
+Контроль планов запросов DBManager.
+
+Создает схему функциями `src.database`, заполняет ее сгенерированным набором
+данных заданного размера и выполняет каждый запрос DBManager под
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON). Планы и время выполнения сохраняются
+в JSON. При сравнении с базовым результатом регрессией считается переход
+таблицы с индексного доступа на последовательное чтение (Seq Scan) и рост
+медианного времени выполнения больше допустимого.
+
+Запуск:
+    poetry run python -m benchmarks.query_plans --sizes 100000 --output plans.json
+    poetry run python -m benchmarks.query_plans --sizes 100000 --baseline plans.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+import psycopg2
+
+from benchmarks.postgres import DisposablePostgres
+from src.database import (
+    create_database, create_tables, create_indexes, create_salary_stats, create_snapshot_table
+)
+from src.db_manager import (
+    AVG_SALARY_QUERY, COMPANIES_COUNT_QUERY, HIGHER_SALARY_CONDITION, KEYWORD_CONDITION, SEARCH_QUERIES,
+    DBManager
+)
+
+# Запросы DBManager в том виде, в котором их выполняют методы: имя -> (SQL, параметры)
+PLAN_QUERIES: Dict[str, Tuple[str, Any]] = {
+    "get_companies_and_vacancies_count": (COMPANIES_COUNT_QUERY, ()),
+    "get_all_vacancies": DBManager._vacancies_query("", (), None, None),
+    "get_all_vacancies_page": DBManager._vacancies_query("", (), 1000, 100),
+    "get_avg_salary": (AVG_SALARY_QUERY, ()),
+    "get_vacancies_with_higher_salary": DBManager._vacancies_query(HIGHER_SALARY_CONDITION, (), None, None),
+    "get_vacancies_with_keyword": DBManager._vacancies_query(KEYWORD_CONDITION, ("%Python%",), None, None),
+    "search_vacancies_fulltext": (SEARCH_QUERIES["fulltext"], {"query": "python", "limit": 50}),
+    "search_vacancies_trigram": (SEARCH_QUERIES["trigram"], {"query": "Разработчик Python", "limit": 50}),
+}
+
+# Узлы плана, которые читают таблицу
+SCAN_NODES = {"Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+def generate_dataset(db_name: str, params: Dict[str, Any], size: int, employers: int) -> None:
+    """
+    Заполняет базу сгенерированными компаниями и вакансиями на стороне сервера
+    и обновляет статистику планировщика.
+    :param size: Число вакансий.
+    :param employers: Число компаний.
+    """
+    conn = psycopg2.connect(dbname=db_name, **params)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO companies (company_id, company_name, url)
+                SELECT 1000 + i, 'Компания ' || i, 'https://hh.ru/employer/' || (1000 + i)
+                FROM generate_series(0, %s - 1) i
+            """, (employers,))
+            cur.execute("""
+                INSERT INTO vacancies (vacancy_id, company_id, vacancy_name, salary_from, salary_to, url,
+                                       published_at, salary_currency, salary_gross, salary_mid_rub, archived)
+                SELECT n, 1000 + n %% %(employers)s,
+                       CASE WHEN n %% 50 = 0 THEN 'Разработчик Python ' ELSE 'Менеджер по продажам ' END || n,
+                       salary_from, salary_to, 'https://hh.ru/vacancy/' || n,
+                       now() - (n %% 43200) * interval '1 minute',
+                       CASE WHEN salary_from IS NOT NULL THEN 'RUR' END,
+                       CASE WHEN salary_from IS NOT NULL THEN FALSE END,
+                       (salary_from + COALESCE(salary_to, salary_from)) / 2.0,
+                       n %% 20 = 0
+                FROM generate_series(1, %(size)s) n,
+                     LATERAL (SELECT CASE WHEN n %% 3 <> 0 THEN 50000 + n %% 100 * 1000 END AS salary_from,
+                                     CASE WHEN n %% 3 <> 0 AND n %% 2 = 1 THEN 80000 + n %% 100 * 1500 END
+                                         AS salary_to) salaries
+            """, {"employers": employers, "size": size})
+            cur.execute("REFRESH MATERIALIZED VIEW salary_stats")
+        conn.commit()
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE")
+    finally:
+        conn.close()
+
+
+def collect_scans(plan: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """
+    Собирает способы чтения каждой таблицы в плане.
+    :param plan: Узел плана (`Plan` из EXPLAIN FORMAT JSON).
+    :return: Словарь {таблица: множество типов узлов}.
+    """
+    scans: Dict[str, Set[str]] = {}
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") in SCAN_NODES and "Relation Name" in node:
+            scans.setdefault(node["Relation Name"], set()).add(node["Node Type"])
+        stack.extend(node.get("Plans", []))
+    return scans
+
+
+def explain_queries(db_name: str, params: Dict[str, Any], repeats: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Выполняет каждый запрос под EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) `repeats` раз.
+    :return: Для каждого запроса — медианное время выполнения и планирования, способы
+             чтения таблиц и план последнего выполнения.
+    """
+    results = {}
+    conn = psycopg2.connect(dbname=db_name, **params)
+    try:
+        with conn.cursor() as cur:
+            for name, (query, args) in PLAN_QUERIES.items():
+                execution, planning = [], []
+                for _ in range(repeats):
+                    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query, args)
+                    explained = cur.fetchone()[0][0]
+                    execution.append(explained["Execution Time"])
+                    planning.append(explained["Planning Time"])
+                conn.rollback()
+                scans = collect_scans(explained["Plan"])
+                results[name] = {
+                    "execution_ms": statistics.median(execution),
+                    "planning_ms": statistics.median(planning),
+                    "scans": {table: sorted(nodes) for table, nodes in sorted(scans.items())},
+                    "plan": explained,
+                }
+    finally:
+        conn.close()
+    return results
+
+
+def run(sizes: List[int], employers: int, repeats: int) -> Dict[str, Any]:
+    """
+    Снимает планы запросов для каждого размера набора данных.
+    """
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {"employers": employers, "repeats": repeats},
+        "sizes": {},
+    }
+    for size in sizes:
+        with DisposablePostgres() as pg:
+            create_database(pg.db_name, pg.params)
+            create_tables(pg.db_name, pg.params)
+            create_indexes(pg.db_name, pg.params)
+            create_salary_stats(pg.db_name, pg.params)
+            create_snapshot_table(pg.db_name, pg.params)
+            generate_dataset(pg.db_name, pg.params, size, employers)
+            queries = explain_queries(pg.db_name, pg.params, repeats)
+        report["sizes"][str(size)] = {"queries": queries}
+        print(f"{size}: " + ", ".join(
+            f"{name} {value['execution_ms']:.1f} мс" for name, value in queries.items()
+        ))
+    return report
+
+
+def find_plan_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                          min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Сравнивает планы с базовыми: таблица, которая читалась по индексу, не должна
+    читаться последовательно, а медианное время выполнения не должно вырасти больше
+    чем на `tolerance` (доля) и одновременно больше чем на `min_delta_ms`.
+    """
+    regressions = []
+    for size, current in report["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for name, result in current["queries"].items():
+            base_result = base["queries"].get(name)
+            if base_result is None:
+                continue
+            for table, nodes in result["scans"].items():
+                base_nodes = base_result["scans"].get(table, [])
+                if "Seq Scan" in nodes and base_nodes and "Seq Scan" not in base_nodes:
+                    regressions.append(f"{size}: {name} читает {table} через Seq Scan "
+                                       f"вместо {', '.join(base_nodes)}")
+            base_ms = base_result["execution_ms"]
+            if (result["execution_ms"] > base_ms * (1 + tolerance)
+                    and result["execution_ms"] - base_ms > min_delta_ms):
+                regressions.append(f"{size}: {name} {result['execution_ms']:.1f} мс "
+                                   f"при базовых {base_ms:.1f} мс")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Контроль планов запросов DBManager.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000],
+                        help="Размеры наборов данных (число вакансий).")
+    parser.add_argument("--employers", type=int, default=10, help="Число компаний.")
+    parser.add_argument("--repeats", type=int, default=5, help="Число выполнений каждого запроса.")
+    parser.add_argument("--output", default="plan_results.json", help="Файл для планов и времени.")
+    parser.add_argument("--baseline", help="Файл с базовыми планами для сравнения.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Допустимый рост времени (доля).")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.employers, args.repeats)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = find_plan_regressions(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
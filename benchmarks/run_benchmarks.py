@@ -0,0 +1,168 @@
+"""
+Бенчмарк загрузки и аналитических запросов.
+
+Поднимает локальный сервер, имитирующий API hh.ru, и одноразовый PostgreSQL,
+измеряет сквозную скорость загрузки HHApi → БД и задержку каждого метода
+DBManager для наборов разного размера, сохраняет результат в JSON и при
+наличии базового результата сообщает о регрессиях.
+
+Запуск:
+    poetry run python -m benchmarks.run_benchmarks --sizes 1000 100000 --output bench.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fake_hh_server import FakeHHConfig, FakeHHServer
+from benchmarks.postgres import DisposablePostgres
+from src.database import (
+    create_database, create_indexes, create_salary_stats, create_snapshot_table, create_tables
+)
+from src.db_manager import DBManager
+from src.hh_api import HHApi
+from src.pipeline import stream_ingest
+
+# Методы DBManager, задержка которых измеряется
+QUERIES: Dict[str, Callable[[DBManager], Any]] = {
+    "get_companies_and_vacancies_count": lambda db: db.get_companies_and_vacancies_count(),
+    "get_all_vacancies": lambda db: db.get_all_vacancies(),
+    "get_avg_salary": lambda db: db.get_avg_salary(),
+    "get_vacancies_with_higher_salary": lambda db: db.get_vacancies_with_higher_salary(),
+    "get_vacancies_with_keyword": lambda db: db.get_vacancies_with_keyword("Python"),
+}
+
+
+def _percentile(values: List[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))]
+
+
+def bench_ingest(server: FakeHHServer, pg: DisposablePostgres, workers: int) -> Dict[str, Any]:
+    """
+    Измеряет сквозную загрузку: поиск работодателей, загрузку страниц и запись в БД.
+    """
+    started = time.perf_counter()
+    hh_api = HHApi(server.company_names(), max_workers=workers, requests_per_second=0,
+                   pool_size=workers, backoff_factor=0.01, base_url=server.base_url)
+    try:
+        total = stream_ingest(pg.db_name, pg.params, hh_api)
+    finally:
+        hh_api.close()
+    elapsed = time.perf_counter() - started
+    if total is None:
+        raise RuntimeError("Загрузка данных в бенчмарке завершилась ошибкой.")
+    return {
+        "vacancies": total,
+        "seconds": elapsed,
+        "rows_per_second": total / elapsed if elapsed > 0 else 0.0,
+        "http": hh_api.stats.summary(),
+    }
+
+
+def bench_queries(pg: DisposablePostgres, repeats: int) -> Dict[str, Dict[str, float]]:
+    """
+    Измеряет задержку каждого метода DBManager (после одного прогревочного вызова).
+    """
+    results = {}
+    with DBManager(pg.db_name, pg.params) as db_manager:
+        for name, query in QUERIES.items():
+            query(db_manager)
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                query(db_manager)
+                timings.append(time.perf_counter() - started)
+            results[name] = {
+                "median": statistics.median(timings),
+                "p95": _percentile(timings, 0.95),
+                "min": min(timings),
+            }
+    return results
+
+
+def run(sizes: List[int], employers: int, workers: int, repeats: int, latency: float,
+        error_rate: float) -> Dict[str, Any]:
+    """
+    Выполняет бенчмарк для каждого размера набора данных.
+    """
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": {"employers": employers, "workers": workers, "repeats": repeats,
+                     "latency": latency, "error_rate": error_rate},
+        "sizes": {},
+    }
+    for size in sizes:
+        config = FakeHHConfig(employers=employers, vacancies_per_employer=max(1, size // employers),
+                              latency=latency, error_rate=error_rate)
+        with DisposablePostgres() as pg, FakeHHServer(config) as server:
+            create_database(pg.db_name, pg.params)
+            create_tables(pg.db_name, pg.params)
+            create_indexes(pg.db_name, pg.params)
+            create_salary_stats(pg.db_name, pg.params)
+            create_snapshot_table(pg.db_name, pg.params)
+            ingest = bench_ingest(server, pg, workers)
+            queries = bench_queries(pg, repeats)
+        report["sizes"][str(size)] = {"ingest": ingest, "queries": queries}
+        print(f"{size}: {ingest['rows_per_second']:.0f} строк/с, "
+              + ", ".join(f"{name} {value['median'] * 1000:.1f} мс" for name, value in queries.items()))
+    return report
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Сравнивает результат с базовым: скорость загрузки не должна упасть, а медианная
+    задержка запросов — вырасти больше чем на `tolerance` (доля).
+    """
+    regressions = []
+    for size, current in report["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        base_rate = base["ingest"]["rows_per_second"]
+        if base_rate and current["ingest"]["rows_per_second"] < base_rate * (1 - tolerance):
+            regressions.append(f"{size}: загрузка {current['ingest']['rows_per_second']:.0f} "
+                               f"строк/с при базовых {base_rate:.0f}")
+        for name, timings in current["queries"].items():
+            base_median = base["queries"].get(name, {}).get("median")
+            if base_median and timings["median"] > base_median * (1 + tolerance):
+                regressions.append(f"{size}: {name} {timings['median'] * 1000:.1f} мс "
+                                   f"при базовых {base_median * 1000:.1f} мс")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки вакансий и запросов DBManager.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000],
+                        help="Размеры наборов данных (число вакансий).")
+    parser.add_argument("--employers", type=int, default=10, help="Число работодателей.")
+    parser.add_argument("--workers", type=int, default=8, help="Число потоков загрузки.")
+    parser.add_argument("--repeats", type=int, default=5, help="Число замеров каждого запроса.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа сервера API, с.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 429/503.")
+    parser.add_argument("--output", default="bench_results.json", help="Файл для результатов.")
+    parser.add_argument("--baseline", help="Файл с базовыми результатами для сравнения.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимое ухудшение (доля).")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.employers, args.workers, args.repeats, args.latency, args.error_rate)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = find_regressions(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Регрессия: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+from typing import List, Dict, Any, AsyncIterator, Optional, Sequence, Tuple
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg нужен только для асинхронного менеджера
+    asyncpg = None
+
+from src.db_manager import (
+    AVG_SALARY_QUERY, COMPANIES_COUNT_QUERY, HIGHER_SALARY_CONDITION, KEYWORD_CONDITION, DBManager,
+    to_numbered_query
+)
+
+
+class AsyncDBManager:
+    """
+    Асинхронный вариант DBManager на asyncpg для обслуживания большого числа
+    одновременных запросов в одном процессе. Использует те же SQL-запросы.
+    """
+    def __init__(self, db_name: str, params: Dict[str, Any], min_connections: int = 1,
+                 max_connections: int = 10):
+        """
+        :param db_name: Имя базы данных.
+        :param params: Параметры подключения к БД (user, password, host).
+        :param min_connections: Минимальное число соединений в пуле.
+        :param max_connections: Максимальное число соединений в пуле.
+        """
+        if asyncpg is None:
+            raise ImportError("Для AsyncDBManager требуется пакет asyncpg.")
+        self.db_name = db_name
+        self.params = params
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+
+    async def __aenter__(self) -> "AsyncDBManager":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """
+        Создает пул соединений, если он еще не создан.
+        """
+        if self._pool is None:
+            self._pool = await asyncpg.create_pool(
+                database=self.db_name, min_size=self.min_connections, max_size=self.max_connections, **self.params
+            )
+
+    async def close(self) -> None:
+        """
+        Закрывает все соединения пула.
+        """
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _fetch(self, query: str, args: Any = ()) -> Sequence:
+        """
+        Выполняет запрос и возвращает все строки.
+        """
+        await self.open()
+        query, values = to_numbered_query(query, args)
+        async with self._pool.acquire() as conn:
+            return await conn.fetch(query, *values)
+
+    async def _fetch_vacancies(self, condition: str = "", args: Tuple = (), after_vacancy_id: Optional[int] = None,
+                               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Выполняет запрос списка вакансий и возвращает результат целиком.
+        """
+        query, args = DBManager._vacancies_query(condition, args, after_vacancy_id, limit)
+        rows = await self._fetch(query, args)
+        return [DBManager._vacancy_from_row(tuple(row)) for row in rows]
+
+    async def _iter_vacancies(self, condition: str = "", args: Tuple = (),
+                              prefetch: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Отдает вакансии по мере чтения серверным курсором, получая строки порциями по `prefetch`.
+        """
+        await self.open()
+        query, values = to_numbered_query(*DBManager._vacancies_query(condition, args, None, None))
+        async with self._pool.acquire() as conn:
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, *values, prefetch=prefetch):
+                    yield DBManager._vacancy_from_row(tuple(row))
+
+    async def get_companies_and_vacancies_count(self) -> List[Dict[str, Any]]:
+        """
+        Получает список всех компаний и количество вакансий у каждой.
+        """
+        rows = await self._fetch(COMPANIES_COUNT_QUERY)
+        return [{"company_name": row[0], "vacancies_count": row[1]} for row in rows]
+
+    async def get_all_vacancies(self, after_vacancy_id: Optional[int] = None,
+                                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список всех вакансий.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return await self._fetch_vacancies(after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_all_vacancies(self, prefetch: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Асинхронно и потоково отдает все вакансии.
+        :param prefetch: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(prefetch=prefetch)
+
+    async def get_avg_salary(self) -> float:
+        """
+        Получает среднюю зарплату по вакансиям.
+        """
+        rows = await self._fetch(AVG_SALARY_QUERY)
+        avg_salary = rows[0][0] if rows else None
+        return float(avg_salary) if avg_salary else 0.0
+
+    async def get_vacancies_with_higher_salary(self, after_vacancy_id: Optional[int] = None,
+                                               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список всех вакансий, у которых зарплата выше средней.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return await self._fetch_vacancies(HIGHER_SALARY_CONDITION, after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_vacancies_with_higher_salary(self, prefetch: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Асинхронно и потоково отдает вакансии с зарплатой выше средней.
+        :param prefetch: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(HIGHER_SALARY_CONDITION, prefetch=prefetch)
+
+    async def get_vacancies_with_keyword(self, keyword: str, after_vacancy_id: Optional[int] = None,
+                                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список вакансий, в названии которых есть ключевое слово.
+        :param keyword: Ключевое слово для поиска.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return await self._fetch_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), after_vacancy_id, limit)
+
+    def iter_vacancies_with_keyword(self, keyword: str, prefetch: int = 2000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Асинхронно и потоково отдает вакансии, в названии которых есть ключевое слово.
+        :param keyword: Ключевое слово для поиска.
+        :param prefetch: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), prefetch)
@@ -0,0 +1,107 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class QueryCache:
+    """
+    Потокобезопасный LRU-кэш результатов запросов с ограничением по числу записей
+    и по объему, TTL для каждого запроса и инвалидацией по версии данных.
+    Запись считается устаревшей, если истек ее TTL или версия данных изменилась.
+    """
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: float = 300.0, ttl: Optional[Dict[str, float]] = None):
+        """
+        :param max_entries: Максимальное число записей.
+        :param max_bytes: Максимальный суммарный объем записей в байтах (оценка по pickle).
+        :param default_ttl: Время жизни записи в секундах по умолчанию.
+        :param ttl: Время жизни для отдельных запросов: {имя метода: секунды}.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl = ttl or {}
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, name: str) -> float:
+        """
+        Возвращает время жизни записи для запроса.
+        :param name: Имя метода.
+        """
+        return self.ttl.get(name, self.default_ttl)
+
+    def get(self, key: Hashable, version: int) -> Tuple[bool, Any]:
+        """
+        Ищет запись в кэше.
+        :param key: Ключ запроса.
+        :param version: Текущая версия данных.
+        :return: Пара (найдено ли значение, значение).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at, entry_version = entry
+                if entry_version == version and time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, version: int, ttl: float) -> None:
+        """
+        Сохраняет значение. Значения больше `max_bytes` не кэшируются.
+        :param key: Ключ запроса.
+        :param value: Результат запроса.
+        :param version: Версия данных, для которой получен результат.
+        :param ttl: Время жизни записи в секундах.
+        """
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes or ttl <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl, version)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """
+        Удаляет все записи.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику попаданий и заполненности кэша.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Удаляет запись. Вызывается под блокировкой.
+        """
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,280 @@
+import argparse
+import sys
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.database import (
+    create_database, create_tables, create_indexes, create_salary_stats, create_snapshot_table, create_job_table
+)
+from src.db_manager import DBManager
+from src.duckdb_manager import DuckDBManager
+from src.employer_registry import EmployerRegistry
+from src.export import FORMATS, SNAPSHOT_TABLES, VACANCY_FIELDS, export_rows, export_snapshot
+from src.hh_api import HHApi
+from src.http_cache import ResponseCache
+from src.main import COMPANY_NAMES, load_db_config, load_replica_config
+from src.metrics import metrics
+from src.parallel_loader import parallel_load
+from src.pipeline import stream_ingest
+from src.sync import incremental_sync
+from src.work_queue import enqueue_jobs, queue_status, run_worker
+
+# Запросы DBManager, доступные из командной строки: имя -> (функция, схема Parquet).
+# Списки вакансий читаются серверным курсором и выгружаются потоково.
+QUERIES: Dict[str, tuple] = {
+    "companies": (lambda db, args: db.get_companies_and_vacancies_count(), None),
+    "vacancies": (lambda db, args: db.iter_all_vacancies(args.itersize), VACANCY_FIELDS),
+    "avg-salary": (lambda db, args: [{"avg_salary": db.get_avg_salary()}], None),
+    "salary-stats": (lambda db, args: db.get_salary_stats(), None),
+    "higher-salary": (lambda db, args: db.iter_vacancies_with_higher_salary(args.itersize), VACANCY_FIELDS),
+    "keyword": (lambda db, args: db.iter_vacancies_with_keyword(args.keyword, args.itersize), VACANCY_FIELDS),
+    "search": (lambda db, args: db.search_vacancies(args.keyword, args.mode, args.limit), None),
+    "salary-trend": (lambda db, args: db.get_avg_salary_trend(args.weeks), None),
+    "count-trend": (lambda db, args: db.get_vacancy_count_trend(args.days), None),
+}
+
+# Запросы, на которые DuckDBManager отвечает по Parquet-снимку
+SNAPSHOT_QUERIES = ("companies", "vacancies", "avg-salary", "higher-salary", "keyword")
+
+
+def _company_names(args: argparse.Namespace) -> List[str]:
+    """
+    Возвращает список компаний из аргументов, файла или список по умолчанию.
+    """
+    if args.companies_file:
+        with open(args.companies_file, encoding="utf-8") as file:
+            return [line.strip() for line in file if line.strip()]
+    return args.companies or COMPANY_NAMES
+
+
+def _response_cache(args: argparse.Namespace) -> Optional[ResponseCache]:
+    """
+    Открывает постоянный кэш ответов API, если задан `--http-cache`.
+    С `--replay` ответы выдаются только из кэша, без обращения к сети.
+    """
+    if not args.http_cache:
+        return None
+    return ResponseCache(args.http_cache, replay_only=args.replay)
+
+
+def _add_http_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Добавляет параметры постоянного кэша ответов API.
+    """
+    parser.add_argument("--http-cache", metavar="PATH",
+                        help="файл SQLite для кэша ответов API (повторные загрузки используют условные запросы)")
+    parser.add_argument("--replay", action="store_true",
+                        help="загрузить только из кэша ответов без обращения к API (требует --http-cache)")
+
+
+def cmd_init(args: argparse.Namespace, db_name: str, params: Dict[str, Any]) -> int:
+    """
+    Создает базу данных, таблицы, индексы и представления.
+    Останавливается на первом шаге, завершившемся ошибкой.
+    """
+    steps = [create_tables, create_indexes, create_salary_stats, create_snapshot_table, create_job_table]
+    if not args.keep_database:
+        steps.insert(0, create_database)
+    for step in steps:
+        if not step(db_name, params):
+            return 1
+    return 0
+
+
+def cmd_ingest(args: argparse.Namespace, db_name: str, params: Dict[str, Any]) -> int:
+    """
+    Загружает вакансии: полностью (`full`) или только изменения (`incremental`).
+    С `--db-workers N` полная загрузка сначала получает все вакансии из API,
+    а затем записывает их в БД через N соединений (`parallel_load`).
+    Снимок выгружается только после успешной загрузки.
+    """
+    if args.replay and not args.http_cache:
+        print("Для --replay нужно указать --http-cache.", file=sys.stderr)
+        return 2
+    response_cache = _response_cache(args)
+    hh_api = HHApi(_company_names(args), max_workers=args.workers,
+                   registry=EmployerRegistry(db_name, params), response_cache=response_cache)
+    try:
+        if args.mode == "full" and args.db_workers > 1:
+            data = {"companies": hh_api.companies, "vacancies": hh_api.get_vacancies_concurrent()}
+            result = parallel_load(db_name, params, data, workers=args.db_workers, method=args.method,
+                                   hh_api=hh_api)
+        elif args.mode == "full":
+            result = stream_ingest(db_name, params, hh_api, batch_size=args.batch_size, method=args.method)
+        else:
+            result = incremental_sync(db_name, params, hh_api)
+    finally:
+        hh_api.close()
+        if response_cache is not None:
+            response_cache.close()
+    if result is None:
+        return 1
+    if args.snapshot:
+        return cmd_snapshot(argparse.Namespace(directory=args.snapshot), db_name, params)
+    return 0
+
+
+def cmd_snapshot(args: argparse.Namespace, db_name: str, params: Dict[str, Any]) -> int:
+    """
+    Выгружает компании и открытые вакансии в Parquet-снимок.
+    Код завершения нулевой, только если выгружены все таблицы снимка.
+    """
+    counts = export_snapshot(db_name, params, args.directory)
+    return 0 if set(counts) == set(SNAPSHOT_TABLES) else 1
+
+
+def cmd_queue(args: argparse.Namespace, db_name: str, params: Dict[str, Any]) -> int:
+    """
+    Распределенная загрузка: постановка заданий в очередь, рабочий процесс и состояние очереди.
+    """
+    if args.action == "status":
+        status = queue_status(db_name, params)
+        for name, count in status.items():
+            print(f"{name}: {count}")
+        return 0
+
+    if args.replay and not args.http_cache:
+        print("Для --replay нужно указать --http-cache.", file=sys.stderr)
+        return 2
+    response_cache = _response_cache(args)
+    if args.action == "enqueue":
+        hh_api = HHApi(_company_names(args), max_workers=args.workers,
+                       registry=EmployerRegistry(db_name, params), response_cache=response_cache)
+    else:
+        hh_api = HHApi([], max_workers=args.workers, response_cache=response_cache)
+    try:
+        if args.action == "enqueue":
+            enqueue_jobs(db_name, params, hh_api, args.pages_per_job)
+        else:
+            stats = run_worker(db_name, params, hh_api, args.worker_id, timedelta(seconds=args.lease),
+                               args.max_attempts)
+            return 1 if stats["failed"] else 0
+    finally:
+        hh_api.close()
+        if response_cache is not None:
+            response_cache.close()
+    return 0
+
+
+def cmd_query(args: argparse.Namespace, db_name: str, params: Dict[str, Any]) -> int:
+    """
+    Выполняет запрос DBManager и выгружает результат в выбранном формате.
+    """
+    query, fields = QUERIES[args.name]
+    if args.name in ("keyword", "search") and not args.keyword:
+        print(f"Для запроса {args.name} нужно указать --keyword.", file=sys.stderr)
+        return 2
+    if args.format == "parquet" and not args.output:
+        print("Для формата parquet нужно указать --output.", file=sys.stderr)
+        return 2
+    if args.snapshot and args.name not in SNAPSHOT_QUERIES:
+        print(f"Запрос {args.name} недоступен для снимка, доступны: {', '.join(SNAPSHOT_QUERIES)}.", file=sys.stderr)
+        return 2
+
+    if args.snapshot:
+        manager = DuckDBManager(args.snapshot)
+    else:
+        manager = DBManager(db_name, params, **load_replica_config())
+    with manager as db_manager:
+        rows: Iterable[Dict[str, Any]] = query(db_manager, args)
+        if args.format == "parquet":
+            count = export_rows(rows, "parquet", path=args.output, fields=fields)
+        elif args.output:
+            with open(args.output, "w", encoding="utf-8", newline="") as file:
+                count = export_rows(rows, args.format, stream=file)
+        else:
+            count = export_rows(rows, args.format, stream=sys.stdout)
+    print(f"Выгружено строк: {count}.", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Создает парсер аргументов командной строки.
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Загрузка вакансий hh.ru в PostgreSQL и выгрузка результатов запросов.")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="после выполнения записать метрики в файл в формате Prometheus")
+    parser.add_argument("--metrics-log", metavar="PATH", help="после выполнения дописать метрики JSON-строкой в файл")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="отдавать метрики на http://127.0.0.1:PORT/metrics во время выполнения")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init = subparsers.add_parser("init", help="создать базу данных, таблицы и индексы")
+    init.add_argument("--keep-database", action="store_true",
+                      help="не пересоздавать базу, только создать недостающие объекты")
+    init.set_defaults(handler=cmd_init)
+
+    ingest = subparsers.add_parser("ingest", help="загрузить вакансии из API hh.ru")
+    ingest.add_argument("mode", choices=("full", "incremental"))
+    ingest.add_argument("--companies", nargs="+", help="названия компаний")
+    ingest.add_argument("--companies-file", help="файл с названиями компаний, по одному в строке")
+    ingest.add_argument("--workers", type=int, default=8, help="число потоков загрузки из API")
+    ingest.add_argument("--db-workers", type=int, default=1,
+                        help="число параллельных соединений записи в БД при полной загрузке")
+    ingest.add_argument("--batch-size", type=int, default=1000, help="размер пакета записи в БД")
+    ingest.add_argument("--method", choices=("copy", "values"), default="copy", help="способ записи в БД")
+    ingest.add_argument("--snapshot", metavar="DIR", help="после загрузки выгрузить Parquet-снимок в каталог")
+    _add_http_cache_arguments(ingest)
+    ingest.set_defaults(handler=cmd_ingest)
+
+    snapshot = subparsers.add_parser("snapshot", help="выгрузить компании и вакансии в Parquet-снимок")
+    snapshot.add_argument("directory", help="каталог снимка")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    queue = subparsers.add_parser("queue", help="распределенная загрузка несколькими рабочими процессами")
+    queue.add_argument("action", choices=("enqueue", "work", "status"),
+                       help="поставить задания в очередь, выполнять задания или показать состояние очереди")
+    queue.add_argument("--companies", nargs="+", help="названия компаний")
+    queue.add_argument("--companies-file", help="файл с названиями компаний, по одному в строке")
+    queue.add_argument("--workers", type=int, default=8, help="число потоков запросов к API")
+    queue.add_argument("--pages-per-job", type=int, default=5, help="число страниц вакансий в одном задании")
+    queue.add_argument("--worker-id", help="идентификатор рабочего процесса (по умолчанию хост и PID)")
+    queue.add_argument("--lease", type=int, default=120, help="срок аренды задания в секундах")
+    queue.add_argument("--max-attempts", type=int, default=3, help="сколько раз задание может выдаваться")
+    _add_http_cache_arguments(queue)
+    queue.set_defaults(handler=cmd_queue)
+
+    query = subparsers.add_parser("query", help="выполнить запрос и выгрузить результат")
+    query.add_argument("name", choices=tuple(QUERIES))
+    query.add_argument("--format", choices=FORMATS, default="csv")
+    query.add_argument("--output", "-o", help="файл вывода (по умолчанию stdout)")
+    query.add_argument("--keyword", "-k", help="ключевое слово или поисковый запрос")
+    query.add_argument("--mode", choices=("fulltext", "trigram"), default="fulltext", help="режим поиска")
+    query.add_argument("--limit", type=int, default=50, help="число результатов поиска")
+    query.add_argument("--weeks", type=int, default=12, help="период тренда зарплат в неделях")
+    query.add_argument("--days", type=int, default=90, help="период тренда числа вакансий в днях")
+    query.add_argument("--itersize", type=int, default=2000,
+                       help="сколько строк получать с сервера за один раз")
+    query.add_argument("--snapshot", metavar="DIR",
+                       help="отвечать по Parquet-снимку через DuckDB, без подключения к PostgreSQL")
+    query.set_defaults(handler=cmd_query)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа командной строки.
+    :param argv: Аргументы (по умолчанию — `sys.argv`).
+    :return: Код завершения.
+    """
+    args = build_parser().parse_args(argv)
+    db_name, params = load_db_config()
+    handler: Callable[..., int] = args.handler
+    if args.metrics_file or args.metrics_log or args.metrics_port:
+        metrics.enabled = True
+    server = metrics.serve_prometheus(port=args.metrics_port) if args.metrics_port else None
+    try:
+        return handler(args, db_name, params)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if args.metrics_file:
+            metrics.write_prometheus(args.metrics_file)
+        if args.metrics_log:
+            metrics.log_json(args.metrics_log, event=args.command)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
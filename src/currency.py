@@ -0,0 +1,99 @@
+from datetime import timedelta
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+# Код рубля в справочниках hh.ru
+RUB_CODE = "RUR"
+
+# Ставка НДФЛ: зарплаты «до вычета налогов» приводятся к сумме «на руки»
+INCOME_TAX_RATE = 0.13
+
+# Курсы, которые используются, если таблица `currency_rates` еще пуста
+DEFAULT_RATES = {RUB_CODE: 1.0}
+
+
+def salary_mid_rub(salary_from: Optional[int], salary_to: Optional[int], currency: Optional[str],
+                   gross: Optional[bool], rates: Dict[str, float]) -> Optional[float]:
+    """
+    Вычисляет середину зарплатной вилки в рублях на руки.
+    Если указана только одна граница, берется она (а не половина суммы границ).
+    :param salary_from: Нижняя граница зарплаты.
+    :param salary_to: Верхняя граница зарплаты.
+    :param currency: Код валюты hh.ru (None — рубли).
+    :param gross: Указана ли зарплата до вычета налогов.
+    :param rates: Курсы в формате hh.ru: сколько единиц валюты стоит один рубль.
+    :return: Зарплата в рублях или None, если зарплата не указана или курс валюты неизвестен.
+    """
+    bounds = [value for value in (salary_from, salary_to) if value]
+    if not bounds:
+        return None
+    rate = rates.get(currency or RUB_CODE)
+    if not rate:
+        return None
+    amount = sum(bounds) / len(bounds) / rate
+    if gross:
+        amount *= 1 - INCOME_TAX_RATE
+    return round(amount, 2)
+
+
+def load_currency_rates(cur) -> Dict[str, float]:
+    """
+    Загружает курсы валют из таблицы `currency_rates`.
+    :param cur: Курсор psycopg2.
+    """
+    cur.execute("SELECT currency_code, rate FROM currency_rates")
+    rates = dict(DEFAULT_RATES)
+    rates.update({code: float(rate) for code, rate in cur.fetchall()})
+    return rates
+
+
+def save_currency_rates(cur, rates: Dict[str, float]) -> int:
+    """
+    Сохраняет курсы валют в таблицу `currency_rates`.
+    :param cur: Курсор psycopg2.
+    :param rates: Курсы в формате `HHApi.get_currency_rates`.
+    :return: Количество сохраненных курсов.
+    """
+    rows = [(code, rate) for code, rate in rates.items() if rate]
+    if rows:
+        execute_values(
+            cur,
+            """
+            INSERT INTO currency_rates (currency_code, rate) VALUES %s
+            ON CONFLICT (currency_code) DO UPDATE SET rate = EXCLUDED.rate, updated_at = now()
+            """,
+            rows
+        )
+    return len(rows)
+
+
+def refresh_currency_rates(conn, hh_api, max_age: timedelta = timedelta(days=1)) -> Dict[str, float]:
+    """
+    Возвращает курсы валют, обновляя таблицу `currency_rates` из справочника hh.ru,
+    если сохраненные курсы старше `max_age`. При ошибке API используются сохраненные курсы.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    :param hh_api: Клиент API.
+    :param max_age: Срок, в течение которого сохраненные курсы не обновляются.
+    """
+    try:
+        with conn.cursor() as cur:
+            # Рубль записывается при создании таблицы, поэтому свежесть определяется по остальным валютам;
+            # если их еще нет, курсы считаются устаревшими
+            cur.execute("SELECT now() - MAX(updated_at) <= %s FROM currency_rates WHERE currency_code <> %s",
+                        (max_age, RUB_CODE))
+            fresh = cur.fetchone()[0]
+            if not fresh:
+                rates = hh_api.get_currency_rates()
+                if rates:
+                    save_currency_rates(cur, rates)
+                else:
+                    print("Не удалось обновить курсы валют, используются сохраненные.")
+            rates = load_currency_rates(cur)
+        conn.commit()
+        return rates
+    except psycopg2.Error as error:
+        conn.rollback()
+        print(f"Ошибка при обновлении курсов валют: {error}")
+        return dict(DEFAULT_RATES)
@@ -2,10 +2,21 @@ import psycopg2
 from psycopg2 import sql
 from typing import Dict, Any
 
+# Колонки `vacancies`, добавленные после первой версии схемы
+VACANCY_UPGRADE_COLUMNS = (
+    "published_at TIMESTAMPTZ",
+    "salary_currency VARCHAR(3)",
+    "salary_gross BOOLEAN",
+    "salary_mid_rub NUMERIC(12, 2)",
+    "archived BOOLEAN NOT NULL DEFAULT FALSE",
+    "vacancy_name_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', vacancy_name)) STORED",
+)
 
-def create_database(db_name: str, params: Dict[str, Any]) -> None:
+
+def create_database(db_name: str, params: Dict[str, Any]) -> bool:
     """
     Создает новую базу данных в PostgreSQL.
+    :return: True, если объекты созданы без ошибок.
     """
     conn = None
     try:
@@ -21,15 +32,21 @@ def create_database(db_name: str, params: Dict[str, Any]) -> None:
 
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Ошибка при создании базы данных: {error}")
+        return False
     finally:
         if conn is not None:
             cur.close()
             conn.close()
+    return True
 
 
-def create_tables(db_name: str, params: Dict[str, Any]) -> None:
+def create_tables(db_name: str, params: Dict[str, Any]) -> bool:
     """
-    Создает таблицы `companies` и `vacancies` в указанной базе данных.
+    Создает таблицы `companies`, `vacancies`, `sync_state`, `data_version`,
+    `employer_registry` и `currency_rates` в указанной базе данных.
+    Повторный вызов безопасен: существующие таблицы не пересоздаются,
+    а в таблицу `vacancies` прежней схемы добавляются недостающие колонки.
+    :return: True, если объекты созданы без ошибок.
     """
     conn = None
     try:
@@ -37,7 +54,7 @@ def create_tables(db_name: str, params: Dict[str, Any]) -> None:
         cur = conn.cursor()
 
         cur.execute("""
-            CREATE TABLE companies (
+            CREATE TABLE IF NOT EXISTS companies (
                 company_id INTEGER PRIMARY KEY,
                 company_name VARCHAR(255) NOT NULL,
                 url VARCHAR(255)
@@ -46,22 +63,257 @@ def create_tables(db_name: str, params: Dict[str, Any]) -> None:
         print("Таблица `companies` успешно создана.")
 
         cur.execute("""
-            CREATE TABLE vacancies (
+            CREATE TABLE IF NOT EXISTS vacancies (
                 vacancy_id INTEGER PRIMARY KEY,
                 company_id INTEGER NOT NULL REFERENCES companies(company_id),
                 vacancy_name VARCHAR(255) NOT NULL,
                 salary_from INTEGER,
                 salary_to INTEGER,
-                url VARCHAR(255)
+                url VARCHAR(255),
+                published_at TIMESTAMPTZ,
+                salary_currency VARCHAR(3),
+                salary_gross BOOLEAN,
+                salary_mid_rub NUMERIC(12, 2),
+                archived BOOLEAN NOT NULL DEFAULT FALSE,
+                vacancy_name_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', vacancy_name)) STORED
             )
         """)
+        # Колонки, которых нет в таблице, созданной прежними версиями
+        for column in VACANCY_UPGRADE_COLUMNS:
+            cur.execute(f"ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS {column}")
         print("Таблица `vacancies` успешно создана.")
 
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                company_id INTEGER PRIMARY KEY REFERENCES companies(company_id),
+                last_published_at TIMESTAMPTZ,
+                synced_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        print("Таблица `sync_state` успешно создана.")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS data_version (
+                id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+                version BIGINT NOT NULL DEFAULT 0
+            )
+        """)
+        cur.execute("INSERT INTO data_version (id, version) VALUES (TRUE, 0) ON CONFLICT (id) DO NOTHING")
+        print("Таблица `data_version` успешно создана.")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS employer_registry (
+                query_name VARCHAR(255) PRIMARY KEY,
+                company_id INTEGER NOT NULL,
+                company_name VARCHAR(255) NOT NULL,
+                url VARCHAR(255),
+                resolved_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        print("Таблица `employer_registry` успешно создана.")
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS currency_rates (
+                currency_code VARCHAR(3) PRIMARY KEY,
+                rate NUMERIC(18, 8) NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        cur.execute("INSERT INTO currency_rates (currency_code, rate) VALUES ('RUR', 1) ON CONFLICT DO NOTHING")
+        print("Таблица `currency_rates` успешно создана.")
+
         conn.commit()
 
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Ошибка при создании таблиц: {error}")
+        return False
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return True
+
+
+def create_indexes(db_name: str, params: Dict[str, Any]) -> bool:
+    """
+    Создает индексы для поиска по названию вакансии: триграммный GIN-индекс (pg_trgm),
+    который используется для ILIKE и поиска по сходству, и GIN-индекс по полнотекстовой
+    колонке `vacancy_name_tsv` с русской морфологией. Также создает индекс по зарплате
+    в рублях `salary_mid_rub` для выборки вакансий с зарплатой выше средней. Повторный вызов безопасен.
+    :return: True, если объекты созданы без ошибок.
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS vacancies_name_trgm_idx
+            ON vacancies USING GIN (vacancy_name gin_trgm_ops)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS vacancies_name_tsv_idx
+            ON vacancies USING GIN (vacancy_name_tsv)
+        """)
+        print("Индексы для поиска по вакансиям успешно созданы.")
+
+        cur.execute("DROP INDEX IF EXISTS vacancies_salary_mid_idx")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS vacancies_salary_mid_rub_idx
+            ON vacancies (salary_mid_rub)
+            WHERE NOT archived AND salary_mid_rub IS NOT NULL
+        """)
+        print("Индекс по средней зарплате успешно создан.")
+
+        conn.commit()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при создании индексов: {error}")
+        return False
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return True
+
+
+def create_salary_stats(db_name: str, params: Dict[str, Any]) -> bool:
+    """
+    Создает материализованное представление `salary_stats` со статистикой зарплат
+    по каждой компании и по всем вакансиям (строка с `scope_id = 0`).
+    Зарплаты берутся из колонки `salary_mid_rub` (рубли на руки).
+    Представление обновляется загрузчиком после каждой загрузки данных.
+    :return: True, если объекты созданы без ошибок.
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+
+        # Представление прежней версии считало зарплаты без приведения к рублям
+        cur.execute("SELECT definition FROM pg_matviews WHERE matviewname = 'salary_stats'")
+        row = cur.fetchone()
+        if row is not None and 'salary_mid_rub' not in row[0]:
+            cur.execute("DROP MATERIALIZED VIEW salary_stats")
+        cur.execute("""
+            CREATE MATERIALIZED VIEW IF NOT EXISTS salary_stats AS
+            SELECT
+                COALESCE(company_id, 0) AS scope_id,
+                company_id,
+                COUNT(*) AS vacancies_count,
+                SUM(salary_mid_rub) AS salary_sum,
+                AVG(salary_mid_rub) AS salary_avg,
+                percentile_cont(0.25) WITHIN GROUP (ORDER BY salary_mid_rub) AS salary_p25,
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_mid_rub) AS salary_median,
+                percentile_cont(0.75) WITHIN GROUP (ORDER BY salary_mid_rub) AS salary_p75,
+                percentile_cont(0.9) WITHIN GROUP (ORDER BY salary_mid_rub) AS salary_p90
+            FROM vacancies
+            WHERE NOT archived AND salary_mid_rub IS NOT NULL
+            GROUP BY GROUPING SETS ((company_id), ())
+        """)
+        # Уникальный индекс нужен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS salary_stats_scope_idx ON salary_stats (scope_id)")
+        print("Представление `salary_stats` успешно создано.")
+
+        conn.commit()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при создании статистики зарплат: {error}")
+        return False
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return True
+
+
+def create_snapshot_table(db_name: str, params: Dict[str, Any]) -> bool:
+    """
+    Создает таблицу истории `vacancy_snapshots`, секционированную по дате снимка
+    (месячные партиции создаются при записи снимков).
+    :return: True, если объекты созданы без ошибок.
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS vacancy_snapshots (
+                snapshot_date DATE NOT NULL,
+                vacancy_id INTEGER NOT NULL,
+                company_id INTEGER NOT NULL,
+                salary_from INTEGER,
+                salary_to INTEGER,
+                salary_mid_rub NUMERIC(12, 2),
+                PRIMARY KEY (snapshot_date, vacancy_id)
+            ) PARTITION BY RANGE (snapshot_date)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS vacancy_snapshots_company_idx
+            ON vacancy_snapshots (company_id, snapshot_date)
+        """)
+        print("Таблица `vacancy_snapshots` успешно создана.")
+
+        conn.commit()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при создании таблицы истории: {error}")
+        return False
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return True
+
+
+def create_job_table(db_name: str, params: Dict[str, Any]) -> bool:
+    """
+    Создает таблицу заданий распределенной загрузки `ingest_jobs`. Каждое задание —
+    диапазон страниц вакансий одного работодателя (при необходимости с фильтрами шарда),
+    который рабочие процессы забирают через FOR UPDATE SKIP LOCKED под аренду.
+    :return: True, если объекты созданы без ошибок.
+    """
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                job_id BIGSERIAL PRIMARY KEY,
+                company_id INTEGER NOT NULL REFERENCES companies(company_id),
+                filters JSONB NOT NULL DEFAULT '{}',
+                page_from INTEGER NOT NULL,
+                page_to INTEGER NOT NULL,
+                status VARCHAR(16) NOT NULL DEFAULT 'pending'
+                    CHECK (status IN ('pending', 'running', 'done', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id VARCHAR(255),
+                lease_until TIMESTAMPTZ,
+                heartbeat_at TIMESTAMPTZ,
+                rows_loaded INTEGER,
+                error TEXT,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                UNIQUE (company_id, filters, page_from)
+            )
+        """)
+        # Очередь просматривается только по незавершенным заданиям
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS ingest_jobs_queue_idx
+            ON ingest_jobs (job_id)
+            WHERE status IN ('pending', 'running')
+        """)
+        print("Таблица `ingest_jobs` успешно создана.")
+
+        conn.commit()
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при создании таблицы заданий: {error}")
+        return False
     finally:
         if conn is not None:
             cur.close()
             conn.close()
+    return True
@@ -1,123 +1,712 @@
+import functools
+import itertools
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import date, timedelta
+
 import psycopg2
-from typing import List, Dict, Any
+from psycopg2.pool import ThreadedConnectionPool
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+
+from src.cache import QueryCache
+from src.metrics import metrics
+
+# Ошибки, после которых соединение считается оборванным, а запрос на чтение можно повторить
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+COMPANIES_COUNT_QUERY = """
+    SELECT c.company_name, COUNT(v.vacancy_id) AS vacancies_count
+    FROM companies c
+    LEFT JOIN vacancies v ON c.company_id = v.company_id AND NOT v.archived
+    GROUP BY c.company_name
+"""
+
+AVG_SALARY_QUERY = "SELECT salary_avg FROM salary_stats WHERE scope_id = 0"
+
+# Запросы по истории. Нижняя граница даты передается константой, поэтому
+# планировщик отсекает лишние партиции vacancy_snapshots еще при планировании.
+SALARY_TREND_QUERY = """
+    SELECT c.company_name, date_trunc('week', s.snapshot_date)::date AS week,
+           AVG(s.salary_mid_rub) AS avg_salary, COUNT(DISTINCT s.vacancy_id) AS vacancies_count
+    FROM vacancy_snapshots s
+    JOIN companies c ON s.company_id = c.company_id
+    WHERE s.snapshot_date >= %s AND s.salary_mid_rub IS NOT NULL
+    GROUP BY c.company_name, week
+    ORDER BY c.company_name, week
+"""
+
+VACANCY_COUNT_TREND_QUERY = """
+    SELECT c.company_name, s.snapshot_date, COUNT(*) AS vacancies_count
+    FROM vacancy_snapshots s
+    JOIN companies c ON s.company_id = c.company_id
+    WHERE s.snapshot_date >= %s
+    GROUP BY c.company_name, s.snapshot_date
+    ORDER BY c.company_name, s.snapshot_date
+"""
+
+# Общая часть запросов, возвращающих список вакансий
+VACANCIES_QUERY = """
+    SELECT v.vacancy_id, c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url
+    FROM vacancies v
+    JOIN companies c ON v.company_id = c.company_id
+    WHERE NOT v.archived
+"""
+
+# Средняя зарплата берется из salary_stats, сравнение идет по индексу vacancies_salary_mid_rub_idx
+HIGHER_SALARY_CONDITION = """
+    AND v.salary_mid_rub > (
+        SELECT salary_avg FROM salary_stats WHERE scope_id = 0
+    )
+"""
+
+# ILIKE с подстановкой обслуживается триграммным индексом vacancies_name_trgm_idx
+KEYWORD_CONDITION = " AND v.vacancy_name ILIKE %s"
+
+# Поиск с ранжированием: полнотекстовый (русская морфология) и по триграммному сходству
+SEARCH_QUERIES = {
+    "fulltext": """
+        SELECT v.vacancy_id, c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url,
+               ts_rank(v.vacancy_name_tsv, query) AS rank
+        FROM vacancies v
+        JOIN companies c ON v.company_id = c.company_id,
+             websearch_to_tsquery('russian', %(query)s) query
+        WHERE NOT v.archived AND v.vacancy_name_tsv @@ query
+        ORDER BY rank DESC, v.vacancy_id
+        LIMIT %(limit)s
+    """,
+    "trigram": """
+        SELECT v.vacancy_id, c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url,
+               similarity(v.vacancy_name, %(query)s) AS rank
+        FROM vacancies v
+        JOIN companies c ON v.company_id = c.company_id
+        WHERE NOT v.archived AND v.vacancy_name %% %(query)s
+        ORDER BY rank DESC, v.vacancy_id
+        LIMIT %(limit)s
+    """,
+}
+
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def to_numbered_query(query: str, args: Any = ()) -> Tuple[str, List[Any]]:
+    """
+    Переводит запрос в стиле psycopg2 (`%s`, `%(name)s`, `%%`) в стиль с нумерованными
+    параметрами (`$1`, `$2`, `%`), который используют asyncpg и DuckDB, чтобы все менеджеры
+    выполняли одни и те же SQL-запросы.
+    :param query: Запрос с параметрами psycopg2.
+    :param args: Кортеж позиционных параметров или словарь именованных.
+    :return: Запрос с нумерованными параметрами и список параметров в порядке номеров.
+    """
+    values: List[Any] = []
+    numbers: Dict[str, int] = {}
+    positional = iter(args) if not isinstance(args, dict) else None
+
+    def replace(match):
+        if match.group(0) == "%%":
+            return "%"
+        name = match.group(1)
+        if name is None:
+            values.append(next(positional))
+            return f"${len(values)}"
+        if name not in numbers:
+            values.append(args[name])
+            numbers[name] = len(values)
+        return f"${numbers[name]}"
+
+    return _PLACEHOLDER.sub(replace, query), values
+
+
+def cached(method: Callable) -> Callable:
+    """
+    Декоратор метода DBManager: кэширует результат по имени метода и аргументам,
+    если у менеджера задан кэш. Версия данных читается с того же сервера, на котором
+    выполняется запрос, чтобы результат отстающей реплики не попал в кэш под более
+    новой версией. Закэшированный результат возвращается как есть, поэтому изменять его нельзя.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache is None:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        server, version = self._read_server_version()
+        hit, value = self.cache.get(key, version)
+        if hit:
+            return value
+        self._local.server = server
+        try:
+            value = method(self, *args, **kwargs)
+        finally:
+            self._local.server = None
+        self.cache.put(key, value, version, self.cache.ttl_for(method.__name__))
+        return value
+    return wrapper
+
+
+def instrumented(method: Callable) -> Callable:
+    """
+    Декоратор метода DBManager: учитывает время выполнения и число возвращенных строк.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+        with metrics.timer("dbmanager_query_seconds", method=method.__name__):
+            result = method(self, *args, **kwargs)
+        if isinstance(result, list):
+            metrics.inc("dbmanager_rows_total", len(result), method=method.__name__)
+        return result
+    return wrapper
 
 
 class DBManager:
     """
     Класс для управления данными в базе данных PostgreSQL.
+    Соединения берутся из потокобезопасного пула, который создается при первом запросе.
+    Если заданы реплики, запросы на чтение распределяются между ними по кругу; реплика,
+    которая недоступна или отстает больше `max_replica_lag`, пропускается до следующей
+    проверки, а при отсутствии подходящих реплик запрос выполняется на основном сервере.
+    """
+    # Номер основного сервера в списке серверов; реплики нумеруются с единицы
+    PRIMARY = 0
+
+    # Отставание реплики в секундах. Если все полученные изменения уже применены,
+    # отставание нулевое, даже если на основной сервер давно ничего не записывалось.
+    # Реплика, которая не получает WAL с основного сервера (приемник WAL не в состоянии
+    # `streaming`), может бесконечно отдавать устаревшие данные, поэтому ее отставание
+    # считается неизвестным (NULL). Сервер не в режиме восстановления считается не отстающим.
+    REPLICA_LAG_QUERY = """
+        SELECT CASE
+                   WHEN NOT pg_is_in_recovery() THEN 0
+                   WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+                   WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                   ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+               END
     """
-    def __init__(self, db_name: str, params: Dict[str, Any]):
+
+    def __init__(self, db_name: str, params: Dict[str, Any], min_connections: int = 1,
+                 max_connections: int = 10, health_check_interval: float = 30.0,
+                 cache: Optional[QueryCache] = None, version_check_interval: float = 5.0,
+                 replicas: Optional[List[Dict[str, Any]]] = None, max_replica_lag: float = 30.0,
+                 replica_check_interval: float = 5.0):
         """
-        Инициализирует менеджер, устанавливая соединение с БД.
+        Инициализирует менеджер.
         :param db_name: Имя базы данных.
-        :param params: Параметры подключения к БД.
+        :param params: Параметры подключения к БД (основной сервер).
+        :param min_connections: Минимальное число соединений в пуле.
+        :param max_connections: Максимальное число соединений в пуле.
+        :param health_check_interval: Через сколько секунд простоя соединение проверяется
+                                      запросом `SELECT 1` перед выдачей.
+        :param cache: Кэш результатов запросов (по умолчанию кэширование отключено).
+        :param version_check_interval: Как часто (в секундах) сверять версию данных
+                                       из таблицы `data_version` для сброса кэша.
+        :param replicas: Параметры подключения к репликам для чтения (например, `{"host": ..., "port": ...}`);
+                         недостающие параметры берутся из `params`.
+        :param max_replica_lag: Максимальное отставание реплики в секундах.
+        :param replica_check_interval: Как часто (в секундах) проверять доступность и отставание реплики.
         """
         self.db_name = db_name
         self.params = params
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.health_check_interval = health_check_interval
+        self.replicas = [dict(params, **replica) for replica in replicas or []]
+        self.max_replica_lag = max_replica_lag
+        self.replica_check_interval = replica_check_interval
+        self._servers = [params] + self.replicas
+        self._pools: Dict[int, ThreadedConnectionPool] = {}
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool не ждет освобождения соединения, поэтому ожидание делает семафор
+        self._slots = [threading.BoundedSemaphore(max_connections) for _ in self._servers]
+        self._last_used: Dict[int, float] = {}
+        # Состояние реплик: номер -> (пригодна ли для чтения, время проверки)
+        self._replica_status: Dict[int, Tuple[bool, float]] = {}
+        self._replica_locks = {server: threading.Lock() for server in range(1, len(self._servers))}
+        self._next_replica = itertools.count()
+        self.cache = cache
+        self.version_check_interval = version_check_interval
+        # Версии данных по серверам: номер -> (версия, время проверки)
+        self._versions: Dict[int, Tuple[int, float]] = {}
+        self._version_lock = threading.Lock()
+        # Сервер, закрепленный за текущим потоком на время кэшируемого запроса
+        self._local = threading.local()
 
-    def get_companies_and_vacancies_count(self) -> List[Dict[str, Any]]:
+    def __enter__(self) -> "DBManager":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
         """
-        Получает список всех компаний и количество вакансий у каждой.
+        Закрывает все соединения пулов.
+        """
+        with self._pool_lock:
+            for pool in self._pools.values():
+                pool.closeall()
+            self._pools.clear()
+            self._last_used.clear()
+
+    def _get_pool(self, server: int = PRIMARY) -> ThreadedConnectionPool:
+        """
+        Возвращает пул соединений сервера, создавая его при первом обращении.
+        :param server: Номер сервера (`PRIMARY` или номер реплики).
+        """
+        with self._pool_lock:
+            if server not in self._pools:
+                self._pools[server] = ThreadedConnectionPool(
+                    self.min_connections, self.max_connections, dbname=self.db_name, **self._servers[server]
+                )
+            return self._pools[server]
+
+    def _is_healthy(self, conn) -> bool:
+        """
+        Проверяет соединение перед выдачей из пула.
+        Соединения, которые использовались недавно, не проверяются запросом.
+        """
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _checkout(self, pool: ThreadedConnectionPool):
+        """
+        Берет из пула рабочее соединение, закрывая неисправные.
+        """
+        for _ in range(self.max_connections + 1):
+            conn = pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            self._last_used.pop(id(conn), None)
+            pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Не удалось получить рабочее соединение из пула.")
+
+    def _replica_available(self, server: int) -> bool:
+        """
+        Проверяет, что реплика доступна и отстает не больше `max_replica_lag`.
+        Результат проверки действует `replica_check_interval` секунд.
+        """
+        available, checked_at = self._replica_status.get(server, (False, None))
+        if checked_at is not None and time.monotonic() - checked_at < self.replica_check_interval:
+            return available
+        with self._replica_locks[server]:
+            available, checked_at = self._replica_status.get(server, (False, None))
+            if checked_at is not None and time.monotonic() - checked_at < self.replica_check_interval:
+                return available
+            try:
+                with self._server_connection(server) as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(self.REPLICA_LAG_QUERY)
+                        lag = cur.fetchone()[0]
+                if lag is None:
+                    available = False
+                    print(f"Реплика {self._servers[server].get('host')} не получает WAL с основного сервера "
+                          f"и не используется для чтения.")
+                else:
+                    available = float(lag) <= self.max_replica_lag
+                    if not available:
+                        print(f"Реплика {self._servers[server].get('host')} отстает на {float(lag):.1f} с "
+                              f"и не используется для чтения.")
+            except psycopg2.Error as error:
+                available = False
+                print(f"Реплика {self._servers[server].get('host')} недоступна: {error}")
+            if not available:
+                metrics.inc("dbmanager_replica_unavailable_total", replica=server)
+            self._replica_status[server] = (available, time.monotonic())
+            return available
+
+    def _mark_replica_unavailable(self, server: int) -> None:
+        """
+        Исключает реплику из чтения до следующей проверки.
+        """
+        self._replica_status[server] = (False, time.monotonic())
+        metrics.inc("dbmanager_replica_unavailable_total", replica=server)
+
+    def _read_server(self) -> int:
+        """
+        Выбирает сервер для чтения: следующую по кругу пригодную реплику или основной сервер.
+        """
+        if not self.replicas:
+            return self.PRIMARY
+        start = next(self._next_replica)
+        for offset in range(len(self.replicas)):
+            server = 1 + (start + offset) % len(self.replicas)
+            if self._replica_available(server):
+                return server
+        metrics.inc("dbmanager_replica_fallback_total")
+        return self.PRIMARY
+
+    def _data_version(self, server: int = PRIMARY) -> int:
+        """
+        Возвращает версию данных, которую загрузчик увеличивает при каждой записи.
+        Версия читается с указанного сервера не чаще, чем раз в `version_check_interval` секунд;
+        при изменении версии на сервере кэш сбрасывается.
+        :param server: Номер сервера, с которого читается версия.
+        """
+        with self._version_lock:
+            now = time.monotonic()
+            version, checked_at = self._versions.get(server, (None, 0.0))
+            if version is None or now - checked_at >= self.version_check_interval:
+                previous = version
+                version = self._fetch_from(server, "SELECT version FROM data_version", ())[0][0]
+                if previous is not None and version != previous:
+                    self.cache.invalidate()
+                self._versions[server] = (version, now)
+            return version
+
+    def _read_server_version(self) -> Tuple[int, int]:
+        """
+        Выбирает сервер для чтения и возвращает его номер вместе с версией данных на нем.
+        Если реплика оборвала соединение при чтении версии, она исключается из чтения
+        и используется основной сервер.
+        """
+        server = self._read_server()
+        if server != self.PRIMARY:
+            try:
+                return server, self._data_version(server)
+            except CONNECTION_ERRORS as error:
+                print(f"Реплика {self._servers[server].get('host')} недоступна, "
+                      f"чтение с основного сервера: {error}")
+                self._mark_replica_unavailable(server)
+        return self.PRIMARY, self._data_version(self.PRIMARY)
+
+    def invalidate_cache(self) -> None:
+        """
+        Сбрасывает кэш результатов запросов.
+        """
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    def cache_stats(self) -> Dict[str, Any]:
         """
-        with psycopg2.connect(dbname=self.db_name, **self.params) as conn:
+        Возвращает статистику кэша (пустой словарь, если кэш отключен).
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    def _pinned_server(self) -> int:
+        """
+        Возвращает сервер, закрепленный за кэшируемым запросом текущего потока,
+        а если его нет — выбирает сервер для чтения.
+        """
+        server = getattr(self._local, "server", None)
+        return self._read_server() if server is None else server
+
+    @contextmanager
+    def _server_connection(self, server: int = PRIMARY) -> Iterator[Any]:
+        """
+        Выдает соединение с сервером из его пула и возвращает его обратно после использования.
+        Если все соединения заняты, ожидает освобождения.
+        """
+        self._slots[server].acquire()
+        conn = None
+        pool = None
+        broken = False
+        try:
+            pool = self._get_pool(server)
+            conn = self._checkout(pool)
+            try:
+                yield conn
+            except CONNECTION_ERRORS:
+                # Соединение оборвалось: оно закрывается, а остальные соединения пулов
+                # проверяются запросом при следующей выдаче
+                broken = True
+                self._last_used.clear()
+                raise
+            finally:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+        finally:
+            if conn is not None:
+                if broken:
+                    self._last_used.pop(id(conn), None)
+                else:
+                    self._last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn, close=broken or bool(conn.closed))
+            self._slots[server].release()
+
+    @contextmanager
+    def _connection(self, read_only: bool = True) -> Iterator[Any]:
+        """
+        Выдает соединение для запроса. Запросы на чтение направляются на реплику
+        (см. `_read_server`); если соединение с репликой получить не удалось,
+        она исключается из чтения и запрос выполняется на основном сервере.
+        Обрыв соединения во время запроса не перехватывается: для запросов,
+        которые можно повторить, используется `_fetch`.
+        :param read_only: Можно ли выполнить запрос на реплике.
+        """
+        server = self._pinned_server() if read_only else self.PRIMARY
+        with ExitStack() as stack:
+            conn = None
+            if server != self.PRIMARY:
+                try:
+                    conn = stack.enter_context(self._server_connection(server))
+                except psycopg2.OperationalError as error:
+                    print(f"Реплика {self._servers[server].get('host')} недоступна, "
+                          f"чтение с основного сервера: {error}")
+                    self._mark_replica_unavailable(server)
+                    server = self.PRIMARY
+            if conn is None:
+                conn = stack.enter_context(self._server_connection(self.PRIMARY))
+            metrics.inc("dbmanager_reads_total", server=server)
+            yield conn
+
+    def _fetch_from(self, server: int, query: str, args: Any) -> List[Tuple]:
+        """
+        Выполняет запрос на сервере и возвращает все строки.
+        """
+        with self._server_connection(server) as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT c.company_name, COUNT(v.vacancy_id) AS vacancies_count
-                    FROM companies c
-                    LEFT JOIN vacancies v ON c.company_id = v.company_id
-                    GROUP BY c.company_name;
-                """)
+                cur.execute(query, args)
                 rows = cur.fetchall()
-                results = []
-                for row in rows:
-                    results.append({"company_name": row[0], "vacancies_count": row[1]})
-                return results
+        metrics.inc("dbmanager_reads_total", server=server)
+        return rows
+
+    def _fetch(self, query: str, args: Any = ()) -> List[Tuple]:
+        """
+        Выполняет запрос на чтение и возвращает все строки. Если соединение с репликой
+        не удалось получить или оно оборвалось во время запроса, реплика исключается
+        из чтения; если оборвалось соединение с основным сервером (например, устаревшее
+        соединение из пула), соединение закрывается. В обоих случаях запрос один раз
+        повторяется на основном сервере.
+        :param query: SQL-запрос.
+        :param args: Параметры запроса.
+        """
+        server = self._pinned_server()
+        try:
+            return self._fetch_from(server, query, args)
+        except CONNECTION_ERRORS as error:
+            if server != self.PRIMARY:
+                print(f"Реплика {self._servers[server].get('host')} недоступна, "
+                      f"чтение с основного сервера: {error}")
+                self._mark_replica_unavailable(server)
+            else:
+                print(f"Соединение с основным сервером оборвалось, запрос повторяется: {error}")
+            metrics.inc("dbmanager_read_retries_total")
+        return self._fetch_from(self.PRIMARY, query, args)
+
+    # Счетчик для уникальных имен серверных курсоров
+    _cursor_ids = itertools.count()
 
-    def get_all_vacancies(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _vacancy_from_row(row: Tuple) -> Dict[str, Any]:
+        """
+        Преобразует строку результата `VACANCIES_QUERY` в словарь.
+        """
+        return {
+            "vacancy_id": row[0],
+            "company_name": row[1],
+            "vacancy_name": row[2],
+            "salary_from": row[3],
+            "salary_to": row[4],
+            "url": row[5]
+        }
+
+    @staticmethod
+    def _vacancies_query(condition: str, args: Tuple, after_vacancy_id: Optional[int],
+                         limit: Optional[int]) -> Tuple[str, Tuple]:
+        """
+        Собирает запрос списка вакансий с keyset-пагинацией по `vacancy_id`.
+        :param condition: Дополнительное условие фильтрации (начинается с AND).
+        :param args: Параметры условия.
+        :param after_vacancy_id: Вернуть вакансии с ID строго больше указанного.
+        :param limit: Максимальное число строк.
+        """
+        query = VACANCIES_QUERY + condition
+        if after_vacancy_id is not None:
+            query += " AND v.vacancy_id > %s"
+            args += (after_vacancy_id,)
+        if after_vacancy_id is not None or limit is not None:
+            query += " ORDER BY v.vacancy_id"
+        if limit is not None:
+            query += " LIMIT %s"
+            args += (limit,)
+        return query, args
+
+    def _fetch_vacancies(self, condition: str = "", args: Tuple = (), after_vacancy_id: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Выполняет запрос списка вакансий и возвращает результат целиком.
+        """
+        rows = self._fetch(*self._vacancies_query(condition, args, after_vacancy_id, limit))
+        return [self._vacancy_from_row(row) for row in rows]
+
+    def _iter_vacancies(self, condition: str = "", args: Tuple = (),
+                        itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Выполняет запрос списка вакансий через именованный (серверный) курсор
+        и отдает строки по мере чтения, получая их с сервера порциями по `itersize`.
+        Соединение занято, пока итератор не исчерпан или не закрыт.
+        """
+        query, args = self._vacancies_query(condition, args, None, None)
+        with self._connection() as conn:
+            with conn.cursor(name=f"dbmanager_cursor_{next(self._cursor_ids)}") as cur:
+                cur.itersize = itersize
+                cur.execute(query, args)
+                for row in cur:
+                    yield self._vacancy_from_row(row)
+
+    @instrumented
+    @cached
+    def get_companies_and_vacancies_count(self) -> List[Dict[str, Any]]:
+        """
+        Получает список всех компаний и количество вакансий у каждой.
+        """
+        results = []
+        for row in self._fetch(COMPANIES_COUNT_QUERY):
+            results.append({"company_name": row[0], "vacancies_count": row[1]})
+        return results
+
+    @instrumented
+    @cached
+    def get_all_vacancies(self, after_vacancy_id: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Получает список всех вакансий с указанием названия компании,
         вакансии, зарплаты и ссылки на вакансию.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
         """
-        with psycopg2.connect(dbname=self.db_name, **self.params) as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url
-                    FROM vacancies v
-                    JOIN companies c ON v.company_id = c.company_id;
-                """)
-                rows = cur.fetchall()
-                results = []
-                for row in rows:
-                    results.append({
-                        "company_name": row[0],
-                        "vacancy_name": row[1],
-                        "salary_from": row[2],
-                        "salary_to": row[3],
-                        "url": row[4]
-                    })
-                return results
+        return self._fetch_vacancies(after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_all_vacancies(self, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает все вакансии, читая их серверным курсором.
+        :param itersize: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(itersize=itersize)
 
+    @instrumented
+    @cached
     def get_avg_salary(self) -> float:
         """
-        Получает среднюю зарплату по вакансиям.
+        Получает среднюю зарплату по вакансиям из представления `salary_stats`.
         """
-        with psycopg2.connect(dbname=self.db_name, **self.params) as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT AVG(COALESCE(salary_from, 0) + COALESCE(salary_to, 0)) / 2
-                    FROM vacancies
-                    WHERE salary_from IS NOT NULL OR salary_to IS NOT NULL;
-                """)
-                avg_salary = cur.fetchone()[0]
-                return float(avg_salary) if avg_salary else 0.0
+        rows = self._fetch(AVG_SALARY_QUERY)
+        avg_salary = rows[0][0] if rows else None
+        return float(avg_salary) if avg_salary else 0.0
+
+    @instrumented
+    @cached
+    def get_salary_stats(self) -> List[Dict[str, Any]]:
+        """
+        Получает статистику зарплат по каждой компании и по всем вакансиям
+        (строка с `company_name = None`): количество, сумму, среднее и перцентили.
+        """
+        rows = self._fetch("""
+            SELECT c.company_name, s.vacancies_count, s.salary_sum, s.salary_avg,
+                   s.salary_p25, s.salary_median, s.salary_p75, s.salary_p90
+            FROM salary_stats s
+            LEFT JOIN companies c ON s.company_id = c.company_id
+            ORDER BY s.scope_id;
+        """)
+        keys = ("company_name", "vacancies_count", "salary_sum", "salary_avg",
+                "salary_p25", "salary_median", "salary_p75", "salary_p90")
+        results = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            for key in keys[2:]:
+                item[key] = float(item[key]) if item[key] is not None else None
+            results.append(item)
+        return results
 
-    def get_vacancies_with_higher_salary(self) -> List[Dict[str, Any]]:
+    @instrumented
+    @cached
+    def get_vacancies_with_higher_salary(self, after_vacancy_id: Optional[int] = None,
+                                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Получает список всех вакансий, у которых зарплата выше средней.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
         """
-        with psycopg2.connect(dbname=self.db_name, **self.params) as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url
-                    FROM vacancies v
-                    JOIN companies c ON v.company_id = c.company_id
-                    WHERE (COALESCE(v.salary_from, 0) + COALESCE(v.salary_to, 0)) / 2 > (
-                        SELECT AVG(COALESCE(salary_from, 0) + COALESCE(salary_to, 0)) / 2
-                        FROM vacancies
-                        WHERE salary_from IS NOT NULL OR salary_to IS NOT NULL
-                    );
-                """)
-                rows = cur.fetchall()
-                results = []
-                for row in rows:
-                    results.append({
-                        "company_name": row[0],
-                        "vacancy_name": row[1],
-                        "salary_from": row[2],
-                        "salary_to": row[3],
-                        "url": row[4]
-                    })
-                return results
-
-    def get_vacancies_with_keyword(self, keyword: str) -> List[Dict[str, Any]]:
+        return self._fetch_vacancies(HIGHER_SALARY_CONDITION, after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_vacancies_with_higher_salary(self, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает вакансии с зарплатой выше средней.
+        :param itersize: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(HIGHER_SALARY_CONDITION, itersize=itersize)
+
+    @instrumented
+    @cached
+    def get_vacancies_with_keyword(self, keyword: str, after_vacancy_id: Optional[int] = None,
+                                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Получает список вакансий, в названии которых есть ключевое слово.
         :param keyword: Ключевое слово для поиска.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
         """
-        with psycopg2.connect(dbname=self.db_name, **self.params) as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT c.company_name, v.vacancy_name, v.salary_from, v.salary_to, v.url FROM vacancies v JOIN companies c ON v.company_id = c.company_id WHERE v.vacancy_name ILIKE %s",
-                    ('%' + keyword + '%',)
-                )
-                rows = cur.fetchall()
-                results = []
-                for row in rows:
-                    results.append({
-                        "company_name": row[0],
-                        "vacancy_name": row[1],
-                        "salary_from": row[2],
-                        "salary_to": row[3],
-                        "url": row[4]
-                    })
-                return results
+        return self._fetch_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), after_vacancy_id, limit)
+
+    def iter_vacancies_with_keyword(self, keyword: str, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает вакансии, в названии которых есть ключевое слово.
+        :param keyword: Ключевое слово для поиска.
+        :param itersize: Сколько строк получать с сервера за один раз.
+        """
+        return self._iter_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), itersize)
+
+    @instrumented
+    @cached
+    def search_vacancies(self, query: str, mode: str = "fulltext", limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Ищет вакансии с ранжированием по релевантности, используя GIN-индексы.
+        :param query: Поисковый запрос.
+        :param mode: `fulltext` — полнотекстовый поиск с русской морфологией
+                     (поддерживает синтаксис websearch: кавычки, `or`, `-`);
+                     `trigram` — поиск по триграммному сходству, устойчивый к опечаткам.
+        :param limit: Максимальное число результатов.
+        :return: Вакансии с полем `rank`, отсортированные по убыванию релевантности.
+        """
+        if mode not in SEARCH_QUERIES:
+            raise ValueError(f"Неизвестный режим поиска: {mode}")
+        results = []
+        for row in self._fetch(SEARCH_QUERIES[mode], {"query": query, "limit": limit}):
+            vacancy = self._vacancy_from_row(row)
+            vacancy["rank"] = float(row[6])
+            results.append(vacancy)
+        return results
+
+    @instrumented
+    @cached
+    def get_avg_salary_trend(self, weeks: int = 12) -> List[Dict[str, Any]]:
+        """
+        Получает среднюю зарплату по каждой компании по неделям из истории снимков.
+        :param weeks: За сколько последних недель строить тренд.
+        """
+        since = date.today() - timedelta(weeks=weeks)
+        results = []
+        for row in self._fetch(SALARY_TREND_QUERY, (since,)):
+            results.append({
+                "company_name": row[0],
+                "week": row[1],
+                "avg_salary": float(row[2]) if row[2] is not None else 0.0,
+                "vacancies_count": row[3]
+            })
+        return results
+
+    @instrumented
+    @cached
+    def get_vacancy_count_trend(self, days: int = 90) -> List[Dict[str, Any]]:
+        """
+        Получает количество открытых вакансий каждой компании по дням снимков.
+        :param days: За сколько последних дней строить тренд.
+        """
+        since = date.today() - timedelta(days=days)
+        results = []
+        for row in self._fetch(VACANCY_COUNT_TREND_QUERY, (since,)):
+            results.append({"company_name": row[0], "snapshot_date": row[1], "vacancies_count": row[2]})
+        return results
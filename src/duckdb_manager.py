@@ -0,0 +1,169 @@
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import duckdb
+except ImportError:  # duckdb нужен только для работы со снимком
+    duckdb = None
+
+from src.db_manager import (
+    AVG_SALARY_QUERY, COMPANIES_COUNT_QUERY, HIGHER_SALARY_CONDITION, KEYWORD_CONDITION, DBManager,
+    to_numbered_query
+)
+
+# Представления поверх файлов снимка. Названия и колонки совпадают с таблицами PostgreSQL,
+# поэтому запросы DBManager выполняются без изменений. В снимке только открытые вакансии,
+# а `salary_stats` вычисляется на лету векторизованным агрегатом.
+SNAPSHOT_VIEWS = (
+    "CREATE VIEW companies AS SELECT * FROM read_parquet({companies})",
+    "CREATE VIEW vacancies AS SELECT *, FALSE AS archived FROM read_parquet({vacancies})",
+    """
+    CREATE VIEW salary_stats AS
+    SELECT 0 AS scope_id, AVG(salary_mid_rub) AS salary_avg
+    FROM vacancies
+    WHERE salary_mid_rub IS NOT NULL
+    """,
+)
+
+
+class DuckDBManager:
+    """
+    Вариант DBManager только для чтения, который отвечает на запросы по Parquet-снимку
+    (см. `export.export_snapshot`) встроенной колоночной СУБД DuckDB, без подключения к PostgreSQL.
+    """
+    def __init__(self, snapshot_dir: str, threads: Optional[int] = None):
+        """
+        :param snapshot_dir: Каталог с файлами `companies.parquet` и `vacancies.parquet`.
+        :param threads: Число потоков DuckDB (по умолчанию — по числу ядер).
+        """
+        if duckdb is None:
+            raise ImportError("Для DuckDBManager требуется пакет duckdb.")
+        self.snapshot_dir = snapshot_dir
+        self._conn = duckdb.connect(database=":memory:")
+        if threads:
+            self._conn.execute(f"SET threads = {int(threads)}")
+        # В определении представления параметры запроса недоступны, поэтому пути подставляются литералами
+        paths = {
+            table: "'" + os.path.join(snapshot_dir, f"{table}.parquet").replace("'", "''") + "'"
+            for table in ("companies", "vacancies")
+        }
+        for view in SNAPSHOT_VIEWS:
+            self._conn.execute(view.format(**paths))
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DuckDBManager":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрывает соединение DuckDB.
+        """
+        self._conn.close()
+
+    def _fetch(self, query: str, args: Any = ()) -> List[Tuple]:
+        """
+        Выполняет запрос в стиле psycopg2 и возвращает все строки.
+        Соединение DuckDB не потокобезопасно, поэтому каждый поток получает свой курсор.
+        """
+        query, values = to_numbered_query(query, args)
+        with self._lock:
+            cur = self._conn.cursor()
+        try:
+            return cur.execute(query, values).fetchall()
+        finally:
+            cur.close()
+
+    def _fetch_vacancies(self, condition: str = "", args: Tuple = (), after_vacancy_id: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Выполняет запрос списка вакансий и возвращает результат целиком.
+        """
+        rows = self._fetch(*DBManager._vacancies_query(condition, args, after_vacancy_id, limit))
+        return [DBManager._vacancy_from_row(row) for row in rows]
+
+    def _iter_vacancies(self, condition: str = "", args: Tuple = (),
+                        itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Отдает вакансии порциями по `itersize`, не материализуя весь результат в Python.
+        """
+        query, values = to_numbered_query(*DBManager._vacancies_query(condition, args, None, None))
+        with self._lock:
+            cur = self._conn.cursor()
+        try:
+            cur.execute(query, values)
+            while True:
+                rows: Sequence[Tuple] = cur.fetchmany(itersize)
+                if not rows:
+                    break
+                for row in rows:
+                    yield DBManager._vacancy_from_row(row)
+        finally:
+            cur.close()
+
+    def get_companies_and_vacancies_count(self) -> List[Dict[str, Any]]:
+        """
+        Получает список всех компаний и количество вакансий у каждой.
+        """
+        return [{"company_name": row[0], "vacancies_count": row[1]} for row in self._fetch(COMPANIES_COUNT_QUERY)]
+
+    def get_all_vacancies(self, after_vacancy_id: Optional[int] = None,
+                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список всех вакансий.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return self._fetch_vacancies(after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_all_vacancies(self, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает все вакансии.
+        :param itersize: Размер порции.
+        """
+        return self._iter_vacancies(itersize=itersize)
+
+    def get_avg_salary(self) -> float:
+        """
+        Получает среднюю зарплату по вакансиям (в рублях на руки).
+        """
+        rows = self._fetch(AVG_SALARY_QUERY)
+        avg_salary = rows[0][0] if rows else None
+        return float(avg_salary) if avg_salary else 0.0
+
+    def get_vacancies_with_higher_salary(self, after_vacancy_id: Optional[int] = None,
+                                         limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список всех вакансий, у которых зарплата выше средней.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return self._fetch_vacancies(HIGHER_SALARY_CONDITION, after_vacancy_id=after_vacancy_id, limit=limit)
+
+    def iter_vacancies_with_higher_salary(self, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает вакансии с зарплатой выше средней.
+        :param itersize: Размер порции.
+        """
+        return self._iter_vacancies(HIGHER_SALARY_CONDITION, itersize=itersize)
+
+    def get_vacancies_with_keyword(self, keyword: str, after_vacancy_id: Optional[int] = None,
+                                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Получает список вакансий, в названии которых есть ключевое слово.
+        :param keyword: Ключевое слово для поиска.
+        :param after_vacancy_id: Для постраничного чтения — ID последней вакансии предыдущей страницы.
+        :param limit: Размер страницы.
+        """
+        return self._fetch_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), after_vacancy_id, limit)
+
+    def iter_vacancies_with_keyword(self, keyword: str, itersize: int = 2000) -> Iterator[Dict[str, Any]]:
+        """
+        Потоково отдает вакансии, в названии которых есть ключевое слово.
+        :param keyword: Ключевое слово для поиска.
+        :param itersize: Размер порции.
+        """
+        return self._iter_vacancies(KEYWORD_CONDITION, ('%' + keyword + '%',), itersize)
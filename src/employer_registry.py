@@ -0,0 +1,72 @@
+from typing import Any, Dict, List
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+
+class EmployerRegistry:
+    """
+    Постоянное соответствие названий компаний из настроек их ID на hh.ru,
+    хранящееся в таблице `employer_registry`. Позволяет не искать работодателей
+    заново при каждом создании HHApi.
+    """
+    def __init__(self, db_name: str, params: Dict[str, Any]):
+        """
+        :param db_name: Имя базы данных.
+        :param params: Параметры подключения к БД.
+        """
+        self.db_name = db_name
+        self.params = params
+
+    def load(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает уже найденных работодателей для указанных названий.
+        :param names: Названия компаний.
+        :return: Словарь в формате `HHApi.companies` (только известные названия).
+        """
+        companies = {}
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname=self.db_name, **self.params)
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT query_name, company_id, company_name, url FROM employer_registry WHERE query_name = ANY(%s)",
+                (list(names),)
+            )
+            for query_name, company_id, company_name, url in cur.fetchall():
+                companies[query_name] = {"id": company_id, "name": company_name, "url": url}
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(f"Ошибка при чтении реестра работодателей: {error}")
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
+        return companies
+
+    def save(self, companies: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Сохраняет найденных работодателей.
+        :param companies: Словарь в формате `HHApi.companies`.
+        """
+        if not companies:
+            return
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname=self.db_name, **self.params)
+            cur = conn.cursor()
+            execute_values(
+                cur,
+                """
+                INSERT INTO employer_registry (query_name, company_id, company_name, url) VALUES %s
+                ON CONFLICT (query_name) DO UPDATE SET company_id = EXCLUDED.company_id,
+                    company_name = EXCLUDED.company_name, url = EXCLUDED.url, resolved_at = now()
+                """,
+                [(name, info['id'], info['name'], info['url']) for name, info in companies.items()]
+            )
+            conn.commit()
+        except (Exception, psycopg2.DatabaseError) as error:
+            print(f"Ошибка при сохранении реестра работодателей: {error}")
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
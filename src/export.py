@@ -0,0 +1,207 @@
+import csv
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+import psycopg2
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow нужен только для выгрузки в Parquet
+    pyarrow = None
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# Схема строк `DBManager._vacancy_from_row`: задается явно, чтобы тип колонки
+# не зависел от того, встретились ли в первой порции только NULL
+VACANCY_FIELDS = (
+    ("vacancy_id", "int64"),
+    ("company_name", "string"),
+    ("vacancy_name", "string"),
+    ("salary_from", "int64"),
+    ("salary_to", "int64"),
+    ("url", "string"),
+)
+
+# Колонки Parquet-снимка базы данных для `DuckDBManager`
+SNAPSHOT_TABLES = {
+    "companies": (
+        "SELECT company_id, company_name, url FROM companies ORDER BY company_id",
+        (("company_id", "int64"), ("company_name", "string"), ("url", "string")),
+    ),
+    "vacancies": (
+        """
+        SELECT vacancy_id, company_id, vacancy_name, salary_from, salary_to, url, published_at,
+               salary_currency, salary_gross, salary_mid_rub::float8
+        FROM vacancies
+        WHERE NOT archived
+        ORDER BY vacancy_id
+        """,
+        (("vacancy_id", "int64"), ("company_id", "int64"), ("vacancy_name", "string"), ("salary_from", "int64"),
+         ("salary_to", "int64"), ("url", "string"), ("published_at", "timestamp[us, tz=UTC]"),
+         ("salary_currency", "string"), ("salary_gross", "bool"), ("salary_mid_rub", "float64")),
+    ),
+}
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], stream: TextIO) -> int:
+    """
+    Пишет строки в CSV по мере получения. Заголовок берется из ключей первой строки.
+    :param rows: Строки-словари (список или итератор).
+    :param stream: Текстовый поток для записи.
+    :return: Количество записанных строк.
+    """
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(stream, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], stream: TextIO) -> int:
+    """
+    Пишет строки в формате JSON Lines (один объект на строку) по мере получения.
+    Даты и Decimal записываются строками.
+    :param rows: Строки-словари (список или итератор).
+    :param stream: Текстовый поток для записи.
+    :return: Количество записанных строк.
+    """
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False, default=str))
+        stream.write("\n")
+        count += 1
+    return count
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], path: str, fields: Optional[Iterable[tuple]] = None,
+                  batch_size: int = 50000) -> int:
+    """
+    Пишет строки в Parquet порциями по `batch_size`: каждая порция становится
+    отдельной группой строк, поэтому в памяти одновременно находится только одна порция.
+    :param rows: Строки-словари (список или итератор).
+    :param path: Путь к файлу.
+    :param fields: Пары (колонка, тип pyarrow); если не заданы, схема определяется по первой порции.
+    :param batch_size: Размер группы строк.
+    :return: Количество записанных строк.
+    """
+    if pyarrow is None:
+        raise ImportError("Для выгрузки в Parquet требуется пакет pyarrow.")
+    schema = pyarrow.schema([(name, _arrow_type(kind)) for name, kind in fields]) if fields else None
+    writer = None
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer, schema = _write_parquet_batch(writer, schema, batch, path)
+                count += len(batch)
+                batch = []
+        if batch or writer is None:
+            writer, schema = _write_parquet_batch(writer, schema, batch, path)
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def _arrow_type(kind: str):
+    """
+    Возвращает тип pyarrow по его имени (`int64`, `string`, `timestamp[us, tz=UTC]`).
+    """
+    if kind.startswith("timestamp["):
+        unit, _, tz = kind[len("timestamp["):-1].partition(", tz=")
+        return pyarrow.timestamp(unit, tz=tz or None)
+    return pyarrow.type_for_alias(kind)
+
+
+def _write_parquet_batch(writer, schema, batch: List[Dict[str, Any]], path: str):
+    """
+    Записывает порцию строк, при первой записи открывая файл.
+    """
+    table = pyarrow.Table.from_pylist(batch, schema=schema)
+    if writer is None:
+        writer = pyarrow.parquet.ParquetWriter(path, table.schema)
+    writer.write_table(table)
+    return writer, table.schema
+
+
+def export_rows(rows: Iterable[Dict[str, Any]], fmt: str, stream: Optional[TextIO] = None,
+                path: Optional[str] = None, fields: Optional[Iterable[tuple]] = None) -> int:
+    """
+    Выгружает строки в выбранном формате.
+    :param rows: Строки-словари (список или итератор).
+    :param fmt: `csv`, `jsonl` или `parquet`.
+    :param stream: Поток для текстовых форматов.
+    :param path: Файл для Parquet.
+    :param fields: Схема для Parquet (см. `write_parquet`).
+    :return: Количество записанных строк.
+    """
+    if fmt == "csv":
+        return write_csv(rows, stream)
+    if fmt == "jsonl":
+        return write_jsonl(rows, stream)
+    if fmt == "parquet":
+        if path is None:
+            raise ValueError("Для формата parquet нужно указать файл вывода.")
+        return write_parquet(rows, path, fields)
+    raise ValueError(f"Неизвестный формат: {fmt}")
+
+
+def _iter_table(cur, query: str, columns: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Отдает строки запроса как словари по мере чтения серверным курсором.
+    """
+    cur.execute(query)
+    for row in cur:
+        yield dict(zip(columns, row))
+
+
+def export_snapshot(db_name: str, params: Dict[str, Any], directory: str,
+                    batch_size: int = 50000) -> Dict[str, int]:
+    """
+    Выгружает таблицы `companies` и открытые вакансии из `vacancies` в Parquet-снимок
+    (`companies.parquet`, `vacancies.parquet`) для `DuckDBManager`. Таблицы читаются
+    серверными курсорами в одной транзакции, файлы заменяются только после полной записи;
+    при ошибке недописанные временные файлы удаляются.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param directory: Каталог снимка.
+    :param batch_size: Размер группы строк Parquet.
+    :return: Количество выгруженных строк по таблицам.
+    """
+    if pyarrow is None:
+        raise ImportError("Для выгрузки в Parquet требуется пакет pyarrow.")
+    os.makedirs(directory, exist_ok=True)
+    counts: Dict[str, int] = {}
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        conn.set_session(readonly=True, isolation_level="REPEATABLE READ")
+        for table, (query, fields) in SNAPSHOT_TABLES.items():
+            path = os.path.join(directory, f"{table}.parquet")
+            with conn.cursor(name=f"snapshot_{table}") as cur:
+                cur.itersize = batch_size
+                rows = _iter_table(cur, query, [name for name, _ in fields])
+                counts[table] = write_parquet(rows, path + ".tmp", fields, batch_size)
+        for table in SNAPSHOT_TABLES:
+            path = os.path.join(directory, f"{table}.parquet")
+            os.replace(path + ".tmp", path)
+        print(f"Снимок сохранен в {directory}: компаний {counts['companies']}, вакансий {counts['vacancies']}.")
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при выгрузке снимка: {error}")
+    finally:
+        if conn is not None:
+            conn.close()
+        for table in SNAPSHOT_TABLES:
+            path = os.path.join(directory, f"{table}.parquet.tmp")
+            if os.path.exists(path):
+                os.remove(path)
+    return counts
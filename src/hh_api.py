@@ -1,59 +1,569 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from email.utils import parsedate_to_datetime
+
 import requests
-from typing import List, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from src.employer_registry import EmployerRegistry
+from src.http_cache import ResponseCache
+from src.metrics import metrics
+from src.models import VacancyRecord
+from src.sharding import MAX_RESULTS, plan_shards, unique_items
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Символы, которые не учитываются при сравнении названий работодателей
+_NAME_NOISE = re.compile(r"[\"'«»“”„.,]")
+
+
+def normalize_employer_name(name: str) -> str:
+    """
+    Приводит название работодателя к виду для сравнения: нижний регистр,
+    без кавычек и знаков препинания, с одиночными пробелами.
+    """
+    return " ".join(_NAME_NOISE.sub(" ", name.lower()).split())
+
+
+class RateLimiter:
+    """
+    Потокобезопасный ограничитель частоты запросов.
+    Распределяет запросы равномерно: не более `requests_per_second` запросов в секунду
+    на все потоки, использующие один экземпляр.
+    """
+    def __init__(self, requests_per_second: float):
+        """
+        :param requests_per_second: Максимальное число запросов в секунду (0 — без ограничений).
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        """
+        Блокирует поток до момента, когда разрешен следующий запрос.
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class RequestStats:
+    """
+    Потокобезопасная статистика HTTP-запросов: счетчики, суммарное время
+    и время последних запросов.
+    """
+    def __init__(self, history_size: int = 1000):
+        """
+        :param history_size: Сколько последних запросов хранить в `timings`.
+        """
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.timings = deque(maxlen=history_size)
+
+    def record_request(self, path: str, status: Optional[int], elapsed: float) -> None:
+        """
+        Учитывает одну попытку запроса.
+        :param path: Путь эндпоинта (например, `vacancies`).
+        :param status: HTTP-статус или None при сетевой ошибке.
+        :param elapsed: Время выполнения в секундах.
+        """
+        with self._lock:
+            self.requests += 1
+            self.total_time += elapsed
+            self.timings.append({"path": path, "status": status, "elapsed": elapsed})
+
+    def record_retry(self) -> None:
+        """
+        Учитывает повтор запроса.
+        """
+        with self._lock:
+            self.retries += 1
+
+    def record_failure(self) -> None:
+        """
+        Учитывает запрос, завершившийся ошибкой после всех повторов.
+        """
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Возвращает сводку по запросам.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "total_time": self.total_time,
+                "avg_time": self.total_time / self.requests if self.requests else 0.0,
+            }
 
 
 class HHApi:
     """
     Класс для взаимодействия с API hh.ru.
     """
-    def __init__(self, company_names: List[str]):
+    def __init__(self, company_names: List[str], max_workers: int = 8, requests_per_second: float = 10.0,
+                 pool_size: int = 10, max_retries: int = 5, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, timeout: float = 10.0,
+                 response_cache: Optional[ResponseCache] = None, keep_raw: bool = False,
+                 registry: Optional[EmployerRegistry] = None, base_url: str = "https://api.hh.ru/"):
         """
         Инициализирует API-клиент.
         :param company_names: Список названий компаний для поиска.
+        :param max_workers: Число потоков для параллельной загрузки вакансий.
+        :param requests_per_second: Общий лимит запросов в секунду к API (0 — без ограничений).
+        :param pool_size: Размер пула keep-alive соединений.
+        :param max_retries: Максимальное число повторов запроса при 429/5xx и сетевых ошибках.
+        :param backoff_factor: Базовая задержка экспоненциального backoff в секундах.
+        :param max_backoff: Верхняя граница задержки между повторами в секундах.
+        :param timeout: Таймаут одного запроса в секундах.
+        :param response_cache: Постоянный кэш ответов API (условные запросы и режим воспроизведения).
+        :param keep_raw: Сохранять ли исходный JSON вакансий в `VacancyRecord.raw`.
+        :param registry: Реестр работодателей: известные названия не ищутся в API повторно.
+        :param base_url: Адрес API (например, локальный тестовый сервер).
         """
-        self.base_url = "https://api.hh.ru/"
+        self.base_url = base_url
         self.company_names = company_names
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.stats = RequestStats()
+        self.response_cache = response_cache
+        self.keep_raw = keep_raw
+        self.registry = registry
+        self.session = self._create_session(pool_size)
         self.companies = self._get_companies_id()
 
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """
+        Создает сессию с пулом keep-alive соединений.
+        Повторы выполняются в `_request`, поэтому у адаптера они отключены.
+        :param pool_size: Размер пула соединений.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self) -> None:
+        """
+        Закрывает HTTP-сессию и соединения пула.
+        """
+        self.session.close()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Вычисляет задержку перед повтором: экспоненциальный backoff с полным jitter.
+        :param attempt: Номер неудачной попытки (с нуля).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    def _retry_after_delay(self, response: requests.Response) -> Optional[float]:
+        """
+        Разбирает заголовок `Retry-After` (секунды или HTTP-дата).
+        :return: Задержка в секундах или None, если заголовка нет или он некорректен.
+        """
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.max_backoff)
+
+    def _request(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Выполняет GET-запрос к API с повторами при 429/5xx и сетевых ошибках.
+        Если задан кэш ответов, свежие ответы выдаются из него, а устаревшие
+        проверяются условным запросом (If-None-Match / If-Modified-Since).
+        :param path: Путь эндпоинта относительно `base_url`.
+        :param params: Параметры запроса.
+        :return: Разобранный JSON-ответ или None, если запрос не удался.
+        """
+        url = f"{self.base_url}{path}"
+        cache = self.response_cache
+        cached = cache.get(url, params) if cache is not None else None
+        if cache is not None:
+            if cache.replay_only or (cached is not None and cache.is_fresh(cached)):
+                if cached is None:
+                    cache.record("misses")
+                    print(f"Нет сохраненного ответа для {url} {params}")
+                    return None
+                cache.record("hits")
+                return cached.data
+            cache.record("misses")
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, headers=headers)
+            except requests.RequestException as error:
+                elapsed = time.perf_counter() - started
+                self.stats.record_request(path, None, elapsed)
+                metrics.observe("hh_http_request_seconds", elapsed, endpoint=path, status="error")
+                if attempt == self.max_retries:
+                    self.stats.record_failure()
+                    metrics.inc("hh_http_failures_total", endpoint=path)
+                    print(f"Ошибка запроса к {url}: {error}")
+                    return None
+                delay = self._backoff_delay(attempt)
+            else:
+                elapsed = time.perf_counter() - started
+                self.stats.record_request(path, response.status_code, elapsed)
+                if metrics.enabled:
+                    metrics.observe("hh_http_request_seconds", elapsed, endpoint=path, status=response.status_code)
+                    metrics.inc("hh_http_response_bytes_total", len(response.content), endpoint=path)
+                if response.status_code == 304 and cached is not None:
+                    cache.record("revalidated")
+                    cache.touch(url, params)
+                    return cached.data
+                if response.status_code == 200:
+                    with metrics.timer("hh_json_decode_seconds", endpoint=path):
+                        data = response.json()
+                    if cache is not None:
+                        cache.put(url, params, data, response.headers.get("ETag"),
+                                  response.headers.get("Last-Modified"))
+                    return data
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    self.stats.record_failure()
+                    metrics.inc("hh_http_failures_total", endpoint=path)
+                    print(f"Ошибка запроса к {url}: статус {response.status_code}")
+                    return None
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+            self.stats.record_retry()
+            metrics.inc("hh_http_retries_total", endpoint=path)
+            time.sleep(delay)
+        return None
+
+    def _resolve_employer(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Ищет работодателя по названию. Предпочитается точное совпадение названия
+        (без учета регистра и кавычек), иначе берется первый результат поиска.
+        :param name: Название компании.
+        :return: Данные компании или None, если ничего не найдено.
+        """
+        data = self._request("employers", {'text': name, 'per_page': 20})
+        if data is None:
+            return None
+        items = data.get('items', [])
+        if not items:
+            return None
+        target = normalize_employer_name(name)
+        company = next((item for item in items if normalize_employer_name(item.get('name', '')) == target), items[0])
+        return {
+            "id": int(company.get('id')),
+            "name": company.get('name'),
+            "url": company.get('alternate_url')
+        }
+
     def _get_companies_id(self) -> Dict[str, Any]:
         """
         Получает ID компаний по их названиям.
+        Названия, уже сохраненные в реестре работодателей, в API не ищутся;
+        остальные ищутся параллельно и добавляются в реестр.
         """
+        known = self.registry.load(self.company_names) if self.registry is not None else {}
+        unknown = [name for name in self.company_names if name not in known]
+        resolved = {}
+        if unknown:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for name, company in zip(unknown, executor.map(self._resolve_employer, unknown)):
+                    if company is not None:
+                        resolved[name] = company
+            if self.registry is not None:
+                self.registry.save(resolved)
+
         companies_data = {}
         for name in self.company_names:
-            response = requests.get(f"{self.base_url}employers", params={'text': name, 'per_page': 1})
-            if response.status_code == 200:
-                items = response.json().get('items', [])
-                if items:
-                    company = items[0]
-                    companies_data[name] = {
-                        "id": int(company.get('id')),
-                        "name": company.get('name'),
-                        "url": company.get('alternate_url')
-                    }
+            company = known.get(name) or resolved.get(name)
+            if company is not None:
+                companies_data[name] = company
         return companies_data
 
-    def get_vacancies(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _get_vacancies_page(self, company_id: int, page: int, per_page: int = 100,
+                            filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Получает одну страницу вакансий компании.
+        :param company_id: ID работодателя на hh.ru.
+        :param page: Номер страницы (с нуля).
+        :param per_page: Размер страницы.
+        :param filters: Дополнительные параметры поиска (`date_from`, `date_to`, `area` и т.п.).
+        :return: Ответ API, в котором `items` уже преобразованы в `VacancyRecord`,
+                 или None, если запрос завершился ошибкой.
+        """
+        params = dict(filters or {}, employer_id=company_id, page=page, per_page=per_page)
+        data = self._request("vacancies", params)
+        if data is None:
+            return None
+        with metrics.timer("hh_page_parse_seconds"):
+            items = [VacancyRecord.from_json(item, self.keep_raw) for item in data.get('items', [])]
+        metrics.inc("hh_vacancies_parsed_total", len(items))
+        return dict(data, items=items)
+
+    def plan_shards(self, company_id: int, filters: Optional[Dict[str, Any]] = None,
+                    found: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Делит запрос вакансий компании на шарды, каждый из которых укладывается
+        в ограничение API в 2000 результатов (см. `sharding.plan_shards`).
+        :param company_id: ID работодателя на hh.ru.
+        :param filters: Фильтры исходного запроса.
+        :param found: Число вакансий по исходному запросу, если уже известно.
+        :return: Фильтры шардов.
+        """
+        def probe(shard_filters: Dict[str, Any], clusters: bool) -> Optional[Dict[str, Any]]:
+            params = dict(shard_filters, employer_id=company_id, page=0, per_page=1)
+            if clusters:
+                params['clusters'] = 'true'
+            return self._request("vacancies", params)
+
+        shards = plan_shards(probe, filters or {}, found)
+        metrics.inc("hh_shards_total", len(shards))
+        return shards
+
+    def _get_sharded_vacancies(self, company_id: int, shards: List[Dict[str, Any]],
+                               first_items: List[VacancyRecord]) -> List[VacancyRecord]:
+        """
+        Параллельно загружает все страницы шардов и убирает повторы по ID вакансии.
+        :param company_id: ID работодателя на hh.ru.
+        :param shards: Фильтры шардов.
+        :param first_items: Уже полученные вакансии (первая страница исходного запроса).
+        """
+        seen = set()
+        vacancies = unique_items(first_items, seen)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            first_pages = {
+                executor.submit(self._get_vacancies_page, company_id, 0, filters=shard): shard for shard in shards
+            }
+            other_pages = []
+            for future in as_completed(first_pages):
+                data = future.result()
+                if data is None:
+                    continue
+                vacancies.extend(unique_items(data.get('items', []), seen))
+                other_pages.extend(
+                    executor.submit(self._get_vacancies_page, company_id, page, filters=first_pages[future])
+                    for page in range(1, data.get('pages', 0))
+                )
+            for future in as_completed(other_pages):
+                data = future.result()
+                if data is not None:
+                    vacancies.extend(unique_items(data.get('items', []), seen))
+        return vacancies
+
+    def get_company_vacancies(self, company_id: int, date_from: Optional[str] = None) -> Tuple[List[VacancyRecord], int]:
+        """
+        Получает все вакансии одной компании, при необходимости — только опубликованные
+        или обновленные начиная с `date_from`. Если вакансий больше, чем API отдает
+        на один запрос, запрос делится на шарды.
+        :param company_id: ID работодателя на hh.ru.
+        :param date_from: Дата в формате ISO 8601.
+        :return: Список вакансий и значение `found` из ответа API.
+        """
+        filters = {'date_from': date_from} if date_from else {}
+        vacancies = []
+        found = 0
+        page = 0
+        while True:
+            data = self._get_vacancies_page(company_id, page, filters=filters)
+            if data is None:
+                break
+            found = data.get('found', found)
+            if page == 0 and found > MAX_RESULTS:
+                shards = self.plan_shards(company_id, filters, found)
+                return self._get_sharded_vacancies(company_id, shards, data.get('items', [])), found
+            vacancies.extend(data.get('items', []))
+            if page >= data.get('pages', 0) - 1:
+                break
+            page += 1
+        return vacancies, found
+
+    def get_page_range(self, company_id: int, page_from: int, page_to: int,
+                       filters: Optional[Dict[str, Any]] = None) -> Optional[List[VacancyRecord]]:
+        """
+        Получает вакансии компании со страниц `page_from`..`page_to` включительно
+        (загрузка останавливается на последней существующей странице).
+        :param company_id: ID работодателя на hh.ru.
+        :param page_from: Первая страница.
+        :param page_to: Последняя страница.
+        :param filters: Фильтры шарда.
+        :return: Вакансии или None, если какую-либо страницу загрузить не удалось.
+        """
+        vacancies = []
+        for page in range(page_from, page_to + 1):
+            data = self._get_vacancies_page(company_id, page, filters=filters)
+            if data is None:
+                return None
+            vacancies.extend(data.get('items', []))
+            if page >= data.get('pages', 0) - 1:
+                break
+        return vacancies
+
+    def count_vacancies(self, company_id: int, filters: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Получает число открытых вакансий компании одним легким запросом.
+        :param company_id: ID работодателя на hh.ru.
+        :param filters: Фильтры шарда.
+        :return: Значение `found` или None, если запрос не удался.
+        """
+        data = self._get_vacancies_page(company_id, 0, per_page=1, filters=filters)
+        return data.get('found', 0) if data is not None else None
+
+    def get_currency_rates(self) -> Optional[Dict[str, float]]:
+        """
+        Получает курсы валют из справочника hh.ru.
+        :return: Словарь {код валюты: сколько единиц валюты стоит один рубль} или None, если запрос не удался.
+        """
+        data = self._request("dictionaries", {})
+        if data is None:
+            return None
+        return {currency['code']: float(currency['rate']) for currency in data.get('currency', []) if currency.get('rate')}
+
+    def get_vacancies(self) -> Dict[str, List[VacancyRecord]]:
         """
         Получает вакансии для каждой компании из списка.
         """
         vacancies_data = {}
         for company_name, company_info in self.companies.items():
-            company_id = company_info['id']
+            vacancies_data[company_name] = self.get_company_vacancies(company_info['id'])[0]
+        return vacancies_data
+
+    def get_vacancies_concurrent(self, max_workers: Optional[int] = None) -> Dict[str, List[VacancyRecord]]:
+        """
+        Получает вакансии для каждой компании параллельно.
+        Сначала для каждой компании запрашивается нулевая страница, из ответа берется
+        число страниц `pages`, после чего остальные страницы загружаются параллельно.
+        Компании, у которых вакансий больше, чем API отдает на один запрос, загружаются по шардам.
+        Формат результата совпадает с `get_vacancies`.
+        :param max_workers: Число потоков (по умолчанию — значение из конструктора).
+        """
+        workers = max_workers or self.max_workers
+        pages_by_company: Dict[str, Dict[int, List[VacancyRecord]]] = {
+            company_name: {} for company_name in self.companies
+        }
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            first_pages = {
+                executor.submit(self._get_vacancies_page, company_info['id'], 0): company_name
+                for company_name, company_info in self.companies.items()
+            }
+            other_pages = {}
+            sharded = {}
+            for future in as_completed(first_pages):
+                company_name = first_pages[future]
+                data = future.result()
+                if data is None:
+                    continue
+                pages_by_company[company_name][0] = data.get('items', [])
+                company_id = self.companies[company_name]['id']
+                if data.get('found', 0) > MAX_RESULTS:
+                    sharded[company_name] = data.get('found')
+                    continue
+                for page in range(1, data.get('pages', 0)):
+                    future_page = executor.submit(self._get_vacancies_page, company_id, page)
+                    other_pages[future_page] = (company_name, page)
+
+            for future in as_completed(other_pages):
+                company_name, page = other_pages[future]
+                data = future.result()
+                if data is not None:
+                    pages_by_company[company_name][page] = data.get('items', [])
+
+        for company_name, found in sharded.items():
+            company_id = self.companies[company_name]['id']
+            shards = self.plan_shards(company_id, found=found)
+            pages_by_company[company_name] = {
+                0: self._get_sharded_vacancies(company_id, shards, pages_by_company[company_name][0])
+            }
+
+        vacancies_data = {}
+        for company_name, pages in pages_by_company.items():
             vacancies = []
-            page = 0
-            while True:
-                response = requests.get(
-                    f"{self.base_url}vacancies",
-                    params={'employer_id': company_id, 'page': page, 'per_page': 100}
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    vacancies.extend(data.get('items', []))
-                    if page >= data.get('pages', 0) - 1:
-                        break
-                    page += 1
-                else:
-                    break
+            for page in sorted(pages):
+                vacancies.extend(pages[page])
             vacancies_data[company_name] = vacancies
         return vacancies_data
+
+    def iter_vacancy_pages(self, max_workers: Optional[int] = None) -> Iterator[Tuple[str, List[VacancyRecord]]]:
+        """
+        Отдает страницы вакансий по мере их загрузки, не накапливая весь результат в памяти.
+        Число одновременно загружаемых и еще не отданных страниц ограничено
+        удвоенным числом потоков. Порядок страниц не гарантируется. Крупные компании
+        загружаются по шардам, повторяющиеся в шардах вакансии отбрасываются.
+        :param max_workers: Число потоков (по умолчанию — значение из конструктора).
+        :return: Итератор пар (название компании, вакансии одной страницы).
+        """
+        workers = max_workers or self.max_workers
+        max_pending = workers * 2
+        # Задача: (компания, ID компании, страница, фильтры шарда); страница None — планирование шардов
+        tasks = deque(
+            (company_name, company_info['id'], 0, None) for company_name, company_info in self.companies.items()
+        )
+        pending = {}
+        # ID уже отданных вакансий компаний, загружаемых по шардам
+        seen: Dict[str, set] = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while tasks or pending:
+                while tasks and len(pending) < max_pending:
+                    task = tasks.popleft()
+                    pending[executor.submit(self._get_vacancies_page, task[1], task[2], filters=task[3])] = task
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    company_name, company_id, page, filters = pending.pop(future)
+                    data = future.result()
+                    if page is None:
+                        tasks.extendleft((company_name, company_id, 0, shard) for shard in reversed(data))
+                        continue
+                    if data is None:
+                        continue
+                    items = data.get('items', [])
+                    if page == 0 and filters is None and data.get('found', 0) > MAX_RESULTS:
+                        seen[company_name] = set()
+                        plan = executor.submit(self.plan_shards, company_id, None, data.get('found'))
+                        pending[plan] = (company_name, company_id, None, None)
+                    elif page == 0:
+                        # Остальные страницы компании загружаются раньше следующих компаний
+                        tasks.extendleft(
+                            (company_name, company_id, next_page, filters)
+                            for next_page in reversed(range(1, data.get('pages', 0)))
+                        )
+                    if company_name in seen:
+                        items = unique_items(items, seen[company_name])
+                    yield company_name, items
@@ -0,0 +1,104 @@
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import psycopg2
+
+# Снимки вакансий старше этого срока удаляются вместе с партициями
+DEFAULT_RETENTION_DAYS = 365
+
+# Имя месячной партиции, созданной `ensure_partition`
+PARTITION_NAME = re.compile(r"vacancy_snapshots_(\d{4})_(\d{2})")
+
+
+def partition_bounds(day: date) -> Tuple[str, date, date]:
+    """
+    Возвращает имя месячной партиции `vacancy_snapshots` для даты и ее границы.
+    :param day: Дата снимка.
+    :return: Имя партиции, начало (включительно) и конец (не включительно).
+    """
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return f"vacancy_snapshots_{start:%Y_%m}", start, end
+
+
+def ensure_partition(cur, day: date) -> None:
+    """
+    Создает месячную партицию для даты снимка, если ее еще нет.
+    :param cur: Курсор psycopg2.
+    :param day: Дата снимка.
+    """
+    name, start, end = partition_bounds(day)
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF vacancy_snapshots FOR VALUES FROM (%s) TO (%s)",
+        (start, end)
+    )
+
+
+def append_snapshot(cur, snapshot_date: Optional[date] = None) -> int:
+    """
+    Добавляет снимок текущих открытых вакансий. Данные копируются на стороне сервера
+    одним запросом; повторный снимок за тот же день не дублирует строки.
+    :param cur: Курсор psycopg2.
+    :param snapshot_date: Дата снимка (по умолчанию — сегодня).
+    :return: Количество добавленных строк.
+    """
+    snapshot_date = snapshot_date or date.today()
+    ensure_partition(cur, snapshot_date)
+    cur.execute(
+        """
+        INSERT INTO vacancy_snapshots (snapshot_date, vacancy_id, company_id, salary_from, salary_to, salary_mid_rub)
+        SELECT %s, vacancy_id, company_id, salary_from, salary_to, salary_mid_rub
+        FROM vacancies
+        WHERE NOT archived
+        ON CONFLICT (snapshot_date, vacancy_id) DO NOTHING
+        """,
+        (snapshot_date,)
+    )
+    return cur.rowcount
+
+
+def prune_snapshots(cur, retention_days: int = DEFAULT_RETENTION_DAYS, today: Optional[date] = None) -> List[str]:
+    """
+    Удаляет месячные партиции, целиком попадающие за пределы срока хранения.
+    Удаление партиции мгновенно и не оставляет мертвых строк, в отличие от DELETE.
+    Партиции с другими именами (например, DEFAULT) не затрагиваются.
+    :param cur: Курсор psycopg2.
+    :param retention_days: Срок хранения снимков в днях.
+    :param today: Текущая дата (для тестов).
+    :return: Имена удаленных партиций.
+    """
+    cutoff = (today or date.today()) - timedelta(days=retention_days)
+    cur.execute("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = 'vacancy_snapshots'
+    """)
+    dropped = []
+    for (name,) in cur.fetchall():
+        match = PARTITION_NAME.fullmatch(name)
+        if match is None:
+            continue
+        _, _, end = partition_bounds(date(int(match.group(1)), int(match.group(2)), 1))
+        if end <= cutoff:
+            cur.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
+
+
+def record_snapshot(conn, retention_days: int = DEFAULT_RETENTION_DAYS) -> None:
+    """
+    Добавляет снимок после загрузки и удаляет устаревшие партиции отдельной транзакцией.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    :param retention_days: Срок хранения снимков в днях.
+    """
+    try:
+        with conn.cursor() as cur:
+            append_snapshot(cur)
+            prune_snapshots(cur, retention_days)
+        conn.commit()
+    except psycopg2.Error as error:
+        conn.rollback()
+        print(f"Ошибка при сохранении истории вакансий: {error}")
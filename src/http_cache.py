@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    """
+    Сохраненный ответ API.
+    """
+    data: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    Постоянный кэш ответов API в SQLite. Ключ — URL и параметры запроса,
+    тело хранится в виде сжатого JSON вместе с заголовками ETag и Last-Modified
+    для условных запросов. В режиме `replay_only` ответы выдаются только из кэша.
+    """
+    def __init__(self, path: str, max_age: float = 0.0, replay_only: bool = False):
+        """
+        :param path: Путь к файлу SQLite.
+        :param max_age: Сколько секунд ответ считается свежим и выдается без обращения к API
+                        (0 — всегда проверять актуальность условным запросом).
+        :param replay_only: Выдавать ответы только из кэша, не обращаясь к сети.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.replay_only = replay_only
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @staticmethod
+    def make_key(url: str, params: Dict[str, Any]) -> str:
+        """
+        Строит ключ кэша по URL и параметрам (порядок параметров не важен).
+        """
+        raw = json.dumps([url, sorted((str(key), str(value)) for key, value in params.items())], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, params: Dict[str, Any]) -> Optional[CachedResponse]:
+        """
+        Возвращает сохраненный ответ или None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (self.make_key(url, params),)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(json.loads(zlib.decompress(body)), etag, last_modified, stored_at)
+
+    def is_fresh(self, cached: CachedResponse) -> bool:
+        """
+        Проверяет, можно ли выдать ответ без обращения к API.
+        """
+        return self.max_age > 0 and time.time() - cached.stored_at < self.max_age
+
+    def put(self, url: str, params: Dict[str, Any], data: Dict[str, Any],
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Сохраняет ответ API.
+        """
+        body = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, etag, last_modified, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.make_key(url, params), url, body, etag, last_modified, time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url: str, params: Dict[str, Any]) -> None:
+        """
+        Отмечает сохраненный ответ как подтвержденный (после ответа 304).
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), self.make_key(url, params))
+            )
+            self._conn.commit()
+
+    def record(self, event: str) -> None:
+        """
+        Учитывает событие кэша: `hits`, `misses` или `revalidated`.
+        """
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Возвращает статистику использования кэша.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "revalidated": self.revalidated}
+
+    def close(self) -> None:
+        """
+        Закрывает файл кэша.
+        """
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,330 @@
+import io
+import time
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Union
+
+import psycopg2
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
+from src.currency import DEFAULT_RATES, salary_mid_rub
+from src.history import record_snapshot
+from src.metrics import metrics
+from src.models import VacancyRecord
+
+VACANCY_COLUMNS = ("vacancy_id", "company_id", "vacancy_name", "salary_from", "salary_to", "url", "published_at",
+                   "salary_currency", "salary_gross", "salary_mid_rub")
+
+# Размер порции COPY в символах: столько строк держится в памяти при загрузке
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Ошибки, после которых транзакцию загрузки можно безопасно повторить
+RETRYABLE_ERRORS = (errors.SerializationFailure, errors.DeadlockDetected)
+
+
+def vacancy_row(vacancy: Union[VacancyRecord, Dict[str, Any]], company_id: int,
+                rates: Optional[Dict[str, float]] = None) -> Tuple:
+    """
+    Преобразует вакансию в строку таблицы `vacancies`.
+    Зарплата приводится к рублям на руки (`salary_mid_rub`) при загрузке.
+    :param vacancy: Компактная запись или вакансия в формате API hh.ru.
+    :param company_id: ID компании.
+    :param rates: Курсы валют из `currency_rates` (по умолчанию только рубли).
+    """
+    if isinstance(vacancy, VacancyRecord):
+        return vacancy.as_row(company_id, rates)
+    salary = vacancy.get('salary')
+    salary_from = salary['from'] if salary and salary['from'] else None
+    salary_to = salary['to'] if salary and salary['to'] else None
+    currency = salary.get('currency') if salary else None
+    gross = salary.get('gross') if salary else None
+    mid_rub = salary_mid_rub(salary_from, salary_to, currency, gross, rates or DEFAULT_RATES)
+    return (vacancy['id'], company_id, vacancy['name'], salary_from, salary_to, vacancy['alternate_url'],
+            vacancy.get('published_at'), currency, gross, mid_rub)
+
+
+def iter_vacancy_rows(companies: Dict[str, Any], vacancies_by_company: Dict[str, List[Any]],
+                      rates: Optional[Dict[str, float]] = None) -> Iterable[Tuple]:
+    """
+    Последовательно отдает строки таблицы `vacancies` по данным из HHApi.
+    :param companies: Компании в формате `HHApi.companies`.
+    :param vacancies_by_company: Вакансии в формате `HHApi.get_vacancies`.
+    :param rates: Курсы валют из `currency_rates`.
+    """
+    for company_name, vacancies in vacancies_by_company.items():
+        company_id = companies[company_name]['id']
+        for vacancy in vacancies:
+            yield vacancy_row(vacancy, company_id, rates)
+
+
+def _copy_value(value: Any) -> str:
+    """
+    Кодирует значение в текстовый формат COPY.
+    """
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class CopyBuffer:
+    """
+    Буфер строк в текстовом формате COPY, который заполняется построчно.
+    """
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self.rows = 0
+
+    def add_row(self, row: Tuple) -> None:
+        """
+        Добавляет строку в буфер.
+        :param row: Значения колонок.
+        """
+        self._buffer.write('\t'.join(_copy_value(value) for value in row))
+        self._buffer.write('\n')
+        self.rows += 1
+
+    def size(self) -> int:
+        """
+        Возвращает текущий размер буфера в символах.
+        """
+        return self._buffer.tell()
+
+    def copy_to(self, cur, table: str, columns: Tuple[str, ...]) -> int:
+        """
+        Отправляет содержимое буфера командой COPY FROM STDIN и очищает буфер
+        (в том числе если COPY завершился ошибкой).
+        :param cur: Курсор psycopg2.
+        :param table: Имя таблицы.
+        :param columns: Имена колонок в порядке значений строк.
+        :return: Количество отправленных строк.
+        """
+        sent = self.rows
+        try:
+            if sent:
+                self._buffer.seek(0)
+                cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", self._buffer)
+        finally:
+            self._buffer = io.StringIO()
+            self.rows = 0
+        return sent
+
+
+def insert_companies(cur, companies: Dict[str, Any]) -> int:
+    """
+    Загружает компании одним пакетным запросом.
+    :param cur: Курсор psycopg2.
+    :param companies: Компании в формате `HHApi.companies`.
+    :return: Количество переданных компаний.
+    """
+    rows = [(info['id'], info['name'], info['url']) for info in companies.values()]
+    if rows:
+        execute_values(
+            cur,
+            "INSERT INTO companies (company_id, company_name, url) VALUES %s ON CONFLICT (company_id) DO NOTHING",
+            rows
+        )
+    return len(rows)
+
+
+def _create_staging(cur) -> None:
+    """
+    Создает временную таблицу для COPY, которая удаляется при фиксации транзакции.
+    """
+    cur.execute("CREATE TEMP TABLE vacancies_staging (LIKE vacancies INCLUDING DEFAULTS) ON COMMIT DROP")
+
+
+def _merge_staging(cur) -> None:
+    """
+    Переносит строки из временной таблицы в `vacancies` одним INSERT ... SELECT ... ON CONFLICT.
+    """
+    columns = ', '.join(VACANCY_COLUMNS)
+    cur.execute(f"""
+        INSERT INTO vacancies ({columns})
+        SELECT {columns} FROM vacancies_staging
+        ON CONFLICT (vacancy_id) DO NOTHING
+    """)
+    cur.execute("DROP TABLE vacancies_staging")
+
+
+def copy_vacancies(cur, rows: Iterable[Tuple], chunk_size: int = COPY_CHUNK_SIZE) -> int:
+    """
+    Загружает вакансии через временную таблицу: COPY FROM STDIN в staging,
+    затем один INSERT ... SELECT ... ON CONFLICT в `vacancies`.
+    :param cur: Курсор psycopg2.
+    :param rows: Строки в порядке `VACANCY_COLUMNS`.
+    :param chunk_size: Размер буфера в символах, после которого он отправляется на сервер.
+    :return: Количество строк, переданных в staging.
+    """
+    _create_staging(cur)
+    buffer = CopyBuffer()
+    total = 0
+    for row in rows:
+        buffer.add_row(row)
+        if buffer.size() >= chunk_size:
+            total += buffer.copy_to(cur, "vacancies_staging", VACANCY_COLUMNS)
+    total += buffer.copy_to(cur, "vacancies_staging", VACANCY_COLUMNS)
+    _merge_staging(cur)
+    return total
+
+
+def _copy_chunk(cur, buffer: CopyBuffer, chunk: List[Tuple]) -> bool:
+    """
+    Отправляет порцию строк в staging через COPY под точкой сохранения.
+    Если COPY завершился ошибкой, порция откатывается и загружается в `vacancies`
+    через `execute_values`. Ошибки сериализации и взаимоблокировки (`RETRYABLE_ERRORS`)
+    пробрасываются: транзакция уже прервана, и ее нужно повторить целиком.
+    :param cur: Курсор psycopg2.
+    :param buffer: Буфер с порцией строк в формате COPY.
+    :param chunk: Те же строки в порядке `VACANCY_COLUMNS`.
+    :return: True, если порция загружена через COPY.
+    """
+    cur.execute("SAVEPOINT bulk_copy")
+    try:
+        buffer.copy_to(cur, "vacancies_staging", VACANCY_COLUMNS)
+    except RETRYABLE_ERRORS:
+        raise
+    except psycopg2.Error as error:
+        cur.execute("ROLLBACK TO SAVEPOINT bulk_copy")
+        print(f"Ошибка загрузки порции через COPY, используется execute_values: {error}")
+        insert_vacancies_batch(cur, chunk)
+        return False
+    cur.execute("RELEASE SAVEPOINT bulk_copy")
+    return True
+
+
+def insert_vacancies_batch(cur, rows: Iterable[Tuple], page_size: int = 1000) -> int:
+    """
+    Загружает вакансии пакетами через `execute_values`.
+    :param cur: Курсор psycopg2.
+    :param rows: Строки в порядке `VACANCY_COLUMNS`.
+    :param page_size: Количество строк в одном запросе.
+    :return: Количество переданных строк.
+    """
+    rows = list(rows)
+    if rows:
+        execute_values(
+            cur,
+            f"INSERT INTO vacancies ({', '.join(VACANCY_COLUMNS)}) VALUES %s ON CONFLICT (vacancy_id) DO NOTHING",
+            rows,
+            page_size=page_size
+        )
+    return len(rows)
+
+
+def upsert_vacancies(cur, rows: Iterable[Tuple], page_size: int = 1000) -> int:
+    """
+    Вставляет или обновляет вакансии (ON CONFLICT DO UPDATE) и снимает с них признак архивной.
+    Строки, которые не изменились, не перезаписываются и не учитываются в результате.
+    :param cur: Курсор psycopg2.
+    :param rows: Строки в порядке `VACANCY_COLUMNS`.
+    :param page_size: Количество строк в одном запросе.
+    :return: Количество фактически вставленных или измененных строк.
+    """
+    # В одном INSERT ... ON CONFLICT DO UPDATE строка не может обновляться дважды
+    unique_rows = list({int(row[0]): row for row in rows}.values())
+    if not unique_rows:
+        return 0
+    updated = ', '.join(f"{column} = EXCLUDED.{column}" for column in VACANCY_COLUMNS[1:])
+    current = ', '.join(f"vacancies.{column}" for column in VACANCY_COLUMNS[1:])
+    excluded = ', '.join(f"EXCLUDED.{column}" for column in VACANCY_COLUMNS[1:])
+    # RETURNING отдает только вставленные строки и строки, прошедшие условие WHERE
+    changed = execute_values(
+        cur,
+        f"""
+        INSERT INTO vacancies ({', '.join(VACANCY_COLUMNS)}) VALUES %s
+        ON CONFLICT (vacancy_id) DO UPDATE SET {updated}, archived = FALSE
+        WHERE vacancies.archived OR ({current}) IS DISTINCT FROM ({excluded})
+        RETURNING vacancy_id
+        """,
+        unique_rows,
+        page_size=page_size,
+        fetch=True
+    )
+    return len(changed)
+
+
+def load_vacancies(cur, rows: Iterable[Tuple], method: str = "copy", report: bool = True,
+                   chunk_size: int = COPY_CHUNK_SIZE) -> Tuple[str, int]:
+    """
+    Загружает вакансии выбранным методом и печатает скорость загрузки.
+    Строки читаются за один проход и отправляются через COPY порциями по `chunk_size`
+    символов, поэтому в памяти держится только текущая порция. Порция, на которой COPY
+    завершился ошибкой, откатывается до точки сохранения и загружается через `execute_values`;
+    ошибки сериализации и взаимоблокировки пробрасываются (см. `_copy_chunk`).
+    :param cur: Курсор psycopg2.
+    :param rows: Строки в порядке `VACANCY_COLUMNS`.
+    :param method: `copy` или `values`.
+    :param report: Печатать ли скорость загрузки.
+    :param chunk_size: Размер порции COPY в символах.
+    :return: Фактически использованный метод (`values`, если хотя бы одна порция
+             загружена через `execute_values`) и количество строк.
+    """
+    started = time.perf_counter()
+    if method != "copy":
+        count = insert_vacancies_batch(cur, rows)
+        _record_batch("values", count, time.perf_counter() - started, report)
+        return "values", count
+
+    _create_staging(cur)
+    buffer = CopyBuffer()
+    chunk: List[Tuple] = []
+    counts = {"copy": 0, "values": 0}
+    for row in rows:
+        buffer.add_row(row)
+        chunk.append(row)
+        if buffer.size() >= chunk_size:
+            counts["copy" if _copy_chunk(cur, buffer, chunk) else "values"] += len(chunk)
+            chunk = []
+    if chunk:
+        counts["copy" if _copy_chunk(cur, buffer, chunk) else "values"] += len(chunk)
+    _merge_staging(cur)
+    method = "values" if counts["values"] else "copy"
+    count = counts["copy"] + counts["values"]
+    _record_batch(method, count, time.perf_counter() - started, report)
+    return method, count
+
+
+def bump_data_version(cur) -> None:
+    """
+    Увеличивает версию данных, по которой DBManager сбрасывает кэш результатов.
+    Вызывается в той же транзакции, что и изменение данных.
+    :param cur: Курсор psycopg2.
+    """
+    cur.execute("UPDATE data_version SET version = version + 1")
+
+
+def refresh_salary_stats(conn) -> None:
+    """
+    Обновляет материализованное представление `salary_stats` после загрузки.
+    Обновление выполняется отдельной транзакцией и не блокирует чтение статистики.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY salary_stats")
+            bump_data_version(cur)
+        conn.commit()
+    except psycopg2.Error as error:
+        conn.rollback()
+        print(f"Ошибка при обновлении статистики зарплат: {error}")
+
+
+def finish_ingest(conn) -> None:
+    """
+    Выполняет шаги после загрузки: обновляет статистику зарплат
+    и сохраняет снимок вакансий в историю.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    """
+    refresh_salary_stats(conn)
+    record_snapshot(conn)
+
+
+def _record_batch(method: str, count: int, elapsed: float, report: bool) -> None:
+    """
+    Учитывает записанный пакет в метриках и при необходимости печатает скорость загрузки.
+    """
+    metrics.observe("db_batch_write_seconds", elapsed, method=method)
+    metrics.inc("db_rows_written_total", count, method=method)
+    if report:
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"Загружено {count} вакансий методом {method} за {elapsed:.2f} с ({rate:.0f} строк/с).")
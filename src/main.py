@@ -1,43 +1,90 @@
 import os
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
-from src.database import create_database, create_tables
+from src.database import (
+    create_database, create_tables, create_indexes, create_salary_stats, create_snapshot_table, create_job_table
+)
+from src.currency import refresh_currency_rates
+from src.employer_registry import EmployerRegistry
 from src.hh_api import HHApi
 from src.db_manager import DBManager
+from src.loader import bump_data_version, finish_ingest, insert_companies, iter_vacancy_rows, load_vacancies
+from src.pipeline import stream_ingest
+from src.sync import incremental_sync
 import psycopg2
 
+# Количество вакансий на одной странице интерактивного вывода
+PAGE_SIZE = 50
 
-def insert_data_to_db(db_name: str, params: Dict[str, Any], hh_api_data: Dict[str, Any]) -> None:
+# Компании, вакансии которых загружаются по умолчанию
+COMPANY_NAMES = [
+    "ООО Синара-Девелопмент", "ООО Бантер Групп", "ПАО МегаФон", "Петрович, Строительный Торговый Дом",
+    "ООО Урс Групп", "ООО Брусника", "АО Уральский завод гражданской", "ВИТА. Офис",
+    "ТК Интеграл+", "ООО АДС-ЭЛЕКТРО"
+]
+
+
+def load_db_config() -> Tuple[str, Dict[str, Any]]:
+    """
+    Читает имя базы данных и параметры подключения из переменных окружения (файла `.env`).
+    :return: Имя базы данных и параметры подключения.
+    """
+    load_dotenv()
+    db_params = {
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+    }
+    return os.getenv("DB_NAME"), db_params
+
+
+def load_replica_config() -> Dict[str, Any]:
+    """
+    Читает настройки реплик для чтения из переменных окружения: `DB_REPLICAS` — адреса
+    через запятую в виде `host` или `host:port`, `DB_MAX_REPLICA_LAG` — допустимое
+    отставание в секундах. Загрузка данных всегда идет на основной сервер `DB_HOST`.
+    :return: Именованные аргументы DBManager (`replicas`, `max_replica_lag`).
+    """
+    load_dotenv()
+    replicas: List[Dict[str, Any]] = []
+    for address in filter(None, (item.strip() for item in os.getenv("DB_REPLICAS", "").split(","))):
+        host, _, port = address.partition(":")
+        replicas.append({"host": host, "port": int(port)} if port else {"host": host})
+    config: Dict[str, Any] = {"replicas": replicas}
+    if os.getenv("DB_MAX_REPLICA_LAG"):
+        config["max_replica_lag"] = float(os.getenv("DB_MAX_REPLICA_LAG"))
+    return config
+
+
+def insert_data_to_db(db_name: str, params: Dict[str, Any], hh_api_data: Dict[str, Any], method: str = "copy",
+                      hh_api: Optional[HHApi] = None) -> None:
     """
     Загружает данные о компаниях и вакансиях в базу данных.
+    :param method: Способ загрузки вакансий: `copy` (COPY через staging-таблицу)
+                   или `values` (пакетный `execute_values`).
+    :param hh_api: Клиент API для обновления курсов валют (по умолчанию создается временный).
     """
     conn = None
     try:
         conn = psycopg2.connect(dbname=db_name, **params)
         cur = conn.cursor()
+        rates_api = hh_api or HHApi([])
+        try:
+            rates = refresh_currency_rates(conn, rates_api)
+        finally:
+            if hh_api is None:
+                rates_api.close()
 
         companies = hh_api_data.get('companies', {})
-        for company_name, company_info in companies.items():
-            cur.execute(
-                "INSERT INTO companies (company_id, company_name, url) VALUES (%s, %s, %s) ON CONFLICT (company_id) DO NOTHING",
-                (company_info['id'], company_info['name'], company_info['url'])
-            )
+        insert_companies(cur, companies)
 
         vacancies_by_company = hh_api_data.get('vacancies', {})
-        for company_name, vacancies in vacancies_by_company.items():
-            company_id = companies[company_name]['id']
-            for vacancy in vacancies:
-                salary = vacancy.get('salary')
-                salary_from = salary['from'] if salary and salary['from'] else None
-                salary_to = salary['to'] if salary and salary['to'] else None
-
-                cur.execute(
-                    "INSERT INTO vacancies (vacancy_id, company_id, vacancy_name, salary_from, salary_to, url) VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT (vacancy_id) DO NOTHING",
-                    (vacancy['id'], company_id, vacancy['name'], salary_from, salary_to, vacancy['alternate_url'])
-                )
+        load_vacancies(cur, iter_vacancy_rows(companies, vacancies_by_company, rates), method)
+        bump_data_version(cur)
 
         conn.commit()
+        finish_ingest(conn)
         print("Данные успешно загружены в базу данных.")
 
     except (Exception, psycopg2.DatabaseError) as error:
@@ -48,6 +95,25 @@ def insert_data_to_db(db_name: str, params: Dict[str, Any], hh_api_data: Dict[st
             conn.close()
 
 
+def print_vacancies(vacancies: Iterable[Dict[str, Any]], page_size: int = PAGE_SIZE) -> None:
+    """
+    Выводит вакансии постранично, запрашивая продолжение после каждой страницы.
+    :param vacancies: Вакансии (список или итератор).
+    :param page_size: Количество вакансий на странице.
+    """
+    print("---")
+    for number, item in enumerate(vacancies, start=1):
+        salary_info = f"Зарплата: от {item['salary_from']} до {item['salary_to']}" if item['salary_from'] or \
+                                                                                      item[
+                                                                                          'salary_to'] else "Зарплата не указана"
+        print(
+            f"Компания: {item['company_name']}, Вакансия: {item['vacancy_name']}, {salary_info}, Ссылка: {item['url']}")
+        if number % page_size == 0:
+            if input("Enter — показать еще, q — вернуться в меню: ").strip().lower() == 'q':
+                break
+    print("---")
+
+
 def user_interaction(db_manager: DBManager) -> None:
     """
     Интерактивный интерфейс для работы с базой данных.
@@ -70,39 +136,17 @@ def user_interaction(db_manager: DBManager) -> None:
                 print(f"Компания: {item['company_name']}, Вакансий: {item['vacancies_count']}")
             print("---")
         elif choice == '2':
-            results = db_manager.get_all_vacancies()
-            print("---")
-            for item in results:
-                salary_info = f"Зарплата: от {item['salary_from']} до {item['salary_to']}" if item['salary_from'] or \
-                                                                                              item[
-                                                                                                  'salary_to'] else "Зарплата не указана"
-                print(
-                    f"Компания: {item['company_name']}, Вакансия: {item['vacancy_name']}, {salary_info}, Ссылка: {item['url']}")
-            print("---")
+            print_vacancies(db_manager.iter_all_vacancies())
         elif choice == '3':
             avg_salary = db_manager.get_avg_salary()
             print("---")
             print(f"Средняя зарплата по всем вакансиям: {avg_salary:.2f}")
             print("---")
         elif choice == '4':
-            results = db_manager.get_vacancies_with_higher_salary()
-            print("---")
-            for item in results:
-                salary_info = f"Зарплата: от {item['salary_from']} до {item['salary_to']}"
-                print(
-                    f"Компания: {item['company_name']}, Вакансия: {item['vacancy_name']}, {salary_info}, Ссылка: {item['url']}")
-            print("---")
+            print_vacancies(db_manager.iter_vacancies_with_higher_salary())
         elif choice == '5':
             keyword = input("Введите ключевое слово для поиска: ")
-            results = db_manager.get_vacancies_with_keyword(keyword)
-            print("---")
-            for item in results:
-                salary_info = f"Зарплата: от {item['salary_from']} до {item['salary_to']}" if item['salary_from'] or \
-                                                                                              item[
-                                                                                                  'salary_to'] else "Зарплата не указана"
-                print(
-                    f"Компания: {item['company_name']}, Вакансия: {item['vacancy_name']}, {salary_info}, Ссылка: {item['url']}")
-            print("---")
+            print_vacancies(db_manager.iter_vacancies_with_keyword(keyword))
         elif choice == '0':
             print("Выход из программы.")
             break
@@ -116,30 +160,24 @@ def main() -> None:
     """
     Основная функция программы, которая запускает все процессы.
     """
-    load_dotenv()
-    db_params = {
-        "user": os.getenv("DB_USER"),
-        "password": os.getenv("DB_PASSWORD"),
-        "host": os.getenv("DB_HOST"),
-    }
-    db_name = os.getenv("DB_NAME")
+    db_name, db_params = load_db_config()
 
-    # Создание БД и загрузка данных (раскомментировать для первого запуска)
+    # Создание БД и загрузка данных (раскомментировать для первого запуска
+    # или использовать `python -m src.cli init` и `python -m src.cli ingest full`)
     # create_database(db_name, db_params)
     # create_tables(db_name, db_params)
-    # company_names = [
-    #     "ООО Синара-Девелопмент", "ООО Бантер Групп", "ПАО МегаФон", "Петрович, Строительный Торговый Дом",
-    #     "ООО Урс Групп", "ООО Брусника", "АО Уральский завод гражданской", "ВИТА. Офис",
-    #     "ТК Интеграл+", "ООО АДС-ЭЛЕКТРО"
-    # ]
-    # hh_api_client = HHApi(company_names)
-    # companies_data = hh_api_client.companies
-    # vacancies_data = hh_api_client.get_vacancies()
-    # all_data = {"companies": companies_data, "vacancies": vacancies_data}
-    # insert_data_to_db(db_name, db_params, all_data)
-
-    db_manager = DBManager(db_name, db_params)
-    user_interaction(db_manager)
+    # create_indexes(db_name, db_params)
+    # create_salary_stats(db_name, db_params)
+    # create_snapshot_table(db_name, db_params)
+    # create_job_table(db_name, db_params)
+    # hh_api_client = HHApi(COMPANY_NAMES, registry=EmployerRegistry(db_name, db_params))
+    # stream_ingest(db_name, db_params, hh_api_client)
+
+    # Ежедневное обновление без пересоздания БД (загружается только дельта)
+    # incremental_sync(db_name, db_params, HHApi(COMPANY_NAMES, registry=EmployerRegistry(db_name, db_params)))
+
+    with DBManager(db_name, db_params, **load_replica_config()) as db_manager:
+        user_interaction(db_manager)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Границы корзин гистограмм задержки в секундах
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """
+    Гистограмма значений с фиксированными корзинами.
+    """
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Легковесный реестр метрик: счетчики и гистограммы с метками.
+    Выключенный реестр ничего не делает, поэтому инструментирование почти
+    не влияет на производительность. Экспорт — в текстовом формате Prometheus
+    (строкой, файлом или HTTP-эндпоинтом) и в виде JSON-строк для логов.
+    """
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        :param enabled: Собирать ли метрики.
+        :param buckets: Границы корзин гистограмм.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Увеличивает счетчик.
+        :param name: Имя метрики.
+        :param value: Величина увеличения.
+        :param labels: Метки.
+        """
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """
+        Добавляет значение в гистограмму.
+        :param name: Имя метрики.
+        :param value: Значение (обычно длительность в секундах).
+        :param labels: Метки.
+        """
+        if not self.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Измеряет длительность блока и добавляет ее в гистограмму `name`.
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self) -> None:
+        """
+        Удаляет все собранные значения.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает собранные метрики в виде словаря.
+        """
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], histogram.counts)),
+                } for key, histogram in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        items = list(key) + ([extra] if extra else [])
+        if not items:
+            return ""
+        parts = []
+        for name, value in items:
+            value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            parts.append(f'{name}="{value}"')
+        return "{" + ",".join(parts) + "}"
+
+    def to_prometheus(self) -> str:
+        """
+        Возвращает метрики в текстовом формате Prometheus.
+        """
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{self._format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(list(self.buckets) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{self._format_labels(key, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Записывает метрики в файл (например, для textfile collector node_exporter).
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+    def log_json(self, path: str, event: str = "metrics") -> None:
+        """
+        Дописывает в файл одну JSON-строку с текущими метриками.
+        :param path: Путь к файлу лога.
+        :param event: Название события в записи.
+        """
+        record = {"event": event, "timestamp": time.time(), **self.snapshot()}
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def serve_prometheus(self, host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+        """
+        Запускает в фоновом потоке HTTP-эндпоинт `/metrics`.
+        :return: Сервер (для остановки вызовите `shutdown()`).
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Общий реестр метрик приложения; по умолчанию выключен
+metrics = Metrics()
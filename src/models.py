@@ -0,0 +1,70 @@
+from typing import Any, Dict, Optional, Tuple
+
+from src.currency import DEFAULT_RATES, salary_mid_rub
+
+
+class VacancyRecord:
+    """
+    Компактное представление вакансии: только поля, которые записываются в БД.
+    Создается из элемента ответа API сразу при получении страницы, после чего
+    исходный JSON можно отбросить. За счет `__slots__` занимает на порядок
+    меньше памяти, чем словарь с полным ответом.
+    """
+    __slots__ = ("id", "name", "salary_from", "salary_to", "url", "published_at", "currency", "gross", "raw")
+
+    def __init__(self, vacancy_id: int, name: str, salary_from: Optional[int], salary_to: Optional[int],
+                 url: Optional[str], published_at: Optional[str], raw: Optional[Dict[str, Any]] = None,
+                 currency: Optional[str] = None, gross: Optional[bool] = None):
+        """
+        :param vacancy_id: ID вакансии.
+        :param name: Название вакансии.
+        :param salary_from: Нижняя граница зарплаты.
+        :param salary_to: Верхняя граница зарплаты.
+        :param url: Ссылка на вакансию.
+        :param published_at: Дата публикации в формате API.
+        :param raw: Исходный JSON вакансии (сохраняется только по запросу).
+        :param currency: Код валюты зарплаты.
+        :param gross: Указана ли зарплата до вычета налогов.
+        """
+        self.id = vacancy_id
+        self.name = name
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.url = url
+        self.published_at = published_at
+        self.currency = currency
+        self.gross = gross
+        self.raw = raw
+
+    @classmethod
+    def from_json(cls, item: Dict[str, Any], keep_raw: bool = False) -> "VacancyRecord":
+        """
+        Создает запись из элемента `items` ответа API.
+        :param item: Вакансия в формате API hh.ru.
+        :param keep_raw: Сохранить ли исходный JSON в поле `raw`.
+        """
+        salary = item.get('salary')
+        return cls(
+            int(item['id']),
+            item['name'],
+            salary['from'] if salary and salary['from'] else None,
+            salary['to'] if salary and salary['to'] else None,
+            item.get('alternate_url'),
+            item.get('published_at'),
+            item if keep_raw else None,
+            salary.get('currency') if salary else None,
+            salary.get('gross') if salary else None
+        )
+
+    def as_row(self, company_id: int, rates: Optional[Dict[str, float]] = None) -> Tuple:
+        """
+        Возвращает строку таблицы `vacancies` в порядке `loader.VACANCY_COLUMNS`.
+        :param company_id: ID компании.
+        :param rates: Курсы валют для расчета `salary_mid_rub` (по умолчанию только рубли).
+        """
+        mid_rub = salary_mid_rub(self.salary_from, self.salary_to, self.currency, self.gross, rates or DEFAULT_RATES)
+        return (self.id, company_id, self.name, self.salary_from, self.salary_to, self.url, self.published_at,
+                self.currency, self.gross, mid_rub)
+
+    def __repr__(self) -> str:
+        return f"VacancyRecord(id={self.id}, name={self.name!r})"
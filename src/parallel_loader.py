@@ -0,0 +1,137 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+
+from src.currency import refresh_currency_rates
+from src.hh_api import HHApi
+from src.loader import (
+    RETRYABLE_ERRORS, bump_data_version, finish_ingest, insert_companies, load_vacancies, vacancy_row
+)
+
+
+def partition_companies(companies: Dict[str, Any], vacancies_by_company: Dict[str, List[Any]],
+                        workers: int) -> List[List[Tuple[str, int]]]:
+    """
+    Распределяет компании по потокам так, чтобы число вакансий в потоках было примерно равным
+    (крупные компании распределяются первыми, каждая — в наименее загруженный поток).
+    :return: Для каждого потока — список пар (название компании, ID компании).
+    """
+    partitions: List[List[Tuple[str, int]]] = [[] for _ in range(max(1, workers))]
+    loads = [0] * len(partitions)
+    for company_name in sorted(vacancies_by_company, key=lambda name: len(vacancies_by_company[name]), reverse=True):
+        index = loads.index(min(loads))
+        partitions[index].append((company_name, companies[company_name]['id']))
+        loads[index] += len(vacancies_by_company[company_name])
+    return [partition for partition in partitions if partition]
+
+
+def _load_partition(db_name: str, params: Dict[str, Any], worker: int, partition: List[Tuple[str, int]],
+                    vacancies_by_company: Dict[str, List[Any]], method: str, max_retries: int,
+                    rates: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Загружает вакансии компаний одной партиции через отдельное соединение.
+    Каждая компания фиксируется отдельной транзакцией, которая повторяется
+    при ошибках сериализации и взаимоблокировках.
+    """
+    started = time.perf_counter()
+    rows_total = 0
+    retries = 0
+    conn = psycopg2.connect(dbname=db_name, **params)
+    try:
+        for company_name, company_id in partition:
+            rows = [vacancy_row(vacancy, company_id, rates) for vacancy in vacancies_by_company[company_name]]
+            for attempt in range(max_retries + 1):
+                try:
+                    with conn.cursor() as cur:
+                        load_vacancies(cur, rows, method, report=False)
+                    conn.commit()
+                    break
+                except RETRYABLE_ERRORS:
+                    conn.rollback()
+                    if attempt == max_retries:
+                        raise
+                    retries += 1
+                    time.sleep(0.05 * 2 ** attempt)
+            rows_total += len(rows)
+    finally:
+        conn.close()
+    elapsed = time.perf_counter() - started
+    return {
+        "worker": worker,
+        "companies": len(partition),
+        "rows": rows_total,
+        "retries": retries,
+        "seconds": elapsed,
+        "rows_per_second": rows_total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def parallel_load(db_name: str, params: Dict[str, Any], hh_api_data: Dict[str, Any], workers: int = 4,
+                  method: str = "copy", max_retries: int = 3,
+                  hh_api: Optional[HHApi] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Параллельно загружает данные в БД: сначала компании, затем вакансии через
+    `workers` соединений, распределенных по компаниям. Если хотя бы один поток
+    завершился ошибкой, версия данных не увеличивается и шаги после загрузки не выполняются.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param hh_api_data: Данные в формате `insert_data_to_db` ({"companies": ..., "vacancies": ...}).
+    :param workers: Число соединений (потоков) записи.
+    :param method: Способ записи вакансий (`copy` или `values`).
+    :param max_retries: Сколько раз повторять транзакцию компании при ошибке сериализации.
+    :param hh_api: Клиент API для обновления курсов валют (по умолчанию создается временный).
+    :return: Сводка по каждому потоку или None, если загрузка завершилась ошибкой.
+    """
+    companies = hh_api_data.get('companies', {})
+    vacancies_by_company = hh_api_data.get('vacancies', {})
+    summaries: Optional[List[Dict[str, Any]]] = []
+    failed: List[int] = []
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+        rates_api = hh_api or HHApi([])
+        try:
+            rates = refresh_currency_rates(conn, rates_api)
+        finally:
+            if hh_api is None:
+                rates_api.close()
+        insert_companies(cur, companies)
+        conn.commit()
+
+        partitions = partition_companies(companies, vacancies_by_company, workers)
+        with ThreadPoolExecutor(max_workers=len(partitions) or 1) as executor:
+            futures = {
+                executor.submit(_load_partition, db_name, params, worker, partition,
+                                vacancies_by_company, method, max_retries, rates): worker
+                for worker, partition in enumerate(partitions)
+            }
+            for future in as_completed(futures):
+                try:
+                    summaries.append(future.result())
+                except (Exception, psycopg2.DatabaseError) as error:
+                    print(f"Ошибка в потоке загрузки {futures[future]}: {error}")
+                    failed.append(futures[future])
+        if failed:
+            raise RuntimeError(f"потоки {', '.join(map(str, sorted(failed)))} не загрузили свои компании")
+
+        bump_data_version(cur)
+        conn.commit()
+        finish_ingest(conn)
+
+        summaries.sort(key=lambda summary: summary["worker"])
+        for summary in summaries:
+            print(f"Поток {summary['worker']}: компаний {summary['companies']}, вакансий {summary['rows']}, "
+                  f"{summary['seconds']:.2f} с ({summary['rows_per_second']:.0f} строк/с), "
+                  f"повторов {summary['retries']}.")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при параллельной загрузке данных в БД: {error}")
+        summaries = None
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return summaries
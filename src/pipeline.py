@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import psycopg2
+
+from src.currency import refresh_currency_rates
+from src.hh_api import HHApi
+from src.metrics import metrics
+from src.loader import bump_data_version, finish_ingest, insert_companies, load_vacancies, vacancy_row
+
+# Маркер окончания потока страниц
+_END = object()
+
+
+def _put(pages: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """
+    Кладет элемент в очередь, ожидая свободного места, пока не выставлен флаг остановки.
+    :return: True, если элемент помещен в очередь.
+    """
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_pages(hh_api: HHApi, pages: queue.Queue, stop: threading.Event, errors: List[Exception],
+                   rates: Dict[str, float]) -> None:
+    """
+    Загружает страницы вакансий и кладет в очередь готовые строки таблицы `vacancies`.
+    Исходный JSON страницы отбрасывается сразу после преобразования.
+    """
+    try:
+        for company_name, items in hh_api.iter_vacancy_pages():
+            company_id = hh_api.companies[company_name]['id']
+            rows = [vacancy_row(vacancy, company_id, rates) for vacancy in items]
+            if not _put(pages, rows, stop):
+                return
+    except Exception as error:
+        errors.append(error)
+    finally:
+        _put(pages, _END, stop)
+
+
+def stream_ingest(db_name: str, params: Dict[str, Any], hh_api: HHApi, batch_size: int = 1000,
+                  commit_every: int = 5000, queue_size: int = 8, method: str = "copy") -> Optional[int]:
+    """
+    Потоковая загрузка вакансий: страницы загружаются в отдельном потоке и через
+    ограниченную очередь передаются загрузчику, который пишет их пакетами
+    и периодически фиксирует транзакцию. Пиковое потребление памяти определяется
+    размером очереди и пакета, а не общим числом вакансий.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param hh_api: Клиент API с уже найденными компаниями.
+    :param batch_size: Размер пакета записи в строках.
+    :param commit_every: Через сколько записанных строк фиксировать транзакцию.
+    :param queue_size: Максимальное число страниц в очереди между загрузкой и записью.
+    :param method: Способ записи вакансий (`copy` или `values`).
+    :return: Количество записанных вакансий или None, если загрузка завершилась ошибкой
+             (вакансии, записанные до ошибки, остаются в БД).
+    """
+    pages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors: List[Exception] = []
+    # Курсы заполняются до запуска потока загрузки страниц
+    rates: Dict[str, float] = {}
+    producer = threading.Thread(target=_produce_pages, args=(hh_api, pages, stop, errors, rates), daemon=True)
+
+    conn = None
+    total = 0
+    failed = False
+    started = time.perf_counter()
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+        insert_companies(cur, hh_api.companies)
+        conn.commit()
+        rates.update(refresh_currency_rates(conn, hh_api))
+
+        producer.start()
+        batch: List[Tuple] = []
+        uncommitted = 0
+        while True:
+            rows = pages.get()
+            if rows is _END:
+                break
+            batch.extend(rows)
+            if len(batch) >= batch_size:
+                load_vacancies(cur, batch, method, report=False)
+                total += len(batch)
+                uncommitted += len(batch)
+                batch = []
+                if uncommitted >= commit_every:
+                    bump_data_version(cur)
+                    with metrics.timer("db_commit_seconds"):
+                        conn.commit()
+                    uncommitted = 0
+        if batch:
+            load_vacancies(cur, batch, method, report=False)
+            total += len(batch)
+        bump_data_version(cur)
+        with metrics.timer("db_commit_seconds"):
+            conn.commit()
+        finish_ingest(conn)
+
+        if errors:
+            print(f"Ошибка при загрузке вакансий из API: {errors[0]}")
+            failed = True
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0.0
+        print(f"Потоковая загрузка завершена: {total} вакансий за {elapsed:.2f} с ({rate:.0f} строк/с).")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при загрузке данных в БД: {error}")
+        failed = True
+    finally:
+        stop.set()
+        if producer.is_alive():
+            producer.join()
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return None if failed else total
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# API hh.ru отдает не больше 2000 вакансий на один поисковый запрос
+MAX_RESULTS = 2000
+
+# Окно дат, которое делится пополам (вакансии на hh.ru живут в поиске около 30 дней)
+DATE_WINDOW = timedelta(days=30)
+
+# Окно короче этого дальше по дате не делится
+MIN_DATE_SPAN = timedelta(minutes=10)
+
+# Порядок разбиения: регион, затем дата публикации, затем профессиональная роль
+DEFAULT_STAGES = ("area", "date", "professional_role")
+
+# probe(filters, clusters) -> ответ API с `found` (и `clusters`, если запрошены) или None
+Probe = Callable[[Dict[str, Any], bool], Optional[Dict[str, Any]]]
+
+
+def format_date(value: datetime) -> str:
+    """
+    Форматирует дату для параметров `date_from` / `date_to`.
+    """
+    return value.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
+def cluster_shards(data: Dict[str, Any], cluster_id: str,
+                   filters: Dict[str, Any]) -> Optional[List[Tuple[Dict[str, Any], int]]]:
+    """
+    Строит шарды по кластеру ответа API (`clusters=true`).
+    :param data: Ответ API.
+    :param cluster_id: ID кластера (`area`, `professional_role`).
+    :param filters: Фильтры текущего запроса.
+    :return: Пары (фильтры шарда, число вакансий) или None, если кластера нет в ответе.
+    """
+    for cluster in data.get('clusters') or []:
+        if cluster.get('id') != cluster_id:
+            continue
+        shards = []
+        for item in cluster.get('items', []):
+            values = parse_qs(urlparse(item.get('url', '')).query).get(cluster_id)
+            if values:
+                shards.append((dict(filters, **{cluster_id: values[-1]}), item.get('count', 0)))
+        return shards
+    return None
+
+
+def split_date_range(filters: Dict[str, Any], now: datetime) -> List[Dict[str, Any]]:
+    """
+    Делит окно дат публикации пополам. Если нижней границы еще нет, добавляется
+    шард для вакансий, опубликованных раньше окна. Границы половин совпадают,
+    поэтому пограничные вакансии могут попасть в оба шарда — они убираются при дедупликации.
+    :param filters: Фильтры текущего запроса.
+    :param now: Текущее время.
+    :return: Фильтры шардов или пустой список, если окно уже слишком короткое.
+    """
+    high = datetime.fromisoformat(filters['date_to']) if 'date_to' in filters else now
+    low = datetime.fromisoformat(filters['date_from']) if 'date_from' in filters else high - DATE_WINDOW
+    if high - low <= MIN_DATE_SPAN:
+        return []
+    middle = low + (high - low) / 2
+    shards = [
+        dict(filters, date_from=format_date(low), date_to=format_date(middle)),
+        dict(filters, date_from=format_date(middle), date_to=format_date(high)),
+    ]
+    if 'date_from' not in filters:
+        shards.append(dict(filters, date_to=format_date(low)))
+    return shards
+
+
+def plan_shards(probe: Probe, filters: Dict[str, Any], found: Optional[int] = None,
+                stages: Iterable[str] = DEFAULT_STAGES, max_results: int = MAX_RESULTS,
+                now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Рекурсивно делит запрос на шарды, каждый из которых возвращает не больше `max_results` вакансий.
+    Сначала запрос делится по регионам (кластер `area`), крупные регионы — пополам по дате
+    публикации, а если и окно в несколько минут слишком велико — по профессиональным ролям.
+    :param probe: Функция пробного запроса.
+    :param filters: Фильтры исходного запроса.
+    :param found: Число вакансий по исходному запросу, если уже известно.
+    :param stages: Порядок разбиения.
+    :param max_results: Ограничение API на число результатов запроса.
+    :param now: Текущее время (для тестов).
+    :return: Фильтры шардов.
+    """
+    shards: List[Dict[str, Any]] = []
+    _split(probe, dict(filters), found, tuple(stages), shards, max_results, now or datetime.now(timezone.utc))
+    return shards
+
+
+def _split(probe: Probe, filters: Dict[str, Any], found: Optional[int], stages: Tuple[str, ...],
+           shards: List[Dict[str, Any]], max_results: int, now: datetime) -> None:
+    """
+    Добавляет в `shards` шарды запроса `filters`.
+    """
+    if found is None:
+        data = probe(filters, False)
+        if data is None:
+            # Число вакансий неизвестно: шард загружается как есть
+            shards.append(filters)
+            return
+        found = data.get('found', 0)
+    if found == 0:
+        return
+    if found <= max_results:
+        shards.append(filters)
+        return
+
+    for position, stage in enumerate(stages):
+        if stage == "date":
+            children = [(child, None) for child in split_date_range(filters, now)]
+            # Половины окна можно делить по дате и дальше
+            rest = stages[position:]
+        else:
+            if stage in filters:
+                continue
+            data = probe(filters, True)
+            children = cluster_shards(data, stage, filters) if data is not None else None
+            # Кластеры подходят, только если покрывают все вакансии запроса
+            if not children or sum(count for _, count in children) < found:
+                continue
+            rest = stages[position + 1:]
+        if children:
+            for child, count in children:
+                _split(probe, child, count, rest, shards, max_results, now)
+            return
+
+    print(f"Запрос {filters} не удалось разбить: будут загружены первые {max_results} из {found} вакансий.")
+    shards.append(filters)
+
+
+def unique_items(items: Iterable[Any], seen: Set[int]) -> List[Any]:
+    """
+    Отбрасывает вакансии, которые уже встречались в других шардах.
+    :param items: Вакансии (`VacancyRecord`).
+    :param seen: ID уже полученных вакансий; пополняется.
+    """
+    unique = []
+    for item in items:
+        if item.id not in seen:
+            seen.add(item.id)
+            unique.append(item)
+    return unique
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import psycopg2
+
+from src.currency import refresh_currency_rates
+from src.hh_api import HHApi
+from src.loader import bump_data_version, finish_ingest, insert_companies, upsert_vacancies, vacancy_row
+
+
+def _high_water_mark(rows: List[Tuple], previous: Optional[datetime]) -> Optional[datetime]:
+    """
+    Вычисляет новую отметку синхронизации: максимальную дату публикации среди строк.
+    :param rows: Строки таблицы `vacancies`.
+    :param previous: Предыдущая отметка.
+    """
+    mark = previous
+    for row in rows:
+        published_at = row[6]
+        if not published_at:
+            continue
+        if isinstance(published_at, str):
+            published_at = datetime.strptime(published_at, "%Y-%m-%dT%H:%M:%S%z")
+        if mark is None or published_at > mark:
+            mark = published_at
+    return mark
+
+
+def _archive_missing(cur, company_id: int, active_ids: List[int]) -> int:
+    """
+    Помечает архивными вакансии компании, которых нет среди открытых.
+    :return: Количество помеченных вакансий.
+    """
+    cur.execute(
+        "UPDATE vacancies SET archived = TRUE WHERE company_id = %s AND NOT archived AND NOT (vacancy_id = ANY(%s))",
+        (company_id, active_ids)
+    )
+    return cur.rowcount
+
+
+def sync_company(cur, hh_api: HHApi, company_id: int, since: Optional[datetime],
+                 overlap: timedelta, rates: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Синхронизирует вакансии одной компании.
+    Загружаются только вакансии, опубликованные или обновленные после отметки `since`
+    (с запасом `overlap`). Закрытые вакансии ищутся полным списком только если
+    открытых вакансий в БД больше, чем сообщает API.
+    :param cur: Курсор psycopg2.
+    :param hh_api: Клиент API.
+    :param company_id: ID компании.
+    :param since: Отметка предыдущей синхронизации или None для первой.
+    :param overlap: Запас по времени для вакансий, опубликованных во время прошлой синхронизации.
+    :param rates: Курсы валют для расчета `salary_mid_rub`.
+    :return: Статистика синхронизации компании.
+    """
+    date_from = (since - overlap).isoformat(timespec="seconds") if since else None
+    vacancies, found = hh_api.get_company_vacancies(company_id, date_from=date_from)
+    rows = [vacancy_row(vacancy, company_id, rates) for vacancy in vacancies]
+    upserted = upsert_vacancies(cur, rows)
+    # Если часть страниц не загрузилась, отметку не сдвигаем и архивацию не выполняем
+    complete = len(rows) >= found
+
+    archived = 0
+    if since is None:
+        if complete:
+            archived = _archive_missing(cur, company_id, [int(row[0]) for row in rows])
+    elif complete:
+        total_found = hh_api.count_vacancies(company_id)
+        cur.execute("SELECT COUNT(*) FROM vacancies WHERE company_id = %s AND NOT archived", (company_id,))
+        active = cur.fetchone()[0]
+        if total_found is not None and active > total_found:
+            all_vacancies, all_found = hh_api.get_company_vacancies(company_id)
+            all_rows = [vacancy_row(vacancy, company_id, rates) for vacancy in all_vacancies]
+            upserted += upsert_vacancies(cur, all_rows)
+            if len(all_rows) >= all_found:
+                archived = _archive_missing(cur, company_id, [int(row[0]) for row in all_rows])
+
+    mark = _high_water_mark(rows, since) if complete else since
+    cur.execute(
+        """
+        INSERT INTO sync_state (company_id, last_published_at, synced_at) VALUES (%s, %s, now())
+        ON CONFLICT (company_id) DO UPDATE SET last_published_at = EXCLUDED.last_published_at, synced_at = now()
+        """,
+        (company_id, mark)
+    )
+    return {"upserted": upserted, "archived": archived}
+
+
+def incremental_sync(db_name: str, params: Dict[str, Any], hh_api: HHApi,
+                     overlap: timedelta = timedelta(hours=1)) -> Optional[Dict[str, int]]:
+    """
+    Инкрементально обновляет данные без пересоздания базы.
+    Для каждой компании хранится отметка последней публикации в `sync_state`;
+    загружается только дельта, изменения применяются через ON CONFLICT DO UPDATE,
+    исчезнувшие вакансии помечаются архивными. Каждая компания фиксируется отдельно.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param hh_api: Клиент API с уже найденными компаниями.
+    :param overlap: Запас по времени при запросе дельты.
+    :return: Суммарное число обновленных и архивированных вакансий или None, если обновление
+             завершилось ошибкой (компании, обработанные до ошибки, остаются обновленными).
+    """
+    totals = {"upserted": 0, "archived": 0}
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+        insert_companies(cur, hh_api.companies)
+        cur.execute("SELECT company_id, last_published_at FROM sync_state")
+        marks = dict(cur.fetchall())
+        conn.commit()
+        rates = refresh_currency_rates(conn, hh_api)
+
+        for company_name, company_info in hh_api.companies.items():
+            company_id = company_info['id']
+            result = sync_company(cur, hh_api, company_id, marks.get(company_id), overlap, rates)
+            # Без изменений версия данных не увеличивается, и кэш DBManager не сбрасывается
+            if result["upserted"] or result["archived"]:
+                bump_data_version(cur)
+            conn.commit()
+            totals["upserted"] += result["upserted"]
+            totals["archived"] += result["archived"]
+            print(f"{company_name}: обновлено {result['upserted']}, в архиве {result['archived']}.")
+
+        finish_ingest(conn)
+        print("Инкрементальное обновление завершено.")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при инкрементальном обновлении: {error}")
+        totals = None
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return totals
@@ -0,0 +1,411 @@
+import json
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from src.currency import load_currency_rates
+from src.hh_api import HHApi
+from src.loader import bump_data_version, finish_ingest, insert_companies, upsert_vacancies, vacancy_row
+from src.sharding import MAX_RESULTS
+
+# Размер страницы вакансий в API hh.ru
+PAGE_SIZE = 100
+
+# Ключ advisory-блокировки, под которой выполняются шаги после загрузки
+FINISH_LOCK_KEY = 240_024
+
+# Задание из `ingest_jobs`: (job_id, company_id, filters, page_from, page_to)
+Job = Tuple[int, int, Dict[str, Any], int, int]
+
+ENQUEUE_QUERY = """
+    INSERT INTO ingest_jobs (company_id, filters, page_from, page_to) VALUES %s
+    ON CONFLICT (company_id, filters, page_from) DO UPDATE
+    SET page_to = EXCLUDED.page_to, status = 'pending', attempts = 0, worker_id = NULL,
+        lease_until = NULL, heartbeat_at = NULL, rows_loaded = NULL, error = NULL, updated_at = now()
+    WHERE ingest_jobs.status IN ('done', 'failed')
+"""
+
+# Задания, аренда которых истекла после последней попытки, больше не выдаются
+EXPIRE_QUERY = """
+    UPDATE ingest_jobs
+    SET status = 'failed', error = 'Аренда истекла', worker_id = NULL, lease_until = NULL, updated_at = now()
+    WHERE status = 'running' AND lease_until < now() AND attempts >= %(max_attempts)s
+"""
+
+# Свободное задание или задание с истекшей арендой (упавший рабочий процесс) выдается одному
+# процессу: строки, заблокированные другими процессами, пропускаются без ожидания
+CLAIM_QUERY = """
+    UPDATE ingest_jobs
+    SET status = 'running', worker_id = %(worker_id)s, attempts = attempts + 1,
+        lease_until = now() + %(lease)s, heartbeat_at = now(), updated_at = now()
+    WHERE job_id = (
+        SELECT job_id
+        FROM ingest_jobs
+        WHERE (status = 'pending' OR (status = 'running' AND lease_until < now()))
+          AND attempts < %(max_attempts)s
+        ORDER BY job_id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING job_id, company_id, filters, page_from, page_to
+"""
+
+HEARTBEAT_QUERY = """
+    UPDATE ingest_jobs
+    SET lease_until = now() + %s, heartbeat_at = now()
+    WHERE job_id = %s AND worker_id = %s AND status = 'running'
+"""
+
+COMPLETE_QUERY = """
+    UPDATE ingest_jobs
+    SET status = 'done', rows_loaded = %s, lease_until = NULL, error = NULL, updated_at = now()
+    WHERE job_id = %s AND worker_id = %s AND status = 'running'
+"""
+
+FAIL_QUERY = """
+    UPDATE ingest_jobs
+    SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+        worker_id = NULL, lease_until = NULL, error = %s, updated_at = now()
+    WHERE job_id = %s AND worker_id = %s AND status = 'running'
+"""
+
+# Задания, которые еще могут быть выполнены: свободные и занятые под действующую аренду
+ACTIVE_QUERY = """
+    SELECT count(*)
+    FROM ingest_jobs
+    WHERE status = 'pending' OR (status = 'running' AND lease_until >= now())
+"""
+
+
+class LeaseLost(Exception):
+    """
+    Аренда задания истекла, и задание могло быть выдано другому рабочему процессу.
+    """
+
+
+def page_ranges(pages: int, pages_per_job: int) -> List[Tuple[int, int]]:
+    """
+    Делит страницы `0..pages-1` на диапазоны по `pages_per_job` страниц.
+    :return: Пары (первая страница, последняя страница) включительно.
+    """
+    step = max(1, pages_per_job)
+    return [(start, min(start + step, pages) - 1) for start in range(0, pages, step)]
+
+
+def plan_jobs(hh_api: HHApi, pages_per_job: int = 5) -> List[Tuple[int, Dict[str, Any], int, int]]:
+    """
+    Строит задания загрузки для компаний клиента API. Число страниц определяется легким
+    пробным запросом; компании, у которых вакансий больше ограничения API, делятся на шарды,
+    и каждый шард получает диапазоны страниц по своему числу вакансий. Компания,
+    которая встречается в списке несколько раз, планируется один раз.
+    :param hh_api: Клиент API.
+    :param pages_per_job: Число страниц в одном задании.
+    :return: Задания (company_id, фильтры, первая страница, последняя страница).
+    """
+    jobs = []
+    planned = set()
+    for company_name, company in hh_api.companies.items():
+        if company['id'] in planned:
+            continue
+        planned.add(company['id'])
+        found = hh_api.count_vacancies(company['id'])
+        if found is None:
+            print(f"Не удалось получить число вакансий компании {company_name}, задания не созданы.")
+            continue
+        if found > MAX_RESULTS:
+            shards = [(shard, hh_api.count_vacancies(company['id'], shard))
+                      for shard in hh_api.plan_shards(company['id'], found=found)]
+        else:
+            shards = [({}, found)]
+        for shard, shard_found in shards:
+            # Если число вакансий шарда неизвестно, берется предел API:
+            # пустые страницы в конце диапазона не запрашиваются
+            shard_found = MAX_RESULTS if shard_found is None else min(shard_found, MAX_RESULTS)
+            for page_from, page_to in page_ranges(math.ceil(shard_found / PAGE_SIZE), pages_per_job):
+                jobs.append((company['id'], shard, page_from, page_to))
+    return jobs
+
+
+def enqueue_jobs(db_name: str, params: Dict[str, Any], hh_api: HHApi, pages_per_job: int = 5) -> int:
+    """
+    Сохраняет компании и ставит задания загрузки их вакансий в очередь `ingest_jobs`.
+    Уже поставленные задания не дублируются: выполненные и неудачные задания
+    снова становятся свободными, а ожидающие и выполняемые не меняются.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param hh_api: Клиент API со списком компаний.
+    :param pages_per_job: Число страниц в одном задании.
+    :return: Число заданий в плане.
+    """
+    # Повторяющиеся ключи в одном INSERT ... ON CONFLICT DO UPDATE приводят к ошибке
+    jobs = list({
+        (company_id, json.dumps(filters, sort_keys=True), page_from): (company_id, filters, page_from, page_to)
+        for company_id, filters, page_from, page_to in plan_jobs(hh_api, pages_per_job)
+    }.values())
+    conn = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+        insert_companies(cur, hh_api.companies)
+        if jobs:
+            execute_values(cur, ENQUEUE_QUERY, [
+                (company_id, Json(filters), page_from, page_to) for company_id, filters, page_from, page_to in jobs
+            ])
+        conn.commit()
+        print(f"В очередь поставлено заданий: {len(jobs)}.")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при постановке заданий в очередь: {error}")
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return len(jobs)
+
+
+def claim_job(conn, worker_id: str, lease: timedelta, max_attempts: int) -> Optional[Job]:
+    """
+    Забирает одно свободное задание под аренду.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    :param worker_id: Идентификатор рабочего процесса.
+    :param lease: Срок аренды.
+    :param max_attempts: Сколько раз задание может выдаваться.
+    :return: Задание или None, если свободных заданий нет.
+    """
+    args = {"worker_id": worker_id, "lease": lease, "max_attempts": max_attempts}
+    with conn.cursor() as cur:
+        cur.execute(EXPIRE_QUERY, args)
+        cur.execute(CLAIM_QUERY, args)
+        job = cur.fetchone()
+    conn.commit()
+    return tuple(job) if job is not None else None
+
+
+def complete_job(cur, job_id: int, worker_id: str, rows_loaded: int) -> None:
+    """
+    Отмечает задание выполненным в транзакции, которая записала его вакансии.
+    :raises LeaseLost: Если аренда задания уже перешла другому процессу.
+    """
+    cur.execute(COMPLETE_QUERY, (rows_loaded, job_id, worker_id))
+    if cur.rowcount == 0:
+        raise LeaseLost(f"Аренда задания {job_id} потеряна")
+
+
+def fail_job(conn, job_id: int, worker_id: str, max_attempts: int, error: str) -> None:
+    """
+    Возвращает задание в очередь или, если попытки исчерпаны, отмечает его неудачным.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FAIL_QUERY, (max_attempts, error, job_id, worker_id))
+    conn.commit()
+
+
+class Heartbeat:
+    """
+    Продлевает аренду текущего задания из фонового потока через отдельное соединение,
+    чтобы долгая загрузка страниц не приводила к повторной выдаче задания.
+    """
+    def __init__(self, db_name: str, params: Dict[str, Any], worker_id: str, lease: timedelta):
+        """
+        :param db_name: Имя базы данных.
+        :param params: Параметры подключения к БД.
+        :param worker_id: Идентификатор рабочего процесса.
+        :param lease: Срок аренды; продлевается каждую треть срока.
+        """
+        self.worker_id = worker_id
+        self.lease = lease
+        self.lost = threading.Event()
+        self._conn = psycopg2.connect(dbname=db_name, **params)
+        self._conn.autocommit = True
+        self._job_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def watch(self, job_id: int) -> None:
+        """
+        Начинает продлевать аренду задания.
+        """
+        with self._lock:
+            self._job_id = job_id
+            self.lost.clear()
+
+    def release(self) -> None:
+        """
+        Прекращает продлевать аренду текущего задания.
+        """
+        with self._lock:
+            self._job_id = None
+
+    def close(self) -> None:
+        """
+        Останавливает поток и закрывает соединение.
+        """
+        self._stop.set()
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease.total_seconds() / 3):
+            with self._lock:
+                job_id = self._job_id
+                if job_id is None:
+                    continue
+                try:
+                    with self._conn.cursor() as cur:
+                        cur.execute(HEARTBEAT_QUERY, (self.lease, job_id, self.worker_id))
+                        if cur.rowcount == 0:
+                            self.lost.set()
+                except psycopg2.Error as error:
+                    print(f"Ошибка при продлении аренды задания {job_id}: {error}")
+
+
+def process_job(conn, hh_api: HHApi, job: Job, worker_id: str, rates: Dict[str, float],
+                heartbeat: Optional[Heartbeat] = None) -> int:
+    """
+    Загружает страницы задания и записывает вакансии через upsert. Вакансии и отметка
+    о выполнении задания фиксируются одной транзакцией, поэтому повторное выполнение
+    задания (после падения процесса или истечения аренды) не создает дубликатов.
+    :param conn: Соединение psycopg2 без незафиксированных изменений.
+    :param hh_api: Клиент API.
+    :param job: Задание из `claim_job`.
+    :param worker_id: Идентификатор рабочего процесса.
+    :param rates: Курсы валют.
+    :param heartbeat: Продление аренды задания.
+    :return: Число загруженных вакансий.
+    :raises LeaseLost: Если аренда задания потеряна.
+    """
+    job_id, company_id, filters, page_from, page_to = job
+    vacancies = hh_api.get_page_range(company_id, page_from, page_to, filters)
+    if vacancies is None:
+        raise RuntimeError(f"Не удалось загрузить страницы {page_from}-{page_to} компании {company_id}")
+    if heartbeat is not None and heartbeat.lost.is_set():
+        raise LeaseLost(f"Аренда задания {job_id} потеряна")
+    try:
+        with conn.cursor() as cur:
+            count = upsert_vacancies(cur, [vacancy_row(vacancy, company_id, rates) for vacancy in vacancies])
+            complete_job(cur, job_id, worker_id, count)
+            bump_data_version(cur)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return count
+
+
+def queue_status(db_name: str, params: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Считает задания очереди по статусам.
+    :return: Словарь {статус: число заданий}.
+    """
+    conn = None
+    status = {}
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        cur = conn.cursor()
+        cur.execute("SELECT status, count(*) FROM ingest_jobs GROUP BY status ORDER BY status")
+        status = dict(cur.fetchall())
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка при чтении очереди заданий: {error}")
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+    return status
+
+
+def default_worker_id() -> str:
+    """
+    Возвращает идентификатор рабочего процесса: хост, PID и случайный суффикс.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(db_name: str, params: Dict[str, Any], hh_api: Optional[HHApi] = None,
+               worker_id: Optional[str] = None, lease: timedelta = timedelta(minutes=2),
+               max_attempts: int = 3, poll_interval: float = 5.0) -> Dict[str, int]:
+    """
+    Рабочий процесс распределенной загрузки. Забирает задания из очереди, пока они есть;
+    если свободных заданий нет, но другие процессы еще выполняют свои, ждет: задания
+    упавших процессов снова выдаются после истечения аренды. Когда очередь пуста, один из
+    процессов (под advisory-блокировкой) обновляет статистику зарплат и историю.
+    Несколько процессов на разных хостах запускаются против одной БД.
+    :param db_name: Имя базы данных.
+    :param params: Параметры подключения к БД.
+    :param hh_api: Клиент API (список компаний не нужен).
+    :param worker_id: Идентификатор рабочего процесса.
+    :param lease: Срок аренды задания.
+    :param max_attempts: Сколько раз задание может выдаваться.
+    :param poll_interval: Пауза между проверками очереди в секундах.
+    :return: Число выполненных и неудачных заданий и загруженных вакансий.
+    """
+    hh_api = hh_api or HHApi([])
+    worker_id = worker_id or default_worker_id()
+    stats = {"done": 0, "failed": 0, "rows": 0}
+    conn = None
+    heartbeat = None
+    try:
+        conn = psycopg2.connect(dbname=db_name, **params)
+        with conn.cursor() as cur:
+            rates = load_currency_rates(cur)
+        conn.commit()
+        heartbeat = Heartbeat(db_name, params, worker_id, lease)
+
+        while True:
+            job = claim_job(conn, worker_id, lease, max_attempts)
+            if job is None:
+                with conn.cursor() as cur:
+                    cur.execute(ACTIVE_QUERY)
+                    active = cur.fetchone()[0]
+                conn.commit()
+                if not active:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            heartbeat.watch(job[0])
+            try:
+                stats["rows"] += process_job(conn, hh_api, job, worker_id, rates, heartbeat)
+                stats["done"] += 1
+            except LeaseLost as error:
+                print(f"{error}, результат задания отброшен.")
+            except (Exception, psycopg2.DatabaseError) as error:
+                print(f"Ошибка при выполнении задания {job[0]}: {error}")
+                stats["failed"] += 1
+                fail_job(conn, job[0], worker_id, max_attempts, str(error))
+            finally:
+                heartbeat.release()
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (FINISH_LOCK_KEY,))
+            locked = cur.fetchone()[0]
+        conn.commit()
+        if locked:
+            try:
+                finish_ingest(conn)
+            finally:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", (FINISH_LOCK_KEY,))
+                conn.commit()
+        print(f"Процесс {worker_id}: выполнено заданий {stats['done']}, неудачных {stats['failed']}, "
+              f"вакансий {stats['rows']}.")
+
+    except (Exception, psycopg2.DatabaseError) as error:
+        print(f"Ошибка в рабочем процессе {worker_id}: {error}")
+    finally:
+        if heartbeat is not None:
+            heartbeat.close()
+        if conn is not None:
+            conn.close()
+    return stats
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.async_db_manager import AsyncDBManager
+from src.db_manager import to_numbered_query
+
+
+class TestToAsyncpgQuery(unittest.TestCase):
+    """
+    Класс для тестирования перевода запросов в формат asyncpg.
+    """
+
+    def test_positional(self):
+        """
+        Тестирует позиционные параметры и экранированный процент.
+        """
+        query, values = to_numbered_query("SELECT * FROM t WHERE a ILIKE %s AND b %% c AND d > %s", ('%x%', 5))
+        self.assertEqual(query, "SELECT * FROM t WHERE a ILIKE $1 AND b % c AND d > $2")
+        self.assertEqual(values, ['%x%', 5])
+
+    def test_named_repeated(self):
+        """
+        Тестирует повторяющиеся именованные параметры.
+        """
+        query, values = to_numbered_query("SELECT %(q)s, %(limit)s, %(q)s", {'q': 'py', 'limit': 10})
+        self.assertEqual(query, "SELECT $1, $2, $1")
+        self.assertEqual(values, ['py', 10])
+
+
+class TestAsyncDBManager(unittest.IsolatedAsyncioTestCase):
+    """
+    Класс для тестирования AsyncDBManager с мокированным пулом asyncpg.
+    """
+
+    async def test_get_vacancies_with_keyword(self):
+        """
+        Тестирует выполнение запроса через пул и формат результата.
+        """
+        conn = MagicMock()
+        conn.fetch = AsyncMock(return_value=[(1, 'Компания', 'Python', 100, 200, 'url')])
+        pool = MagicMock()
+        pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+        pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+        pool.close = AsyncMock()
+        fake_asyncpg = MagicMock()
+        fake_asyncpg.create_pool = AsyncMock(return_value=pool)
+
+        with patch('src.async_db_manager.asyncpg', fake_asyncpg):
+            async with AsyncDBManager('db', {'user': 'u'}) as db_manager:
+                result = await db_manager.get_vacancies_with_keyword('Python')
+
+        self.assertEqual(result[0]['vacancy_name'], 'Python')
+        query, keyword = conn.fetch.call_args.args
+        self.assertIn('ILIKE $1', query)
+        self.assertEqual(keyword, '%Python%')
+        pool.close.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+from src.cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    """
+    Класс для тестирования кэша результатов запросов.
+    """
+
+    def test_hit_and_miss(self):
+        """
+        Тестирует попадание в кэш и учет статистики.
+        """
+        cache = QueryCache()
+        self.assertEqual(cache.get('key', 1), (False, None))
+        cache.put('key', [1, 2], version=1, ttl=60)
+        self.assertEqual(cache.get('key', 1), (True, [1, 2]))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_version_change_invalidates(self):
+        """
+        Тестирует, что запись не выдается после смены версии данных.
+        """
+        cache = QueryCache()
+        cache.put('key', 'value', version=1, ttl=60)
+        self.assertEqual(cache.get('key', 2), (False, None))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    @patch('src.cache.time.monotonic')
+    def test_ttl_expiry(self, mock_monotonic):
+        """
+        Тестирует истечение времени жизни записи.
+        """
+        mock_monotonic.return_value = 100.0
+        cache = QueryCache(ttl={'get_avg_salary': 10})
+        cache.put('key', 1.0, version=1, ttl=cache.ttl_for('get_avg_salary'))
+        mock_monotonic.return_value = 111.0
+        self.assertEqual(cache.get('key', 1), (False, None))
+
+    def test_lru_eviction_by_entries(self):
+        """
+        Тестирует вытеснение давно не использованных записей.
+        """
+        cache = QueryCache(max_entries=2)
+        cache.put('a', 1, version=1, ttl=60)
+        cache.put('b', 2, version=1, ttl=60)
+        cache.get('a', 1)
+        cache.put('c', 3, version=1, ttl=60)
+        self.assertTrue(cache.get('a', 1)[0])
+        self.assertFalse(cache.get('b', 1)[0])
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_budget(self):
+        """
+        Тестирует ограничение по объему: слишком большие значения не кэшируются.
+        """
+        cache = QueryCache(max_bytes=100)
+        cache.put('big', 'x' * 1000, version=1, ttl=60)
+        self.assertEqual(cache.stats()['entries'], 0)
+        cache.put('small', 'x', version=1, ttl=60)
+        self.assertLessEqual(cache.stats()['bytes'], 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.cli import build_parser, cmd_ingest, cmd_init, cmd_query, cmd_snapshot, main
+from src.metrics import metrics
+
+
+class TestCli(unittest.TestCase):
+    """
+    Класс для тестирования командной строки.
+    """
+
+    def test_parser_subcommands(self):
+        """
+        Тестирует разбор подкоманд и их параметров.
+        """
+        parser = build_parser()
+        args = parser.parse_args(['ingest', 'incremental', '--companies', 'А', 'Б'])
+        self.assertEqual((args.mode, args.companies), ('incremental', ['А', 'Б']))
+        args = parser.parse_args(['query', 'keyword', '-k', 'python', '--format', 'jsonl'])
+        self.assertEqual((args.name, args.keyword, args.format), ('keyword', 'python', 'jsonl'))
+        with self.assertRaises(SystemExit):
+            parser.parse_args(['query', 'unknown'])
+
+    @patch('src.cli.DBManager')
+    def test_query_streams_from_server_side_iterator(self, mock_manager):
+        """
+        Тестирует, что списки вакансий берутся из потокового метода и пишутся в stdout.
+        """
+        db_manager = MagicMock()
+        mock_manager.return_value.__enter__.return_value = db_manager
+        db_manager.iter_vacancies_with_keyword.return_value = iter([
+            {'vacancy_id': 1, 'company_name': 'Сбер', 'vacancy_name': 'Python', 'salary_from': None,
+             'salary_to': 100, 'url': 'u'}
+        ])
+        args = build_parser().parse_args(['query', 'keyword', '-k', 'python', '--format', 'jsonl'])
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            self.assertEqual(cmd_query(args, 'db', {}), 0)
+
+        db_manager.iter_vacancies_with_keyword.assert_called_once_with('python', 2000)
+        db_manager.get_vacancies_with_keyword.assert_not_called()
+        self.assertIn('"vacancy_name": "Python"', stdout.getvalue())
+
+    @patch('src.cli.DBManager')
+    def test_query_requires_keyword(self, mock_manager):
+        """
+        Тестирует код ошибки, если для поиска не указано ключевое слово.
+        """
+        args = build_parser().parse_args(['query', 'search'])
+        with patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(cmd_query(args, 'db', {}), 2)
+        mock_manager.assert_not_called()
+
+    @patch('src.cli.DuckDBManager')
+    @patch('src.cli.DBManager')
+    def test_query_snapshot_uses_duckdb(self, mock_manager, mock_duckdb):
+        """
+        Тестирует, что с параметром --snapshot запрос выполняется по снимку без PostgreSQL.
+        """
+        db_manager = MagicMock()
+        mock_duckdb.return_value.__enter__.return_value = db_manager
+        db_manager.get_avg_salary.return_value = 1.5
+        args = build_parser().parse_args(['query', 'avg-salary', '--snapshot', 'snap', '--format', 'jsonl'])
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout, patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(cmd_query(args, 'db', {}), 0)
+            args = build_parser().parse_args(['query', 'salary-trend', '--snapshot', 'snap'])
+            self.assertEqual(cmd_query(args, 'db', {}), 2)
+
+        mock_duckdb.assert_called_once_with('snap')
+        mock_manager.assert_not_called()
+        self.assertEqual(stdout.getvalue(), '{"avg_salary": 1.5}\n')
+
+    @patch('src.cli.create_job_table')
+    @patch('src.cli.create_snapshot_table')
+    @patch('src.cli.create_salary_stats')
+    @patch('src.cli.create_indexes')
+    @patch('src.cli.create_tables')
+    @patch('src.cli.create_database')
+    def test_init_keep_database(self, mock_database, mock_tables, mock_indexes, mock_stats, mock_snapshots,
+                                mock_jobs):
+        """
+        Тестирует, что `init --keep-database` не пересоздает базу.
+        """
+        args = build_parser().parse_args(['init', '--keep-database'])
+        cmd_init(args, 'db', {})
+        mock_database.assert_not_called()
+        mock_tables.assert_called_once_with('db', {})
+        mock_snapshots.assert_called_once_with('db', {})
+        mock_jobs.assert_called_once_with('db', {})
+
+
+    def test_init_fails_when_database_unreachable(self):
+        """
+        Тестирует ненулевой код завершения, если база данных недоступна.
+        """
+        args = build_parser().parse_args(['init'])
+        with patch('sys.stdout', new_callable=io.StringIO):
+            self.assertEqual(cmd_init(args, 'db', {'host': '/nonexistent', 'connect_timeout': 1}), 1)
+
+    @patch('src.cli.export_snapshot')
+    @patch('src.cli.stream_ingest', return_value=None)
+    @patch('src.cli.EmployerRegistry')
+    @patch('src.cli.HHApi')
+    def test_failed_ingest_skips_snapshot(self, mock_api, mock_registry, mock_ingest, mock_export):
+        """
+        Тестирует, что после неудачной загрузки снимок не выгружается, а код завершения ненулевой.
+        """
+        args = build_parser().parse_args(['ingest', 'full', '--snapshot', 'snap'])
+        self.assertEqual(cmd_ingest(args, 'db', {}), 1)
+        mock_export.assert_not_called()
+        mock_api.return_value.close.assert_called_once()
+
+    @patch('src.cli.parallel_load', return_value=None)
+    @patch('src.cli.stream_ingest')
+    @patch('src.cli.EmployerRegistry')
+    @patch('src.cli.HHApi')
+    def test_ingest_db_workers_uses_parallel_load(self, mock_api, mock_registry, mock_stream, mock_parallel):
+        """
+        Тестирует, что с параметром --db-workers полная загрузка пишет в БД параллельно,
+        а ошибка параллельной загрузки дает ненулевой код завершения.
+        """
+        args = build_parser().parse_args(['ingest', 'full', '--db-workers', '4'])
+        self.assertEqual(cmd_ingest(args, 'db', {}), 1)
+        mock_stream.assert_not_called()
+        self.assertEqual(mock_parallel.call_args.kwargs['workers'], 4)
+
+    @patch('src.cli.stream_ingest', return_value=10)
+    @patch('src.cli.EmployerRegistry')
+    @patch('src.cli.HHApi')
+    def test_ingest_replays_from_http_cache(self, mock_api, mock_registry, mock_ingest):
+        """
+        Тестирует, что --http-cache и --replay передают в HHApi кэш ответов в режиме воспроизведения,
+        а --replay без файла кэша отклоняется.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'responses.sqlite')
+            args = build_parser().parse_args(['ingest', 'full', '--http-cache', path, '--replay'])
+
+            self.assertEqual(cmd_ingest(args, 'db', {}), 0)
+
+            response_cache = mock_api.call_args.kwargs['response_cache']
+            self.assertEqual((response_cache.path, response_cache.replay_only), (path, True))
+
+        args = build_parser().parse_args(['ingest', 'full', '--replay'])
+        with patch('sys.stderr', new_callable=io.StringIO):
+            self.assertEqual(cmd_ingest(args, 'db', {}), 2)
+
+    @patch('src.cli.export_snapshot')
+    def test_partial_snapshot_fails(self, mock_export):
+        """
+        Тестирует ненулевой код завершения, если выгружена только часть таблиц снимка.
+        """
+        args = build_parser().parse_args(['snapshot', 'snap'])
+        mock_export.return_value = {'companies': 3}
+        self.assertEqual(cmd_snapshot(args, 'db', {}), 1)
+        mock_export.return_value = {'companies': 3, 'vacancies': 10}
+        self.assertEqual(cmd_snapshot(args, 'db', {}), 0)
+
+
+    @patch('src.cli.load_db_config', return_value=('db', {}))
+    @patch('src.cli.export_snapshot')
+    def test_metrics_exported_after_command(self, mock_export, mock_config):
+        """
+        Тестирует, что параметры --metrics-file и --metrics-log включают сбор метрик
+        и сохраняют их после выполнения команды.
+        """
+        mock_export.side_effect = lambda *args: metrics.inc("snapshot_rows_total", 3) or {}
+        self.addCleanup(setattr, metrics, 'enabled', metrics.enabled)
+        self.addCleanup(metrics.reset)
+        with tempfile.TemporaryDirectory() as directory:
+            prometheus_path = os.path.join(directory, 'metrics.prom')
+            log_path = os.path.join(directory, 'metrics.jsonl')
+
+            main(['--metrics-file', prometheus_path, '--metrics-log', log_path, 'snapshot', 'snap'])
+
+            with open(prometheus_path, encoding='utf-8') as file:
+                self.assertIn('snapshot_rows_total 3', file.read())
+            with open(log_path, encoding='utf-8') as file:
+                self.assertEqual(json.loads(file.readline())['event'], 'snapshot')
+
+
+if __name__ == '__main__':
+    unittest.main()
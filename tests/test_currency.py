@@ -0,0 +1,127 @@
+import unittest
+import os
+from unittest.mock import MagicMock, Mock, patch
+
+import psycopg2
+from dotenv import load_dotenv
+
+from src.currency import load_currency_rates, refresh_currency_rates, salary_mid_rub
+from src.database import create_database, create_tables
+
+RATES = {'RUR': 1.0, 'USD': 0.01}
+
+
+class TestCurrency(unittest.TestCase):
+    """
+    Класс для тестирования приведения зарплат к рублям.
+    """
+
+    def test_single_bound_is_not_halved(self):
+        """
+        Тестирует, что при одной указанной границе берется она сама.
+        """
+        self.assertEqual(salary_mid_rub(100000, None, 'RUR', False, RATES), 100000.0)
+        self.assertEqual(salary_mid_rub(None, 80000, None, False, RATES), 80000.0)
+        self.assertEqual(salary_mid_rub(100000, 200000, 'RUR', False, RATES), 150000.0)
+
+    def test_currency_and_gross(self):
+        """
+        Тестирует перевод из валюты в рубли и вычет НДФЛ для зарплат до вычета налогов.
+        """
+        self.assertEqual(salary_mid_rub(1000, 3000, 'USD', False, RATES), 200000.0)
+        self.assertEqual(salary_mid_rub(100000, None, 'RUR', True, RATES), 87000.0)
+
+    def test_unknown_currency_or_no_salary(self):
+        """
+        Тестирует, что без зарплаты или курса валюты значение не вычисляется.
+        """
+        self.assertIsNone(salary_mid_rub(None, None, 'RUR', False, RATES))
+        self.assertIsNone(salary_mid_rub(1000, None, 'KZT', False, RATES))
+
+    def test_load_currency_rates_keeps_rub(self):
+        """
+        Тестирует загрузку курсов из таблицы: рубль доступен даже при пустой таблице.
+        """
+        cur = Mock()
+        cur.fetchall.return_value = [('USD', 0.011)]
+        self.assertEqual(load_currency_rates(cur), {'RUR': 1.0, 'USD': 0.011})
+
+    @patch('src.currency.save_currency_rates')
+    def test_refresh_uses_api_only_when_stale(self, mock_save):
+        """
+        Тестирует обновление курсов из API только при устаревших сохраненных курсах.
+        """
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.fetchone.return_value = (True,)
+        cur.fetchall.return_value = []
+        hh_api = Mock()
+
+        refresh_currency_rates(conn, hh_api)
+        hh_api.get_currency_rates.assert_not_called()
+
+        cur.fetchone.return_value = (None,)
+        hh_api.get_currency_rates.return_value = {'RUR': 1.0, 'USD': 0.011}
+        refresh_currency_rates(conn, hh_api)
+        hh_api.get_currency_rates.assert_called_once()
+        mock_save.assert_called_once_with(cur, {'RUR': 1.0, 'USD': 0.011})
+
+
+class TestCurrencyRatesDatabase(unittest.TestCase):
+    """
+    Класс для тестирования обновления курсов валют на реальной базе данных.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Создает тестовую базу данных с таблицей `currency_rates`.
+        """
+        load_dotenv()
+        cls.db_params = {
+            "user": os.getenv("DB_USER"),
+            "password": os.getenv("DB_PASSWORD"),
+            "host": os.getenv("DB_HOST"),
+        }
+        cls.test_db_name = "test_currency_rates"
+        create_database(cls.test_db_name, cls.db_params)
+        create_tables(cls.test_db_name, cls.db_params)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Удаляет тестовую базу данных.
+        """
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname='postgres', **cls.db_params)
+            conn.autocommit = True
+            cur = conn.cursor()
+            cur.execute(f"DROP DATABASE IF EXISTS {cls.test_db_name}")
+        except (Exception, psycopg2.DatabaseError):
+            pass
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
+
+    def test_first_refresh_after_init_fetches_rates(self):
+        """
+        Тестирует, что сразу после создания таблиц курсы загружаются из API
+        (рубль, записанный при создании, не делает курсы свежими), а затем берутся из таблицы.
+        """
+        hh_api = Mock()
+        hh_api.get_currency_rates.return_value = {'RUR': 1.0, 'USD': 0.011}
+        conn = psycopg2.connect(dbname=self.test_db_name, **self.db_params)
+        try:
+            rates = refresh_currency_rates(conn, hh_api)
+            self.assertEqual(rates, {'RUR': 1.0, 'USD': 0.011})
+
+            rates = refresh_currency_rates(conn, hh_api)
+            self.assertEqual(rates['USD'], 0.011)
+            hh_api.get_currency_rates.assert_called_once()
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ import os
 import psycopg2
 from dotenv import load_dotenv
 
-from src.database import create_database, create_tables
+from src.database import create_database, create_tables, create_indexes
 
 
 class TestDatabase(unittest.TestCase):
@@ -73,3 +73,67 @@ class TestDatabase(unittest.TestCase):
             if conn is not None:
                 cur.close()
                 conn.close()
+
+    def test_create_indexes(self):
+        """
+        Тестирует создание поисковых индексов.
+        """
+        create_database(self.test_db_name, self.db_params)
+        create_tables(self.test_db_name, self.db_params)
+        create_indexes(self.test_db_name, self.db_params)
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname=self.test_db_name, **self.db_params)
+            cur = conn.cursor()
+            cur.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'vacancies';")
+            indexes = [index[0] for index in cur.fetchall()]
+            self.assertIn('vacancies_name_trgm_idx', indexes)
+            self.assertIn('vacancies_name_tsv_idx', indexes)
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
+
+    def test_create_tables_upgrades_existing_schema(self):
+        """
+        Тестирует, что повторное создание таблиц на базе прежней схемы не падает,
+        а добавляет недостающие таблицы и колонки.
+        """
+        create_database(self.test_db_name, self.db_params)
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname=self.test_db_name, **self.db_params)
+            cur = conn.cursor()
+            cur.execute("""
+                CREATE TABLE companies (
+                    company_id INTEGER PRIMARY KEY,
+                    company_name VARCHAR(255) NOT NULL,
+                    url VARCHAR(255)
+                );
+                CREATE TABLE vacancies (
+                    vacancy_id INTEGER PRIMARY KEY,
+                    company_id INTEGER NOT NULL REFERENCES companies(company_id),
+                    vacancy_name VARCHAR(255) NOT NULL,
+                    salary_from INTEGER,
+                    salary_to INTEGER,
+                    url VARCHAR(255)
+                );
+            """)
+            conn.commit()
+
+            create_tables(self.test_db_name, self.db_params)
+            create_tables(self.test_db_name, self.db_params)
+
+            cur.execute("SELECT table_name FROM information_schema.tables WHERE table_schema='public';")
+            tables = [table[0] for table in cur.fetchall()]
+            for table in ('sync_state', 'data_version', 'employer_registry', 'currency_rates'):
+                self.assertIn(table, tables)
+            cur.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'vacancies';")
+            columns = [column[0] for column in cur.fetchall()]
+            for column in ('published_at', 'salary_currency', 'salary_gross', 'salary_mid_rub', 'archived',
+                           'vacancy_name_tsv'):
+                self.assertIn(column, columns)
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
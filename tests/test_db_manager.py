@@ -1,10 +1,17 @@
 import unittest
+import io
 import os
+import time
+from unittest.mock import MagicMock, patch
+
 import psycopg2
 from dotenv import load_dotenv
 
+from src.cache import QueryCache
 from src.db_manager import DBManager
-from src.database import create_database, create_tables
+from src.database import (
+    create_database, create_tables, create_indexes, create_salary_stats, create_snapshot_table
+)
 from src.hh_api import HHApi
 from src.main import insert_data_to_db
 
@@ -31,6 +38,9 @@ class TestDBManager(unittest.TestCase):
         # Создание и заполнение тестовой БД
         create_database(cls.test_db_name, cls.db_params)
         create_tables(cls.test_db_name, cls.db_params)
+        create_indexes(cls.test_db_name, cls.db_params)
+        create_salary_stats(cls.test_db_name, cls.db_params)
+        create_snapshot_table(cls.test_db_name, cls.db_params)
 
         company_names = [
             "ООО Синара-Девелопмент", "ПАО МегаФон", "Петрович, Строительный Торговый Дом"
@@ -49,6 +59,7 @@ class TestDBManager(unittest.TestCase):
         Удаление тестовой базы данных.
         Выполняется один раз после всех тестов.
         """
+        cls.db_manager.close()
         conn = None
         try:
             conn = psycopg2.connect(dbname='postgres', **cls.db_params)
@@ -87,6 +98,32 @@ class TestDBManager(unittest.TestCase):
         self.assertIsInstance(avg_salary, float)
         self.assertTrue(avg_salary >= 0)
 
+    def test_get_salary_stats(self):
+        """
+        Тестирует метод get_salary_stats: есть итоговая строка и средняя совпадает с get_avg_salary.
+        """
+        result = self.db_manager.get_salary_stats()
+        totals = [item for item in result if item['company_name'] is None]
+        self.assertEqual(len(totals), 1)
+        self.assertAlmostEqual(totals[0]['salary_avg'] or 0.0, self.db_manager.get_avg_salary())
+
+    def test_get_vacancy_count_trend(self):
+        """
+        Тестирует метод get_vacancy_count_trend: после загрузки есть снимок за сегодня.
+        """
+        result = self.db_manager.get_vacancy_count_trend(days=1)
+        self.assertTrue(len(result) > 0)
+        self.assertIsInstance(result[0]['vacancies_count'], int)
+
+    def test_get_avg_salary_trend(self):
+        """
+        Тестирует метод get_avg_salary_trend.
+        """
+        result = self.db_manager.get_avg_salary_trend(weeks=1)
+        self.assertIsInstance(result, list)
+        if result:
+            self.assertIsInstance(result[0]['avg_salary'], float)
+
     def test_get_vacancies_with_higher_salary(self):
         """
         Тестирует метод get_vacancies_with_higher_salary.
@@ -104,6 +141,320 @@ class TestDBManager(unittest.TestCase):
         if result:
             self.assertIn(keyword.lower(), result[0]['vacancy_name'].lower())
 
+    def test_search_vacancies(self):
+        """
+        Тестирует ранжированный поиск в обоих режимах.
+        """
+        for mode in ("fulltext", "trigram"):
+            result = self.db_manager.search_vacancies("менеджер", mode=mode, limit=10)
+            self.assertIsInstance(result, list)
+            self.assertTrue(len(result) <= 10)
+            ranks = [item['rank'] for item in result]
+            self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+
+class TestDBManagerPool(unittest.TestCase):
+    """
+    Класс для тестирования пула соединений DBManager без реальной БД.
+    """
+
+    def make_connection(self, healthy=True):
+        conn = MagicMock()
+        conn.closed = 0
+        if not healthy:
+            conn.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError()
+        return conn
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_connection_reused_and_returned(self, mock_pool_cls):
+        """
+        Тестирует, что пул создается один раз, а соединение возвращается в пул.
+        """
+        conn = self.make_connection()
+        pool = mock_pool_cls.return_value
+        pool.getconn.return_value = conn
+        db_manager = DBManager('db', {'user': 'u'}, min_connections=1, max_connections=2)
+
+        with db_manager._connection() as first:
+            self.assertIs(first, conn)
+        with db_manager._connection():
+            pass
+
+        mock_pool_cls.assert_called_once_with(1, 2, dbname='db', user='u')
+        self.assertEqual(pool.putconn.call_count, 2)
+        # Второе соединение выдано без повторной проверки SELECT 1
+        self.assertEqual(conn.cursor.call_count, 1)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_broken_connection_replaced(self, mock_pool_cls):
+        """
+        Тестирует, что неисправное соединение закрывается и заменяется.
+        """
+        broken, healthy = self.make_connection(healthy=False), self.make_connection()
+        pool = mock_pool_cls.return_value
+        pool.getconn.side_effect = [broken, healthy]
+        db_manager = DBManager('db', {})
+
+        with db_manager._connection() as conn:
+            self.assertIs(conn, healthy)
+
+        pool.putconn.assert_any_call(broken, close=True)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_context_manager_closes_pool(self, mock_pool_cls):
+        """
+        Тестирует закрытие пула при выходе из контекстного менеджера.
+        """
+        mock_pool_cls.return_value.getconn.return_value = self.make_connection()
+        with DBManager('db', {}) as db_manager:
+            with db_manager._connection():
+                pass
+        mock_pool_cls.return_value.closeall.assert_called_once()
+
+
+class TestDBManagerPoolReplicas(unittest.TestCase):
+    """
+    Класс для тестирования распределения чтения по репликам без реальной БД.
+    """
+
+    def make_connection(self, lag=0.0):
+        conn = MagicMock()
+        conn.closed = 0
+        conn.cursor.return_value.__enter__.return_value.fetchone.return_value = (lag,)
+        return conn
+
+    def make_pools(self, mock_pool_cls, connections):
+        """
+        Создает по заглушке пула на каждый сервер; `None` — сервер недоступен.
+        """
+        pools = {}
+
+        def create(minconn, maxconn, **params):
+            conn = connections[params.get('host')]
+            if conn is None:
+                raise psycopg2.OperationalError('connection refused')
+            pool = MagicMock()
+            pool.getconn.return_value = conn
+            pools[params.get('host')] = pool
+            return pool
+        mock_pool_cls.side_effect = create
+        return pools
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_reads_balanced_across_replicas(self, mock_pool_cls):
+        """
+        Тестирует, что чтение распределяется между репликами по кругу.
+        """
+        connections = {'primary': self.make_connection(), 'r1': self.make_connection(),
+                       'r2': self.make_connection()}
+        self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary', 'user': 'u'},
+                               replicas=[{'host': 'r1'}, {'host': 'r2', 'port': 5433}])
+
+        used = []
+        for _ in range(4):
+            with db_manager._connection() as conn:
+                used.append(conn)
+
+        self.assertEqual(used, [connections['r1'], connections['r2'], connections['r1'], connections['r2']])
+        mock_pool_cls.assert_any_call(1, 10, dbname='db', host='r2', port=5433, user='u')
+        with db_manager._connection(read_only=False) as conn:
+            self.assertIs(conn, connections['primary'])
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_lagging_or_down_replica_falls_back_to_primary(self, mock_pool_cls):
+        """
+        Тестирует, что отстающая и недоступная реплики пропускаются, а чтение идет на основной сервер.
+        """
+        connections = {'primary': self.make_connection(), 'r1': self.make_connection(lag=120.0), 'r2': None}
+        self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary'}, replicas=[{'host': 'r1'}, {'host': 'r2'}],
+                               max_replica_lag=30.0)
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            with db_manager._connection() as conn:
+                self.assertIs(conn, connections['primary'])
+            with db_manager._connection() as conn:
+                self.assertIs(conn, connections['primary'])
+
+        # Повторная проверка реплик выполняется не раньше `replica_check_interval`
+        executed = connections['r1'].cursor.return_value.__enter__.return_value.execute.call_args_list
+        self.assertEqual([call[0][0] for call in executed].count(DBManager.REPLICA_LAG_QUERY), 1)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_replica_not_streaming_is_skipped(self, mock_pool_cls):
+        """
+        Тестирует, что реплика с неизвестным отставанием (приемник WAL не работает) не используется.
+        """
+        connections = {'primary': self.make_connection(), 'r1': self.make_connection(lag=None)}
+        self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary'}, replicas=[{'host': 'r1'}])
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            with db_manager._connection() as conn:
+                self.assertIs(conn, connections['primary'])
+        self.assertIn('не получает WAL', stdout.getvalue())
+        self.assertIn("status = 'streaming'", DBManager.REPLICA_LAG_QUERY)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_cached_query_reads_version_from_serving_replica(self, mock_pool_cls):
+        """
+        Тестирует, что версия данных для кэша читается с той же реплики, что и результат запроса.
+        """
+        connections = {'primary': self.make_connection(), 'r1': self.make_connection()}
+        pools = self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary'}, replicas=[{'host': 'r1'}], cache=QueryCache())
+        replica_cur = connections['r1'].cursor.return_value.__enter__.return_value
+        # Сначала версия данных, затем результат запроса
+        replica_cur.fetchall.side_effect = [[(1,)], [(1.5,)]]
+
+        self.assertEqual(db_manager.get_avg_salary(), 1.5)
+        self.assertEqual(db_manager.get_avg_salary(), 1.5)
+
+        self.assertNotIn('primary', pools)
+        queries = [call[0][0] for call in replica_cur.execute.call_args_list]
+        self.assertIn("SELECT version FROM data_version", queries)
+        self.assertEqual(replica_cur.fetchall.call_count, 2)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_query_retried_on_primary_when_replica_dies(self, mock_pool_cls):
+        """
+        Тестирует, что запрос, прерванный обрывом соединения с репликой, повторяется
+        на основном сервере, а реплика исключается из чтения.
+        """
+        connections = {'primary': self.make_connection(), 'r1': self.make_connection()}
+        pools = self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary'}, replicas=[{'host': 'r1'}])
+        replica_cur = connections['r1'].cursor.return_value.__enter__.return_value
+        replica_cur.fetchall.side_effect = psycopg2.OperationalError('server closed the connection')
+        connections['primary'].cursor.return_value.__enter__.return_value.fetchall.return_value = [(1.5,)]
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            self.assertEqual(db_manager.get_avg_salary(), 1.5)
+            self.assertEqual(db_manager.get_avg_salary(), 1.5)
+
+        pools['r1'].putconn.assert_any_call(connections['r1'], close=True)
+        self.assertEqual(replica_cur.fetchall.call_count, 1)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_broken_primary_connection_discarded_and_retried(self, mock_pool_cls):
+        """
+        Тестирует, что оборванное соединение из пула закрывается, а запрос повторяется один раз.
+        """
+        broken, healthy = self.make_connection(), self.make_connection()
+        broken.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.InterfaceError()
+        healthy.cursor.return_value.__enter__.return_value.fetchall.return_value = [('Сбер', 3)]
+        pool = mock_pool_cls.return_value
+        pool.getconn.side_effect = [broken, healthy]
+        db_manager = DBManager('db', {})
+        # Соединение использовалось недавно, поэтому выдается без проверки SELECT 1
+        db_manager._last_used[id(broken)] = time.monotonic()
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            result = db_manager.get_companies_and_vacancies_count()
+
+        self.assertEqual(result, [{'company_name': 'Сбер', 'vacancies_count': 3}])
+        pool.putconn.assert_any_call(broken, close=True)
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_replica_rechecked_after_interval(self, mock_pool_cls):
+        """
+        Тестирует, что реплика снова используется, когда отставание сократилось.
+        """
+        replica = self.make_connection(lag=120.0)
+        connections = {'primary': self.make_connection(), 'r1': replica}
+        self.make_pools(mock_pool_cls, connections)
+        db_manager = DBManager('db', {'host': 'primary'}, replicas=[{'host': 'r1'}],
+                               replica_check_interval=0.0)
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            with db_manager._connection() as conn:
+                self.assertIs(conn, connections['primary'])
+        replica.cursor.return_value.__enter__.return_value.fetchone.return_value = (1.0,)
+        with db_manager._connection() as conn:
+            self.assertIs(conn, replica)
+
+
+class TestDBManagerPagination(unittest.TestCase):
+    """
+    Класс для тестирования постраничного и потокового чтения без реальной БД.
+    """
+
+    def test_vacancies_query_keyset(self):
+        """
+        Тестирует сборку запроса с keyset-пагинацией.
+        """
+        query, args = DBManager._vacancies_query(" AND v.vacancy_name ILIKE %s", ('%py%',), 100, 50)
+        self.assertTrue(query.rstrip().endswith("AND v.vacancy_id > %s ORDER BY v.vacancy_id LIMIT %s"))
+        self.assertEqual(args, ('%py%', 100, 50))
+
+    def test_vacancies_query_without_pagination(self):
+        """
+        Тестирует, что без пагинации сортировка не добавляется.
+        """
+        query, args = DBManager._vacancies_query("", (), None, None)
+        self.assertNotIn("ORDER BY", query)
+        self.assertEqual(args, ())
+
+    @patch('src.db_manager.ThreadedConnectionPool')
+    def test_iter_uses_named_cursor(self, mock_pool_cls):
+        """
+        Тестирует, что итератор читает данные именованным курсором с заданным itersize.
+        """
+        conn = MagicMock()
+        conn.closed = 0
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.__iter__.return_value = iter([(1, 'Компания', 'Python', 100, None, 'url')])
+        mock_pool_cls.return_value.getconn.return_value = conn
+        db_manager = DBManager('db', {})
+
+        result = list(db_manager.iter_vacancies_with_keyword('Python', itersize=500))
+
+        self.assertEqual(result[0]['vacancy_id'], 1)
+        self.assertEqual(cursor.itersize, 500)
+        self.assertIn('name', conn.cursor.call_args.kwargs)
+
+    def test_search_vacancies_unknown_mode(self):
+        """
+        Тестирует ошибку при неизвестном режиме поиска.
+        """
+        with self.assertRaises(ValueError):
+            DBManager('db', {}).search_vacancies('Python', mode='regex')
+
+
+class TestDBManagerCache(unittest.TestCase):
+    """
+    Класс для тестирования кэширования результатов DBManager без реальной БД.
+    """
+
+    def setUp(self):
+        self.db_manager = DBManager('db', {}, cache=QueryCache())
+        self.version = 1
+        self.db_manager._data_version = lambda server=DBManager.PRIMARY: self.version
+
+    @patch.object(DBManager, '_fetch_vacancies', return_value=[{'vacancy_id': 1}])
+    def test_repeated_query_served_from_cache(self, mock_fetch):
+        """
+        Тестирует, что повторный запрос с теми же аргументами не идет в БД.
+        """
+        self.db_manager.get_vacancies_with_keyword('Python')
+        self.db_manager.get_vacancies_with_keyword('Python')
+        self.db_manager.get_vacancies_with_keyword('Java')
+
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(self.db_manager.cache_stats()['hits'], 1)
+
+    @patch.object(DBManager, '_fetch_vacancies', return_value=[])
+    def test_data_version_invalidates(self, mock_fetch):
+        """
+        Тестирует, что после загрузки новых данных запрос выполняется заново.
+        """
+        self.db_manager.get_all_vacancies()
+        self.version = 2
+        self.db_manager.get_all_vacancies()
+
+        self.assertEqual(mock_fetch.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
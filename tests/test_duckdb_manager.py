@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from src.duckdb_manager import DuckDBManager, duckdb
+from src.export import SNAPSHOT_TABLES, pyarrow, write_parquet
+
+
+@unittest.skipIf(duckdb is None or pyarrow is None, "duckdb или pyarrow не установлены")
+class TestDuckDBManager(unittest.TestCase):
+    """
+    Класс для тестирования DuckDBManager на Parquet-снимке.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Создает снимок из двух компаний и четырех вакансий.
+        """
+        cls.directory = tempfile.TemporaryDirectory()
+        companies = [
+            {'company_id': 1, 'company_name': 'Сбербанк', 'url': 'u1'},
+            {'company_id': 2, 'company_name': 'Яндекс', 'url': 'u2'},
+        ]
+        vacancies = [
+            {'vacancy_id': vacancy_id, 'company_id': company_id, 'vacancy_name': name, 'salary_from': salary,
+             'salary_to': None, 'url': f'v{vacancy_id}', 'published_at': None, 'salary_currency': 'RUR',
+             'salary_gross': False, 'salary_mid_rub': float(salary) if salary else None}
+            for vacancy_id, company_id, name, salary in [
+                (10, 1, 'Python разработчик', 100000), (11, 1, 'Аналитик', 50000),
+                (12, 2, 'Senior Python', 300000), (13, 2, 'Курьер', None),
+            ]
+        ]
+        for table, rows in (('companies', companies), ('vacancies', vacancies)):
+            write_parquet(rows, os.path.join(cls.directory.name, f'{table}.parquet'), SNAPSHOT_TABLES[table][1])
+        cls.db_manager = DuckDBManager(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db_manager.close()
+        cls.directory.cleanup()
+
+    def test_companies_and_vacancies_count(self):
+        """
+        Тестирует количество вакансий по компаниям.
+        """
+        result = {item['company_name']: item['vacancies_count']
+                  for item in self.db_manager.get_companies_and_vacancies_count()}
+        self.assertEqual(result, {'Сбербанк': 2, 'Яндекс': 2})
+
+    def test_avg_and_higher_salary(self):
+        """
+        Тестирует среднюю зарплату и вакансии с зарплатой выше средней.
+        """
+        self.assertAlmostEqual(self.db_manager.get_avg_salary(), 150000.0)
+        ids = [item['vacancy_id'] for item in self.db_manager.get_vacancies_with_higher_salary()]
+        self.assertEqual(ids, [12])
+
+    def test_keyword_and_pagination(self):
+        """
+        Тестирует поиск по ключевому слову без учета регистра и постраничное чтение.
+        """
+        ids = sorted(item['vacancy_id'] for item in self.db_manager.get_vacancies_with_keyword('python'))
+        self.assertEqual(ids, [10, 12])
+        page = self.db_manager.get_all_vacancies(after_vacancy_id=10, limit=2)
+        self.assertEqual([item['vacancy_id'] for item in page], [11, 12])
+        self.assertEqual(len(list(self.db_manager.iter_all_vacancies(itersize=1))), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
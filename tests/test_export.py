@@ -0,0 +1,97 @@
+import io
+import json
+import unittest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+
+from src.export import export_rows, export_snapshot, pyarrow, write_csv, write_jsonl, write_parquet
+
+
+class TestExport(unittest.TestCase):
+    """
+    Класс для тестирования выгрузки результатов запросов.
+    """
+
+    def test_write_csv_streams_iterator(self):
+        """
+        Тестирует запись CSV из итератора с заголовком по ключам первой строки.
+        """
+        stream = io.StringIO()
+        rows = ({'vacancy_id': i, 'vacancy_name': f'V{i}'} for i in range(3))
+        self.assertEqual(write_csv(rows, stream), 3)
+        self.assertEqual(stream.getvalue().splitlines(), ['vacancy_id,vacancy_name', '0,V0', '1,V1', '2,V2'])
+
+    def test_write_jsonl_serializes_dates_and_decimals(self):
+        """
+        Тестирует запись JSON Lines с датами и Decimal.
+        """
+        stream = io.StringIO()
+        write_jsonl([{'week': date(2024, 5, 6), 'avg_salary': Decimal('100.50'), 'company_name': 'Сбер'}], stream)
+        self.assertEqual(json.loads(stream.getvalue()),
+                         {'week': '2024-05-06', 'avg_salary': '100.50', 'company_name': 'Сбер'})
+
+    def test_export_rows_rejects_unknown_format(self):
+        """
+        Тестирует ошибку при неизвестном формате и Parquet без файла.
+        """
+        with self.assertRaises(ValueError):
+            export_rows([], 'xml', stream=io.StringIO())
+        with self.assertRaises(ValueError):
+            export_rows([], 'parquet')
+
+    @unittest.skipIf(pyarrow is None, "pyarrow не установлен")
+    def test_write_parquet_in_row_groups(self):
+        """
+        Тестирует запись Parquet группами строк с явной схемой.
+        """
+        import os
+        import tempfile
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'out.parquet')
+            rows = ({'vacancy_id': i, 'salary_from': None if i < 3 else i} for i in range(5))
+            count = write_parquet(rows, path, fields=(('vacancy_id', 'int64'), ('salary_from', 'int64')),
+                                  batch_size=2)
+            self.assertEqual(count, 5)
+            parquet_file = pyarrow.parquet.ParquetFile(path)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+            self.assertEqual(parquet_file.read().column('salary_from').to_pylist(), [None, None, None, 3, 4])
+
+    @unittest.skipIf(pyarrow is None, "pyarrow не установлен")
+    @patch('src.export.psycopg2.connect')
+    def test_failed_snapshot_removes_temporary_files(self, mock_connect):
+        """
+        Тестирует, что при ошибке во время выгрузки снимка временные файлы удаляются,
+        а прежний снимок остается на месте.
+        """
+        import io
+        import os
+        import tempfile
+
+        conn = MagicMock()
+        mock_connect.return_value = conn
+        cur = conn.cursor.return_value.__enter__.return_value
+
+        def broken_rows():
+            raise psycopg2.OperationalError('connection lost')
+            yield
+
+        # Компании выгружаются, при чтении вакансий соединение обрывается
+        cur.__iter__.side_effect = [iter([(1, 'А', 'u')]), broken_rows()]
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'vacancies.parquet'), 'w') as file:
+                file.write('old')
+            with patch('sys.stdout', new_callable=io.StringIO):
+                counts = export_snapshot('db', {}, directory)
+
+            self.assertEqual(counts, {'companies': 1})
+            self.assertEqual(sorted(os.listdir(directory)), ['vacancies.parquet'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from benchmarks.fake_hh_server import FakeHHConfig, FakeHHServer
+from benchmarks.run_benchmarks import bench_ingest, find_regressions
+from src.hh_api import HHApi
+
+
+class TestFakeHHServer(unittest.TestCase):
+    """
+    Класс для тестирования локального сервера, имитирующего API hh.ru.
+    """
+
+    def test_hh_api_against_fake_server(self):
+        """
+        Тестирует полную загрузку вакансий через HHApi, включая повторы после ошибок сервера.
+        """
+        config = FakeHHConfig(employers=3, vacancies_per_employer=250, error_rate=0.2)
+        with FakeHHServer(config) as server:
+            hh_api = HHApi(server.company_names(), requests_per_second=0, backoff_factor=0.001,
+                           max_retries=10, base_url=server.base_url)
+            vacancies = hh_api.get_vacancies_concurrent()
+            hh_api.close()
+
+        self.assertEqual(len(hh_api.companies), 3)
+        self.assertEqual(sorted(len(items) for items in vacancies.values()), [250, 250, 250])
+        self.assertGreater(hh_api.stats.retries, 0)
+        self.assertEqual(hh_api.stats.failures, 0)
+
+    def test_sharding_past_depth_cap(self):
+        """
+        Тестирует полную загрузку компании, у которой вакансий больше, чем API отдает на один запрос.
+        """
+        config = FakeHHConfig(employers=2, vacancies_per_employer=5000, depth_cap=2000)
+        with FakeHHServer(config) as server:
+            hh_api = HHApi(server.company_names(), requests_per_second=0, base_url=server.base_url)
+            vacancies = hh_api.get_vacancies_concurrent()
+            streamed = {}
+            for company_name, items in hh_api.iter_vacancy_pages():
+                streamed.setdefault(company_name, []).extend(item.id for item in items)
+            hh_api.close()
+
+        for items in vacancies.values():
+            self.assertEqual(len({item.id for item in items}), 5000)
+            self.assertEqual(len(items), 5000)
+        for ids in streamed.values():
+            self.assertEqual(len(ids), 5000)
+            self.assertEqual(len(set(ids)), 5000)
+
+    def test_vacancy_ids_fit_integer_column(self):
+        """
+        Тестирует, что ID вакансий уникальны и помещаются в колонку INTEGER.
+        """
+        config = FakeHHConfig(employers=10, vacancies_per_employer=100_000)
+        ids = {int(config.vacancy(index, number)['id']) for index in (0, 9) for number in (0, 99_999)}
+        self.assertEqual(len(ids), 4)
+        self.assertLessEqual(max(ids), 2 ** 31 - 1)
+
+    @patch('benchmarks.run_benchmarks.HHApi')
+    @patch('benchmarks.run_benchmarks.stream_ingest', return_value=None)
+    def test_bench_ingest_fails_on_failed_load(self, mock_ingest, mock_api):
+        """
+        Тестирует, что неудачная загрузка прерывает бенчмарк, а не дает бессмысленный результат.
+        """
+        with self.assertRaises(RuntimeError):
+            bench_ingest(MagicMock(), MagicMock(), workers=1)
+        mock_api.return_value.close.assert_called_once()
+
+    def test_find_regressions(self):
+        """
+        Тестирует поиск регрессий относительно базового результата.
+        """
+        baseline = {"sizes": {"1000": {"ingest": {"rows_per_second": 1000.0},
+                                       "queries": {"get_avg_salary": {"median": 0.010}}}}}
+        report = {"sizes": {"1000": {"ingest": {"rows_per_second": 700.0},
+                                     "queries": {"get_avg_salary": {"median": 0.011}}}}}
+        regressions = find_regressions(report, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("загрузка", regressions[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
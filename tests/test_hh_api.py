@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, Mock
-from src.hh_api import HHApi
+from src.hh_api import HHApi, RateLimiter
+from src.models import VacancyRecord
 import requests
 
 
@@ -9,11 +10,24 @@ class TestHHApi(unittest.TestCase):
     Класс для тестирования модуля hh_api.
     """
 
-    def setUp(self):
+    @patch('requests.Session.get')
+    def setUp(self, mock_get):
         self.companies = ["Сбербанк", "Яндекс"]
-        self.hh_api = HHApi(self.companies)
+        employers = {
+            'Сбербанк': {'id': '1234', 'name': 'Сбербанк', 'alternate_url': 'sberbank_url'},
+            'Яндекс': {'id': '5678', 'name': 'Яндекс', 'alternate_url': 'yandex_url'},
+        }
+
+        def fake_get(url, params=None, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {'items': [employers[params['text']]]}
+            return response
+
+        mock_get.side_effect = fake_get
+        self.hh_api = HHApi(self.companies, requests_per_second=0)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test__get_companies_id(self, mock_get):
         """
         Тестирует получение ID компаний с мокированием API-запроса.
@@ -33,7 +47,45 @@ class TestHHApi(unittest.TestCase):
         self.assertIn('Сбербанк', companies)
         self.assertEqual(companies['Сбербанк']['id'], 1234)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
+    def test_resolve_employer_prefers_exact_name(self, mock_get):
+        """
+        Тестирует выбор работодателя с точным совпадением названия, а не первого в выдаче.
+        """
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'items': [
+                {'id': '1', 'name': 'Брусника. Управляющая компания', 'alternate_url': 'a'},
+                {'id': '2', 'name': 'ООО «Брусника»', 'alternate_url': 'b'},
+            ]
+        }
+        mock_get.return_value = mock_response
+
+        company = self.hh_api._resolve_employer('ООО Брусника')
+
+        self.assertEqual(company['id'], 2)
+
+    @patch('requests.Session.get')
+    def test_registry_skips_known_names(self, mock_get):
+        """
+        Тестирует, что известные реестру названия не ищутся в API, а новые сохраняются.
+        """
+        registry = Mock()
+        registry.load.return_value = {'Сбербанк': {'id': 1234, 'name': 'Сбербанк', 'url': 'sberbank_url'}}
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'items': [{'id': '5678', 'name': 'Яндекс', 'alternate_url': 'y'}]}
+        mock_get.return_value = mock_response
+
+        hh_api = HHApi(self.companies, requests_per_second=0, registry=registry)
+
+        self.assertEqual(list(hh_api.companies), ['Сбербанк', 'Яндекс'])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.kwargs['params']['text'], 'Яндекс')
+        registry.save.assert_called_once_with({'Яндекс': {'id': 5678, 'name': 'Яндекс', 'url': 'y'}})
+
+    @patch('requests.Session.get')
     def test_get_vacancies(self, mock_get):
         """
         Тестирует метод get_vacancies.
@@ -53,6 +105,137 @@ class TestHHApi(unittest.TestCase):
         self.assertIsInstance(vacancies['Сбербанк'], list)
         self.assertEqual(len(vacancies['Сбербанк']), 2)
 
+    @patch('requests.Session.get')
+    def test_get_vacancies_compact_records(self, mock_get):
+        """
+        Тестирует, что вакансии хранятся компактно и исходный JSON отбрасывается.
+        """
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'items': [{
+                'id': '7', 'name': 'Python', 'salary': {'from': 100, 'to': 200, 'currency': 'RUR', 'gross': False},
+                'alternate_url': 'url',
+                'published_at': '2024-05-01T10:00:00+0300', 'snippet': {'requirement': '...'}
+            }],
+            'pages': 1
+        }
+        mock_get.return_value = mock_response
+
+        record = self.hh_api.get_vacancies()['Сбербанк'][0]
+        self.assertIsInstance(record, VacancyRecord)
+        self.assertIsNone(record.raw)
+        self.assertEqual(record.as_row(1234),
+                         (7, 1234, 'Python', 100, 200, 'url', '2024-05-01T10:00:00+0300', 'RUR', False, 150.0))
+
+        self.hh_api.keep_raw = True
+        record = self.hh_api.get_vacancies()['Сбербанк'][0]
+        self.assertIn('snippet', record.raw)
+
+    @patch('requests.Session.get')
+    def test_get_vacancies_concurrent(self, mock_get):
+        """
+        Тестирует параллельную загрузку: все страницы собраны и идут по порядку.
+        """
+        def fake_get(url, params=None, **kwargs):
+            page = params['page']
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {
+                'items': [{'id': f"{params['employer_id']}{page}", 'name': f'Vacancy {page}'}],
+                'pages': 3
+            }
+            return response
+
+        mock_get.side_effect = fake_get
+
+        vacancies = self.hh_api.get_vacancies_concurrent(max_workers=4)
+
+        self.assertEqual(set(vacancies), {'Сбербанк', 'Яндекс'})
+        self.assertEqual([v.id for v in vacancies['Сбербанк']], [12340, 12341, 12342])
+        self.assertEqual(mock_get.call_count, 6)
+
+    @patch('requests.Session.get')
+    def test_iter_vacancy_pages(self, mock_get):
+        """
+        Тестирует потоковую выдачу страниц вакансий.
+        """
+        def fake_get(url, params=None, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {
+                'items': [{'id': f"{params['employer_id']}{params['page']}", 'name': 'Vacancy'}],
+                'pages': 2
+            }
+            return response
+
+        mock_get.side_effect = fake_get
+
+        pages = list(self.hh_api.iter_vacancy_pages(max_workers=2))
+
+        self.assertEqual(len(pages), 4)
+        ids = sorted(item.id for _, items in pages for item in items)
+        self.assertEqual(ids, [12340, 12341, 56780, 56781])
+
+    @patch('src.hh_api.time.sleep')
+    @patch('requests.Session.get')
+    def test_request_retries_with_retry_after(self, mock_get, mock_sleep):
+        """
+        Тестирует повтор запроса после 429 с учетом заголовка Retry-After.
+        """
+        throttled = Mock(status_code=429, headers={'Retry-After': '2'})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = {'items': [], 'pages': 1}
+        mock_get.side_effect = [throttled, ok]
+
+        data = self.hh_api._request('vacancies', {'employer_id': 1, 'page': 0})
+
+        self.assertEqual(data, {'items': [], 'pages': 1})
+        mock_sleep.assert_called_once_with(2.0)
+        self.assertEqual(self.hh_api.stats.retries, 1)
+
+    @patch('src.hh_api.time.sleep')
+    @patch('requests.Session.get')
+    def test_request_gives_up_after_max_retries(self, mock_get, mock_sleep):
+        """
+        Тестирует, что после исчерпания повторов запрос возвращает None.
+        """
+        mock_get.side_effect = requests.ConnectionError('нет сети')
+        self.hh_api.max_retries = 2
+
+        data = self.hh_api._request('vacancies', {'employer_id': 1, 'page': 0})
+
+        self.assertIsNone(data)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(self.hh_api.stats.summary()['failures'], 1)
+
+    @patch('requests.Session.get')
+    def test_request_does_not_retry_client_errors(self, mock_get):
+        """
+        Тестирует, что ошибки клиента (4xx, кроме 429) не повторяются.
+        """
+        mock_get.return_value = Mock(status_code=404, headers={})
+
+        self.assertIsNone(self.hh_api._request('vacancies', {'employer_id': 1, 'page': 0}))
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Класс для тестирования ограничителя частоты запросов.
+    """
+
+    @patch('src.hh_api.time.sleep')
+    def test_wait_spaces_requests(self, mock_sleep):
+        """
+        Тестирует, что запросы сверх лимита откладываются.
+        """
+        limiter = RateLimiter(requests_per_second=2)
+        limiter.wait()
+        limiter.wait()
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.5, places=1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from datetime import date
+from unittest.mock import Mock
+
+from src.history import append_snapshot, partition_bounds, prune_snapshots
+
+
+class TestHistory(unittest.TestCase):
+    """
+    Класс для тестирования истории вакансий.
+    """
+
+    def test_partition_bounds(self):
+        """
+        Тестирует имя и границы месячной партиции, включая переход через год.
+        """
+        self.assertEqual(
+            partition_bounds(date(2024, 12, 17)),
+            ("vacancy_snapshots_2024_12", date(2024, 12, 1), date(2025, 1, 1))
+        )
+
+    def test_append_snapshot_creates_partition(self):
+        """
+        Тестирует создание партиции перед добавлением снимка.
+        """
+        cur = Mock()
+        append_snapshot(cur, date(2024, 5, 20))
+        first_sql, first_args = cur.execute.call_args_list[0].args
+        self.assertIn("PARTITION OF vacancy_snapshots", first_sql)
+        self.assertIn("vacancy_snapshots_2024_05", first_sql)
+        self.assertEqual(first_args, (date(2024, 5, 1), date(2024, 6, 1)))
+
+    def test_prune_drops_only_expired_partitions(self):
+        """
+        Тестирует удаление только тех месячных партиций, которые целиком старше срока хранения;
+        партиции с другими именами пропускаются.
+        """
+        cur = Mock()
+        cur.fetchall.return_value = [("vacancy_snapshots_2023_01",), ("vacancy_snapshots_2023_06",),
+                                     ("vacancy_snapshots_2024_05",), ("vacancy_snapshots_default",),
+                                     ("vacancy_snapshots_archive_2020",)]
+
+        dropped = prune_snapshots(cur, retention_days=365, today=date(2024, 6, 15))
+
+        self.assertEqual(dropped, ["vacancy_snapshots_2023_01"])
+        cur.execute.assert_called_with("DROP TABLE vacancy_snapshots_2023_01")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from src.hh_api import HHApi
+from src.http_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Класс для тестирования постоянного кэша ответов API.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'responses.sqlite')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_api(self, cache):
+        hh_api = HHApi([], requests_per_second=0, response_cache=cache)
+        return hh_api
+
+    def test_put_and_get_roundtrip(self):
+        """
+        Тестирует сохранение ответа и независимость ключа от порядка параметров.
+        """
+        cache = ResponseCache(self.path)
+        cache.put('url', {'a': 1, 'b': 'x'}, {'items': ['Вакансия']}, etag='"v1"')
+        cache.close()
+
+        reopened = ResponseCache(self.path)
+        cached = reopened.get('url', {'b': 'x', 'a': 1})
+        self.assertEqual(cached.data, {'items': ['Вакансия']})
+        self.assertEqual(cached.etag, '"v1"')
+        self.assertIsNone(reopened.get('url', {'a': 2}))
+        reopened.close()
+
+    @patch('requests.Session.get')
+    def test_revalidation_with_etag(self, mock_get):
+        """
+        Тестирует условный запрос: при ответе 304 возвращаются сохраненные данные.
+        """
+        cache = ResponseCache(self.path)
+        hh_api = self.make_api(cache)
+        cache.put(f'{hh_api.base_url}vacancies', {'page': 0}, {'items': [1]}, etag='"v1"')
+        mock_get.return_value = Mock(status_code=304, headers={})
+
+        data = hh_api._request('vacancies', {'page': 0})
+
+        self.assertEqual(data, {'items': [1]})
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+        self.assertEqual(cache.stats()['revalidated'], 1)
+        cache.close()
+
+    @patch('requests.Session.get')
+    def test_replay_only_does_not_use_network(self, mock_get):
+        """
+        Тестирует режим воспроизведения: ответы только из кэша, без сетевых запросов.
+        """
+        cache = ResponseCache(self.path, replay_only=True)
+        hh_api = self.make_api(cache)
+        cache.put(f'{hh_api.base_url}vacancies', {'page': 0}, {'items': [1]})
+
+        self.assertEqual(hh_api._request('vacancies', {'page': 0}), {'items': [1]})
+        self.assertIsNone(hh_api._request('vacancies', {'page': 1}))
+        mock_get.assert_not_called()
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'revalidated': 0})
+        cache.close()
+
+    @patch('requests.Session.get')
+    def test_fresh_response_served_without_request(self, mock_get):
+        """
+        Тестирует выдачу свежего ответа без обращения к API.
+        """
+        cache = ResponseCache(self.path, max_age=3600)
+        hh_api = self.make_api(cache)
+        cache.put(f'{hh_api.base_url}employers', {'text': 'X'}, {'items': []})
+
+        self.assertEqual(hh_api._request('employers', {'text': 'X'}), {'items': []})
+        mock_get.assert_not_called()
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import unittest
+from unittest.mock import Mock, patch
+
+import psycopg2
+from dotenv import load_dotenv
+
+from src.database import create_database, create_tables
+from src.loader import CopyBuffer, copy_vacancies, iter_vacancy_rows, load_vacancies, upsert_vacancies, vacancy_row
+
+
+class TestLoader(unittest.TestCase):
+    """
+    Класс для тестирования модуля loader.
+    """
+
+    def test_vacancy_row(self):
+        """
+        Тестирует преобразование вакансии API в строку таблицы.
+        """
+        vacancy = {
+            'id': '10', 'name': 'Python', 'salary': {'from': 100, 'to': None}, 'alternate_url': 'url',
+            'published_at': '2024-05-01T10:00:00+0300'
+        }
+        self.assertEqual(
+            vacancy_row(vacancy, 5),
+            ('10', 5, 'Python', 100, None, 'url', '2024-05-01T10:00:00+0300', None, None, 100.0)
+        )
+
+    def test_iter_vacancy_rows(self):
+        """
+        Тестирует построчную выдачу вакансий по компаниям.
+        """
+        companies = {'Сбербанк': {'id': 1, 'name': 'Сбербанк', 'url': 'u'}}
+        vacancies = {'Сбербанк': [{'id': '1', 'name': 'A', 'salary': None, 'alternate_url': 'a'}]}
+        self.assertEqual(list(iter_vacancy_rows(companies, vacancies)), [('1', 1, 'A', None, None, 'a', None, None, None, None)])
+
+    def test_copy_buffer_escapes_values(self):
+        """
+        Тестирует кодирование значений в формат COPY.
+        """
+        buffer = CopyBuffer()
+        buffer.add_row((1, None, 'a\tb\\c\nd'))
+        cur = Mock()
+        cur.copy_expert.side_effect = lambda sql, file: setattr(self, 'copied', file.read())
+
+        self.assertEqual(buffer.copy_to(cur, 't', ('x', 'y', 'z')), 1)
+        self.assertEqual(self.copied, '1\t\\N\ta\\tb\\\\c\\nd\n')
+        self.assertEqual(buffer.rows, 0)
+
+    def test_copy_vacancies_merges_staging(self):
+        """
+        Тестирует, что COPY идет в staging-таблицу, а затем выполняется один INSERT ... SELECT.
+        """
+        cur = Mock()
+        rows = [('1', 1, 'A', None, None, 'a', None), ('2', 1, 'B', 10, 20, 'b', None)]
+
+        self.assertEqual(copy_vacancies(cur, rows, chunk_size=1), 2)
+        self.assertEqual(cur.copy_expert.call_count, 2)
+        statements = [call.args[0] for call in cur.execute.call_args_list]
+        self.assertTrue(any('INSERT INTO vacancies' in sql and 'ON CONFLICT' in sql for sql in statements))
+
+    @patch('src.loader.insert_vacancies_batch', side_effect=lambda cur, rows: len(rows))
+    def test_load_vacancies_falls_back_to_values(self, mock_batch):
+        """
+        Тестирует переход на execute_values только для порции, на которой COPY завершился ошибкой.
+        """
+        cur = Mock()
+        cur.copy_expert.side_effect = [None, psycopg2.Error('copy failed'), None]
+        rows = [(str(index), 1, 'A', None, None, 'a', None) for index in range(3)]
+
+        method, count = load_vacancies(cur, rows, method='copy', report=False, chunk_size=1)
+
+        self.assertEqual((method, count), ('values', 3))
+        mock_batch.assert_called_once_with(cur, [rows[1]])
+        statements = [call.args[0] for call in cur.execute.call_args_list]
+        self.assertEqual(statements.count("ROLLBACK TO SAVEPOINT bulk_copy"), 1)
+        self.assertEqual(statements.count("RELEASE SAVEPOINT bulk_copy"), 2)
+        self.assertTrue(any('INSERT INTO vacancies' in sql for sql in statements))
+
+    @patch('src.loader.insert_vacancies_batch')
+    def test_load_vacancies_keeps_only_current_chunk(self, mock_batch):
+        """
+        Тестирует, что итератор строк читается по мере отправки порций, а не целиком заранее.
+        """
+        read = []
+        cur = Mock()
+        # К отправке порции из итератора прочитаны только ее строки и строки уже отправленных порций
+        cur.copy_expert.side_effect = lambda sql, file: self.assertEqual(len(read), cur.copy_expert.call_count)
+        rows = (read.append(index) or (str(index), 1, 'A', None, None, 'a', None) for index in range(3))
+
+        method, count = load_vacancies(cur, rows, method='copy', report=False, chunk_size=1)
+
+        self.assertEqual((method, count), ('copy', 3))
+        self.assertEqual(cur.copy_expert.call_count, 3)
+        mock_batch.assert_not_called()
+
+
+class TestUpsertVacanciesDatabase(unittest.TestCase):
+    """
+    Класс для тестирования upsert вакансий на реальной базе данных.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Создает тестовую базу данных с таблицами.
+        """
+        load_dotenv()
+        cls.db_params = {
+            "user": os.getenv("DB_USER"),
+            "password": os.getenv("DB_PASSWORD"),
+            "host": os.getenv("DB_HOST"),
+        }
+        cls.test_db_name = "test_upsert_vacancies"
+        create_database(cls.test_db_name, cls.db_params)
+        create_tables(cls.test_db_name, cls.db_params)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Удаляет тестовую базу данных.
+        """
+        conn = None
+        try:
+            conn = psycopg2.connect(dbname='postgres', **cls.db_params)
+            conn.autocommit = True
+            cur = conn.cursor()
+            cur.execute(f"DROP DATABASE IF EXISTS {cls.test_db_name}")
+        except (Exception, psycopg2.DatabaseError):
+            pass
+        finally:
+            if conn is not None:
+                cur.close()
+                conn.close()
+
+    def test_upsert_counts_only_changed_rows(self):
+        """
+        Тестирует, что учитываются только вставленные, измененные и возвращенные из архива вакансии.
+        """
+        rows = [(1, 1, 'A', None, None, 'a', None, None, None, None),
+                (2, 1, 'B', 100, None, 'b', None, 'RUR', False, 100)]
+        conn = psycopg2.connect(dbname=self.test_db_name, **self.db_params)
+        try:
+            with conn.cursor() as cur:
+                cur.execute("INSERT INTO companies (company_id, company_name) VALUES (1, 'Компания')")
+                self.assertEqual(upsert_vacancies(cur, rows), 2)
+                self.assertEqual(upsert_vacancies(cur, rows), 0)
+                self.assertEqual(upsert_vacancies(cur, [rows[0][:2] + ('A2',) + rows[0][3:], rows[1]]), 1)
+                cur.execute("UPDATE vacancies SET archived = TRUE WHERE vacancy_id = 2")
+                self.assertEqual(upsert_vacancies(cur, rows[1:], page_size=1), 1)
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import Mock, patch
+
+from src.hh_api import HHApi
+from src.metrics import Metrics, metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Класс для тестирования реестра метрик.
+    """
+
+    def test_disabled_registry_collects_nothing(self):
+        """
+        Тестирует, что выключенный реестр ничего не собирает.
+        """
+        registry = Metrics(enabled=False)
+        registry.inc("requests_total")
+        with registry.timer("request_seconds"):
+            pass
+        self.assertEqual(registry.snapshot(), {"counters": {}, "histograms": {}})
+
+    def test_prometheus_format(self):
+        """
+        Тестирует экспорт счетчиков и гистограмм в формате Prometheus.
+        """
+        registry = Metrics(enabled=True, buckets=(0.1, 1.0))
+        registry.inc("rows_total", 5, method="copy")
+        registry.observe("write_seconds", 0.05, method="copy")
+        registry.observe("write_seconds", 2.0, method="copy")
+
+        text = registry.to_prometheus()
+
+        self.assertIn('rows_total{method="copy"} 5', text)
+        self.assertIn('write_seconds_bucket{method="copy",le="0.1"} 1', text)
+        self.assertIn('write_seconds_bucket{method="copy",le="1.0"} 1', text)
+        self.assertIn('write_seconds_bucket{method="copy",le="+Inf"} 2', text)
+        self.assertIn('write_seconds_count{method="copy"} 2', text)
+
+    def test_log_json_and_endpoint(self):
+        """
+        Тестирует запись JSON-лога и HTTP-эндпоинт /metrics.
+        """
+        registry = Metrics(enabled=True)
+        registry.inc("rows_total", 3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "metrics.jsonl")
+            registry.log_json(path, event="ingest")
+            with open(path, encoding="utf-8") as file:
+                record = json.loads(file.readline())
+        self.assertEqual(record["event"], "ingest")
+        self.assertEqual(record["counters"]["rows_total"][0]["value"], 3)
+
+        server = registry.serve_prometheus(port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                self.assertIn("rows_total 3", response.read().decode("utf-8"))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @patch('requests.Session.get')
+    def test_hh_api_records_http_metrics(self, mock_get):
+        """
+        Тестирует учет HTTP-запросов, повторов и объема ответов в HHApi.
+        """
+        throttled = Mock(status_code=429, headers={'Retry-After': '0'}, content=b'{}')
+        ok = Mock(status_code=200, headers={}, content=b'{"items": []}')
+        ok.json.return_value = {'items': []}
+        mock_get.side_effect = [throttled, ok]
+        hh_api = HHApi([], requests_per_second=0)
+
+        metrics.enabled = True
+        try:
+            hh_api._request('vacancies', {'page': 0})
+            snapshot = metrics.snapshot()
+        finally:
+            metrics.enabled = False
+            metrics.reset()
+
+        self.assertEqual(snapshot["counters"]["hh_http_retries_total"][0]["value"], 1)
+        self.assertEqual(sum(item["value"] for item in snapshot["counters"]["hh_http_response_bytes_total"]), 15)
+        self.assertEqual(sum(item["count"] for item in snapshot["histograms"]["hh_http_request_seconds"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
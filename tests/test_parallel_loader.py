@@ -0,0 +1,100 @@
+import io
+import unittest
+from unittest.mock import MagicMock, patch
+
+from psycopg2 import errors
+
+from src.parallel_loader import _load_partition, parallel_load, partition_companies
+
+
+class TestParallelLoader(unittest.TestCase):
+    """
+    Класс для тестирования параллельной загрузки.
+    """
+
+    def test_partition_companies_balances_load(self):
+        """
+        Тестирует равномерное распределение вакансий по потокам.
+        """
+        companies = {name: {'id': index} for index, name in enumerate('ABCD')}
+        vacancies = {'A': [0] * 10, 'B': [0] * 6, 'C': [0] * 4, 'D': [0] * 1}
+
+        partitions = partition_companies(companies, vacancies, workers=2)
+
+        loads = sorted(sum(len(vacancies[name]) for name, _ in partition) for partition in partitions)
+        self.assertEqual(loads, [10, 11])
+        self.assertEqual(partition_companies(companies, {'A': [0]}, workers=4), [[('A', 0)]])
+
+    @patch('src.parallel_loader.time.sleep')
+    @patch('src.parallel_loader.load_vacancies')
+    @patch('src.parallel_loader.psycopg2.connect')
+    def test_partition_retries_serialization_failure(self, mock_connect, mock_load, mock_sleep):
+        """
+        Тестирует повтор транзакции компании после ошибки сериализации.
+        """
+        conn = MagicMock()
+        mock_connect.return_value = conn
+        mock_load.side_effect = [errors.SerializationFailure(), ('copy', 1)]
+        vacancies = {'A': [{'id': '1', 'name': 'V', 'salary': None, 'alternate_url': 'a'}]}
+
+        summary = _load_partition('db', {}, 0, [('A', 7)], vacancies, 'copy', max_retries=2)
+
+        self.assertEqual(summary['rows'], 1)
+        self.assertEqual(summary['retries'], 1)
+        conn.rollback.assert_called_once()
+        conn.commit.assert_called_once()
+        conn.close.assert_called_once()
+
+    @patch('src.parallel_loader.time.sleep')
+    @patch('src.loader.insert_vacancies_batch')
+    @patch('src.parallel_loader.psycopg2.connect')
+    def test_copy_serialization_failure_retried(self, mock_connect, mock_batch, mock_sleep):
+        """
+        Тестирует, что ошибка сериализации при COPY не уходит в запасной execute_values,
+        а приводит к повтору транзакции компании.
+        """
+        conn = MagicMock()
+        mock_connect.return_value = conn
+        mock_copy = conn.cursor.return_value.__enter__.return_value.copy_expert
+        mock_copy.side_effect = [errors.SerializationFailure(), None]
+        vacancies = {'A': [{'id': '1', 'name': 'V', 'salary': None, 'alternate_url': 'a'}]}
+
+        summary = _load_partition('db', {}, 0, [('A', 7)], vacancies, 'copy', max_retries=2)
+
+        self.assertEqual(summary['retries'], 1)
+        self.assertEqual(mock_copy.call_count, 2)
+        mock_batch.assert_not_called()
+        conn.rollback.assert_called_once()
+        conn.commit.assert_called_once()
+
+
+    @patch('src.parallel_loader.finish_ingest')
+    @patch('src.parallel_loader.bump_data_version')
+    @patch('src.parallel_loader.refresh_currency_rates', return_value={})
+    @patch('src.parallel_loader._load_partition')
+    @patch('src.parallel_loader.psycopg2.connect')
+    def test_failed_worker_fails_load(self, mock_connect, mock_partition, mock_rates, mock_bump, mock_finish):
+        """
+        Тестирует, что при ошибке в потоке загрузка считается неудачной,
+        а версия данных и шаги после загрузки не выполняются.
+        """
+        companies = {'A': {'id': 1, 'name': 'A', 'url': 'a'}, 'B': {'id': 2, 'name': 'B', 'url': 'b'}}
+        vacancies = {'A': [{}], 'B': [{}]}
+
+        def load_partition(db_name, params, worker, *args):
+            if worker:
+                raise errors.DeadlockDetected()
+            return {'worker': worker}
+        mock_partition.side_effect = load_partition
+
+        with patch('sys.stdout', new_callable=io.StringIO):
+            result = parallel_load('db', {}, {'companies': companies, 'vacancies': vacancies}, workers=2,
+                                   hh_api=MagicMock())
+
+        self.assertIsNone(result)
+        mock_bump.assert_not_called()
+        mock_finish.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from src.pipeline import stream_ingest
+
+
+class FakeHHApi:
+    """
+    Заглушка HHApi, отдающая заранее заданные страницы.
+    """
+    def __init__(self, pages):
+        self.companies = {'Сбербанк': {'id': 1, 'name': 'Сбербанк', 'url': 'u'}}
+        self.pages = pages
+
+    def iter_vacancy_pages(self):
+        for items in self.pages:
+            yield 'Сбербанк', items
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    Класс для тестирования потоковой загрузки.
+    """
+
+    @patch('src.pipeline.refresh_currency_rates', return_value={'RUR': 1.0})
+    @patch('src.pipeline.finish_ingest')
+    @patch('src.pipeline.insert_companies')
+    @patch('src.pipeline.load_vacancies')
+    @patch('src.pipeline.psycopg2.connect')
+    def test_stream_ingest_writes_batches_and_commits(self, mock_connect, mock_load, mock_companies, mock_finish,
+                                                     mock_rates):
+        """
+        Тестирует запись пакетами и периодическую фиксацию транзакции.
+        """
+        conn = Mock()
+        mock_connect.return_value = conn
+        pages = [
+            [{'id': str(page * 10 + i), 'name': 'V', 'salary': None, 'alternate_url': 'a'} for i in range(3)]
+            for page in range(4)
+        ]
+
+        total = stream_ingest('db', {}, FakeHHApi(pages), batch_size=5, commit_every=5, queue_size=1)
+
+        self.assertEqual(total, 12)
+        batch_sizes = [len(call.args[1]) for call in mock_load.call_args_list]
+        self.assertEqual(batch_sizes, [6, 6])
+        # Компании, два пакета и финальная фиксация
+        self.assertEqual(conn.commit.call_count, 4)
+        conn.close.assert_called_once()
+        mock_finish.assert_called_once_with(conn)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from benchmarks.query_plans import PLAN_QUERIES, collect_scans, find_plan_regressions
+
+
+def _report(scans, execution_ms):
+    return {"sizes": {"1000": {"queries": {"get_vacancies_with_keyword": {
+        "execution_ms": execution_ms, "scans": scans
+    }}}}}
+
+
+class TestQueryPlans(unittest.TestCase):
+    """
+    Класс для тестирования контроля планов запросов.
+    """
+
+    def test_collect_scans(self):
+        """
+        Тестирует сбор способов чтения таблиц из вложенного плана.
+        """
+        plan = {"Node Type": "Hash Join", "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "companies"},
+            {"Node Type": "Bitmap Heap Scan", "Relation Name": "vacancies", "Plans": [
+                {"Node Type": "Bitmap Index Scan", "Index Name": "vacancies_name_trgm_idx"}
+            ]},
+        ]}
+        self.assertEqual(collect_scans(plan), {"companies": {"Seq Scan"}, "vacancies": {"Bitmap Heap Scan"}})
+
+    def test_switch_to_seq_scan_is_regression(self):
+        """
+        Тестирует, что переход таблицы с индекса на Seq Scan считается регрессией,
+        а Seq Scan, который был и в базовом плане, — нет.
+        """
+        baseline = _report({"companies": ["Seq Scan"], "vacancies": ["Bitmap Heap Scan"]}, 10.0)
+        report = _report({"companies": ["Seq Scan"], "vacancies": ["Seq Scan"]}, 10.0)
+        regressions = find_plan_regressions(report, baseline, tolerance=0.5)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("vacancies", regressions[0])
+
+    def test_latency_budget(self):
+        """
+        Тестирует бюджет времени: учитывается и относительный, и абсолютный рост.
+        """
+        baseline = _report({}, 10.0)
+        self.assertEqual(find_plan_regressions(_report({}, 14.0), baseline, tolerance=0.5), [])
+        self.assertEqual(len(find_plan_regressions(_report({}, 16.0), baseline, tolerance=0.5)), 1)
+        self.assertEqual(find_plan_regressions(_report({}, 0.3), _report({}, 0.1), tolerance=0.5), [])
+
+    def test_plan_queries_use_dbmanager_sql(self):
+        """
+        Тестирует, что контролируются запросы DBManager с параметрами в нужном формате.
+        """
+        query, args = PLAN_QUERIES["get_vacancies_with_keyword"]
+        self.assertIn("ILIKE %s", query)
+        self.assertEqual(args, ("%Python%",))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from src.sharding import MIN_DATE_SPAN, plan_shards, split_date_range
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def make_probe(published, roles=None):
+    """
+    Создает пробную функцию поверх списка дат публикации (без кластеров по регионам).
+    """
+    def probe(filters, clusters):
+        dates = [value for value in published
+                 if ('date_from' not in filters or value >= datetime.fromisoformat(filters['date_from']))
+                 and ('date_to' not in filters or value <= datetime.fromisoformat(filters['date_to']))]
+        data = {'found': len(dates)}
+        if clusters and roles:
+            data['clusters'] = [{'id': 'professional_role', 'items': [
+                {'count': count, 'url': f'/vacancies?professional_role={role}'} for role, count in roles.items()
+            ]}]
+        return data
+    return probe
+
+
+class TestSharding(unittest.TestCase):
+    """
+    Класс для тестирования разбиения запросов на шарды.
+    """
+
+    def test_small_query_is_not_split(self):
+        """
+        Тестирует, что запрос в пределах ограничения не делится.
+        """
+        self.assertEqual(plan_shards(make_probe([NOW] * 10), {}, max_results=20, now=NOW), [{}])
+
+    def test_split_by_date_until_under_cap(self):
+        """
+        Тестирует деление по дате без кластеров: каждый шард укладывается в ограничение.
+        """
+        published = [NOW - timedelta(hours=hour) for hour in range(100)]
+        probe = make_probe(published)
+        shards = plan_shards(probe, {}, max_results=20, now=NOW)
+        self.assertGreater(len(shards), 5)
+        covered = set()
+        for shard in shards:
+            self.assertLessEqual(probe(shard, False)['found'], 20)
+            covered.update(value for value in published
+                           if ('date_from' not in shard or value >= datetime.fromisoformat(shard['date_from']))
+                           and value <= datetime.fromisoformat(shard['date_to']))
+        self.assertEqual(len(covered), 100)
+
+    def test_split_by_role_when_dates_are_exhausted(self):
+        """
+        Тестирует деление по профессиональным ролям, когда окно дат уже нельзя уменьшить.
+        """
+        probe = make_probe([NOW] * 50, roles={'96': 30, '10': 25})
+        window = {'date_from': (NOW - MIN_DATE_SPAN).isoformat(), 'date_to': NOW.isoformat()}
+        shards = plan_shards(probe, window, max_results=40, now=NOW)
+        self.assertEqual([shard['professional_role'] for shard in shards], ['96', '10'])
+
+    def test_split_date_range_adds_tail(self):
+        """
+        Тестирует, что первое деление по дате добавляет шард для вакансий старше окна.
+        """
+        shards = split_date_range({}, NOW)
+        self.assertEqual(len(shards), 3)
+        self.assertNotIn('date_from', shards[2])
+        self.assertEqual(shards[0]['date_to'], shards[1]['date_from'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from src.sync import _high_water_mark, sync_company
+
+
+def make_vacancy(vacancy_id, published_at):
+    return {'id': str(vacancy_id), 'name': 'V', 'salary': None, 'alternate_url': 'a', 'published_at': published_at}
+
+
+class TestSync(unittest.TestCase):
+    """
+    Класс для тестирования инкрементальной синхронизации.
+    """
+
+    def test_high_water_mark(self):
+        """
+        Тестирует выбор максимальной даты публикации.
+        """
+        previous = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        rows = [('1', 1, 'V', None, None, 'a', '2024-05-02T10:00:00+0300'), ('2', 1, 'V', None, None, 'a', None)]
+        self.assertEqual(_high_water_mark(rows, previous), datetime(2024, 5, 2, 7, tzinfo=timezone.utc))
+        self.assertEqual(_high_water_mark([], previous), previous)
+
+    @patch('src.sync.upsert_vacancies', side_effect=lambda cur, rows: len(rows))
+    def test_sync_company_fetches_delta_only(self, mock_upsert):
+        """
+        Тестирует, что при известной отметке запрашивается только дельта,
+        а полный список не загружается, если число открытых вакансий сходится.
+        """
+        since = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+        hh_api = Mock()
+        hh_api.get_company_vacancies.return_value = ([make_vacancy(1, '2024-05-02T10:00:00+0300')], 1)
+        hh_api.count_vacancies.return_value = 5
+        cur = Mock()
+        cur.fetchone.return_value = (5,)
+
+        result = sync_company(cur, hh_api, 42, since, timedelta(hours=1))
+
+        hh_api.get_company_vacancies.assert_called_once_with(42, date_from='2024-05-01T11:00:00+00:00')
+        self.assertEqual(result, {'upserted': 1, 'archived': 0})
+
+    @patch('src.sync.upsert_vacancies', side_effect=lambda cur, rows: len(rows))
+    def test_sync_company_archives_missing(self, mock_upsert):
+        """
+        Тестирует архивацию, когда в БД открытых вакансий больше, чем на hh.ru.
+        """
+        since = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        hh_api = Mock()
+        hh_api.get_company_vacancies.side_effect = [
+            ([], 0),
+            ([make_vacancy(1, None), make_vacancy(2, None)], 2),
+        ]
+        hh_api.count_vacancies.return_value = 2
+        cur = Mock()
+        cur.fetchone.return_value = (3,)
+        cur.rowcount = 1
+
+        result = sync_company(cur, hh_api, 42, since, timedelta(hours=1))
+
+        self.assertEqual(result, {'upserted': 2, 'archived': 1})
+        archive_call = [call for call in cur.execute.call_args_list if 'archived = TRUE' in call.args[0]][0]
+        self.assertEqual(archive_call.args[1], (42, [1, 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
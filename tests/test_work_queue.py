@@ -0,0 +1,153 @@
+import io
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from src.models import VacancyRecord
+from src.work_queue import (
+    CLAIM_QUERY, LeaseLost, claim_job, enqueue_jobs, page_ranges, plan_jobs, process_job, run_worker
+)
+
+
+def _conn(fetchone=None, rowcount=1):
+    """
+    Создает заглушку соединения psycopg2 с курсором-контекстным менеджером.
+    """
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = fetchone
+    cur.rowcount = rowcount
+    return conn, cur
+
+
+class TestWorkQueue(unittest.TestCase):
+    """
+    Класс для тестирования очереди заданий распределенной загрузки.
+    """
+
+    def test_page_ranges(self):
+        """
+        Тестирует деление страниц на диапазоны заданий.
+        """
+        self.assertEqual(page_ranges(12, 5), [(0, 4), (5, 9), (10, 11)])
+        self.assertEqual(page_ranges(5, 5), [(0, 4)])
+        self.assertEqual(page_ranges(0, 5), [])
+
+    def test_plan_jobs_shards_large_employers(self):
+        """
+        Тестирует, что задания крупного работодателя строятся по шардам с числом страниц
+        по размеру шарда, а повторяющийся работодатель планируется один раз.
+        """
+        hh_api = MagicMock()
+        hh_api.companies = {'A': {'id': 1}, 'B': {'id': 2}, 'C': {'id': 3}, 'A2': {'id': 1}}
+        # Компании A, B, шарды B и компания C
+        hh_api.count_vacancies.side_effect = [250, 5000, 1500, 150, None]
+        hh_api.plan_shards.return_value = [{'area': '1'}, {'area': '2'}]
+
+        jobs = plan_jobs(hh_api, pages_per_job=10)
+
+        self.assertEqual(jobs, [
+            (1, {}, 0, 2),
+            (2, {'area': '1'}, 0, 9), (2, {'area': '1'}, 10, 14),
+            (2, {'area': '2'}, 0, 1),
+        ])
+        hh_api.count_vacancies.assert_any_call(2, {'area': '2'})
+        hh_api.plan_shards.assert_called_once_with(2, found=5000)
+
+    def test_claim_job_skips_locked_rows(self):
+        """
+        Тестирует, что задание забирается через FOR UPDATE SKIP LOCKED и фиксируется сразу.
+        """
+        conn, cur = _conn(fetchone=(7, 1, {}, 0, 4))
+
+        job = claim_job(conn, 'w1', timedelta(minutes=2), 3)
+
+        self.assertEqual(job, (7, 1, {}, 0, 4))
+        self.assertIn('FOR UPDATE SKIP LOCKED', CLAIM_QUERY)
+        query, args = cur.execute.call_args[0]
+        self.assertEqual(query, CLAIM_QUERY)
+        self.assertEqual(args['worker_id'], 'w1')
+        conn.commit.assert_called_once()
+
+    @patch('src.work_queue.insert_companies')
+    @patch('src.work_queue.plan_jobs')
+    @patch('src.work_queue.psycopg2.connect')
+    def test_enqueue_jobs_deduplicates_keys(self, mock_connect, mock_plan, mock_companies):
+        """
+        Тестирует, что задания с одинаковым ключом очереди вставляются одним экземпляром.
+        """
+        conn, cur = _conn()
+        mock_connect.return_value = conn
+        mock_plan.return_value = [(1, {'area': '1'}, 0, 4), (1, {'area': '1'}, 0, 4), (1, {}, 0, 4)]
+
+        with patch('src.work_queue.execute_values') as mock_values, patch('sys.stdout', new_callable=io.StringIO):
+            count = enqueue_jobs('db', {}, MagicMock())
+
+        self.assertEqual(count, 2)
+        self.assertEqual(len(mock_values.call_args[0][2]), 2)
+
+    @patch('src.work_queue.upsert_vacancies', return_value=1)
+    def test_process_job_completes_in_same_transaction(self, mock_upsert):
+        """
+        Тестирует, что вакансии и отметка о выполнении фиксируются одной транзакцией.
+        """
+        conn, cur = _conn()
+        hh_api = MagicMock()
+        hh_api.get_page_range.return_value = [VacancyRecord(5, 'V', None, None, 'u', None)]
+
+        count = process_job(conn, hh_api, (7, 1, {'area': '1'}, 0, 4), 'w1', {'RUR': 1.0})
+
+        self.assertEqual(count, 1)
+        hh_api.get_page_range.assert_called_once_with(1, 0, 4, {'area': '1'})
+        self.assertEqual(mock_upsert.call_args[0][1][0][:2], (5, 1))
+        queries = [call[0][0] for call in cur.execute.call_args_list]
+        self.assertIn("status = 'done'", queries[0])
+        self.assertIn('version = version + 1', queries[1])
+        conn.commit.assert_called_once()
+
+    @patch('src.work_queue.upsert_vacancies', return_value=1)
+    def test_process_job_rolls_back_when_lease_lost(self, mock_upsert):
+        """
+        Тестирует откат записи, если задание уже выдано другому процессу.
+        """
+        conn, cur = _conn(rowcount=0)
+        hh_api = MagicMock()
+        hh_api.get_page_range.return_value = []
+
+        with self.assertRaises(LeaseLost):
+            process_job(conn, hh_api, (7, 1, {}, 0, 4), 'w1', {})
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+    @patch('src.work_queue.finish_ingest')
+    @patch('src.work_queue.Heartbeat')
+    @patch('src.work_queue.process_job')
+    @patch('src.work_queue.claim_job')
+    @patch('src.work_queue.load_currency_rates', return_value={})
+    @patch('src.work_queue.psycopg2.connect')
+    def test_run_worker_drains_queue(self, mock_connect, mock_rates, mock_claim, mock_process, mock_heartbeat,
+                                     mock_finish):
+        """
+        Тестирует, что рабочий процесс выполняет задания до опустошения очереди,
+        возвращает неудачные задания в очередь и затем выполняет шаги после загрузки.
+        """
+        conn, cur = _conn()
+        mock_connect.return_value = conn
+        # Число активных заданий, затем результат pg_try_advisory_lock
+        cur.fetchone.side_effect = [(0,), (True,)]
+        mock_claim.side_effect = [(1, 1, {}, 0, 4), (2, 1, {}, 5, 9), None]
+        mock_process.side_effect = [10, RuntimeError('API')]
+
+        stats = run_worker('db', {}, MagicMock(), 'w1')
+
+        self.assertEqual(stats, {'done': 1, 'failed': 1, 'rows': 10})
+        queries = [call[0][0] for call in cur.execute.call_args_list]
+        self.assertTrue(any("'failed' ELSE 'pending'" in query for query in queries))
+        mock_finish.assert_called_once_with(conn)
+        mock_heartbeat.return_value.close.assert_called_once()
+        conn.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()